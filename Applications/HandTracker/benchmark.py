@@ -0,0 +1,349 @@
+"""Per-stage latency benchmark for the tracking and serial paths.
+
+  python benchmark.py                                # synthetic frames, all stages
+  python benchmark.py --video session.mp4 --frames 600
+  python benchmark.py --out after.json --compare before.json
+  python benchmark.py --camera 0 --backend v4l2 --fourcc MJPG --fps 60 --drain
+
+Tracking stages (cvtColor, hands.process, angle math, overlay drawing, send
+scheduling) are timed frame by frame. When a frame has no hand (always the
+case for synthetic frames) a canned hand pose is used for the downstream
+stages so they are still measured. The serial stage writes through a
+HandLink to a pseudo-terminal stand-in for the board (POSIX only) and
+times both the enqueue call and command-to-bytes-on-the-wire latency. The
+motion stage drives handEmulator.py (the sketch emulated on a pty, paced at
+the baud rate) and reports command-to-motion latency. With --camera, the
+capture stage reads a live camera through capture.Camera with the given
+settings and reports the negotiated format, delivered FPS, frame intervals
+and frame age at read (capture timestamp to frame in hand).
+
+Each stage reports p50/p95/p99/mean in milliseconds and throughput; the
+run also records peak RSS. --out writes the results as JSON and --compare
+prints the change against an earlier run.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+import capture
+import hand_tracker as ht
+import kinematics
+from handEmulator import Emulator
+from handSerial import HandLink
+from replay import DryLink
+
+# A plausible open right hand (normalized landmarks), used when no hand is detected
+CANNED_HAND = np.array([
+    (0.50, 0.80, 0.00), (0.43, 0.75, -0.02), (0.38, 0.68, -0.03), (0.35, 0.61, -0.04), (0.32, 0.55, -0.05),
+    (0.44, 0.58, -0.01), (0.42, 0.48, -0.02), (0.41, 0.42, -0.03), (0.40, 0.37, -0.04),
+    (0.50, 0.57, -0.01), (0.50, 0.46, -0.02), (0.50, 0.39, -0.03), (0.50, 0.34, -0.04),
+    (0.56, 0.58, -0.01), (0.57, 0.48, -0.02), (0.58, 0.42, -0.03), (0.58, 0.37, -0.04),
+    (0.61, 0.61, -0.01), (0.63, 0.54, -0.02), (0.64, 0.50, -0.03), (0.65, 0.46, -0.04),
+], np.float32)
+
+
+def summarize(samples, wall: float = None) -> dict:
+    """Latency percentiles (ms) and throughput for a list of durations in seconds."""
+    if not samples:
+        return {"n": 0}
+    ms = np.asarray(samples) * 1000.0
+    total = wall if wall is not None else float(np.sum(samples))
+    return {
+        "n": len(ms),
+        "p50": round(float(np.percentile(ms, 50)), 4),
+        "p95": round(float(np.percentile(ms, 95)), 4),
+        "p99": round(float(np.percentile(ms, 99)), 4),
+        "mean": round(float(ms.mean()), 4),
+        "per_s": round(len(ms) / total, 1) if total > 0 else None,
+    }
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:     # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def frame_source(video: str, count: int, size):
+    """Yield ``count`` BGR frames from a video (looping) or synthetic noise."""
+    if video:
+        cap = cv2.VideoCapture(video)
+        if not cap.isOpened():
+            raise SystemExit(f"cannot open video {video}")
+        n = 0
+        while n < count:
+            ok, img = cap.read()
+            if not ok:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                continue
+            yield img
+            n += 1
+        cap.release()
+        return
+    w, h = size
+    rng = np.random.default_rng(0)
+    pool = [rng.integers(0, 255, (h, w, 3), np.uint8) for _ in range(8)]
+    for n in range(count):
+        yield pool[n % len(pool)].copy()
+
+
+def bench_tracking(frames, inference: bool = True) -> dict:
+    timings = {k: [] for k in ("cvtColor", "hands.process", "angle", "draw", "send_schedule")}
+    hands = None
+    if inference:
+        import mediapipe as mp
+        hands = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=2,
+                                         min_detection_confidence=0.5, min_tracking_confidence=0.5)
+
+    # send scheduling is measured against a link that only counts commands
+    ht.hand_link = DryLink()
+    ht.LOG_SENDS = False
+    rng = np.random.default_rng(1)
+
+    t_wall = time.perf_counter()
+    for img in frames:
+        h_img, w_img, _ = img.shape
+        t0 = time.perf_counter()
+        rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        timings["cvtColor"].append(time.perf_counter() - t0)
+
+        lm = np.zeros((0, 21, 3), np.float32)
+        labels = []
+        if hands is not None:
+            t0 = time.perf_counter()
+            res = hands.process(rgb)
+            timings["hands.process"].append(time.perf_counter() - t0)
+            lm = kinematics.landmarks_array(res.multi_hand_landmarks)
+            labels = [c.classification[0].label for c in res.multi_handedness or []]
+        if len(lm) == 0:
+            lm = (CANNED_HAND + rng.normal(0, 0.004, CANNED_HAND.shape)).astype(np.float32)[None]
+            labels = ["Right"]
+
+        t0 = time.perf_counter()
+        palm = kinematics.palm_angles(lm, w_img, h_img, [l.lower().startswith("l") for l in labels])
+        kinematics.joint_flexion(lm, w_img, h_img)
+        states = ht.identities.assign(lm, labels, ht.clock())
+        palm["id"] = [h.slot for h in states]
+        smoothed = [ht.smooth_angle(h, cx, cy, ht.clock()) for h, cx, cy in zip(states, palm["cx"], palm["cy"])]
+        timings["angle"].append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        ht.draw_hands(img, kinematics.to_pixels(lm, w_img, h_img), palm, smoothed)
+        timings["draw"].append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        ht.send_hands(states, smoothed, None, ht.clock())
+        timings["send_schedule"].append(time.perf_counter() - t0)
+    wall = time.perf_counter() - t_wall
+
+    out = {k: summarize(v) for k, v in timings.items() if v}
+    out["frame_total"] = summarize([sum(s) for s in zip(*[v for v in timings.values() if v])], wall)
+    return out
+
+
+def bench_capture(index: int, count: int, camera_args: dict) -> dict:
+    """Read ``count`` frames from a live camera; intervals and frame age per read."""
+    cam = capture.Camera(index, **camera_args)
+    if not cam.isOpened():
+        raise SystemExit(f"cannot open camera {index}")
+    intervals, ages, grabs = [], [], []
+    last = None
+    for n in range(count + 10):
+        t0 = time.monotonic()
+        ok, _ = cam.read()
+        now = time.monotonic()
+        if not ok or n < 10:            # the first frames include the camera starting up
+            last = now if ok else last
+            continue
+        grabs.append(now - t0)
+        ages.append(now - cam.t_frame)
+        if last is not None:
+            intervals.append(now - last)
+        last = now
+    cam.release()
+    st = cam.stats()
+    return {
+        "settings": cam.settings(),
+        "delivered_fps": round(len(intervals) / sum(intervals), 2) if intervals else None,
+        "drained": st["drained"],
+        "timestamps": st["ts_source"],
+        "read": summarize(grabs),
+        "interval": summarize(intervals),
+        "age": summarize(ages),
+    }
+
+
+def bench_serial(count: int, protocol: str = "text") -> dict:
+    """Time HandLink against a pty: enqueue cost and command-to-wire latency."""
+    if not hasattr(os, "openpty"):
+        return {"skipped": "no pty on this platform"}
+    import tty
+    master, slave = os.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    arrived = []
+    cond = threading.Condition()
+
+    def board():
+        # stand-in for the sketch: timestamp every write that arrives (one
+        # command per write in the ping-pong loop, text or binary)
+        while True:
+            try:
+                data = os.read(master, 4096)
+            except OSError:
+                return
+            if not data:
+                return
+            if data.startswith(b"v\n"):
+                os.write(master, b"V 2\r\n")
+            now = time.perf_counter()
+            with cond:
+                arrived.append(now)
+                cond.notify_all()
+    threading.Thread(target=board, daemon=True).start()
+
+    link = HandLink(os.ttyname(slave), protocol=protocol)
+    link.connect()
+    with cond:
+        arrived.clear()
+    enqueue, wire = [], []
+    t_wall = time.perf_counter()
+    for i in range(count):
+        with cond:
+            seen = len(arrived)
+        t0 = time.perf_counter()
+        link.set_angle(i % 16, i % 270)
+        t1 = time.perf_counter()
+        with cond:
+            cond.wait_for(lambda: len(arrived) > seen, timeout=1.0)
+            t2 = arrived[-1] if len(arrived) > seen else None
+        enqueue.append(t1 - t0)
+        if t2 is not None:
+            wire.append(t2 - t0)
+    wall = time.perf_counter() - t_wall
+
+    # burst: enqueue as fast as possible and let coalescing keep up
+    t0 = time.perf_counter()
+    for i in range(count):
+        link.set_angle(i % 16, i % 270)
+    link.flush(2.0)
+    burst = time.perf_counter() - t0
+    stats = link.stats()
+    link.close()
+    os.close(slave)
+    os.close(master)
+    return {
+        "enqueue": summarize(enqueue),
+        "command_to_wire": summarize(wire, wall),
+        "burst": {"commands": count, "seconds": round(burst, 4),
+                  "per_s": round(count / burst, 1), "coalesced": stats["coalesced"]},
+    }
+
+
+def bench_motion(count: int, protocol: str = "text", baud: int = 115200) -> dict:
+    """Command-to-motion latency against the firmware emulator."""
+    try:
+        emu = Emulator(baud)
+    except RuntimeError as e:
+        return {"skipped": str(e)}
+    with emu:
+        link = HandLink(emu.port, baud, protocol=protocol)
+        link.connect()
+        emu.motion_latency.clear()
+        for i in range(count):
+            # alternate far-apart targets so every command moves its servo
+            link.set_angle(i % 16, 200 if (i // 16) % 2 == 0 else 20)
+            time.sleep(0.02)
+        link.flush(2.0)
+        time.sleep(0.05)
+        link.close()
+        samples = list(emu.motion_latency)
+    return {"command_to_motion": summarize(samples), "baud": baud}
+
+
+def compare(new: dict, old: dict, prefix: str = ""):
+    """Print p50/p95 changes between two result trees."""
+    for k, v in new.items():
+        o = old.get(k) if isinstance(old, dict) else None
+        if isinstance(v, dict) and "p50" in v and isinstance(o, dict) and "p50" in o:
+            d50 = (v["p50"] - o["p50"]) / o["p50"] * 100 if o["p50"] else 0.0
+            d95 = (v["p95"] - o["p95"]) / o["p95"] * 100 if o["p95"] else 0.0
+            print(f"{prefix + k:<32} p50 {o['p50']:9.3f} -> {v['p50']:9.3f} ({d50:+.1f}%)  "
+                  f"p95 {o['p95']:9.3f} -> {v['p95']:9.3f} ({d95:+.1f}%)")
+        elif isinstance(v, dict):
+            compare(v, o or {}, prefix + k + ".")
+
+
+def print_table(results: dict, prefix: str = ""):
+    for k, v in results.items():
+        if isinstance(v, dict) and "p50" in v:
+            print(f"{prefix + k:<32} p50 {v['p50']:9.3f}  p95 {v['p95']:9.3f}  p99 {v['p99']:9.3f}  "
+                  f"mean {v['mean']:9.3f} ms  {v['per_s']}/s  (n={v['n']})")
+        elif isinstance(v, dict):
+            if k != "meta":
+                print_table(v, prefix + k + ".")
+        else:
+            print(f"{prefix + k:<32} {v}")
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark tracker and serial stages")
+    p.add_argument("--video", default=None, help="Video file (default: synthetic frames)")
+    p.add_argument("--frames", type=int, default=300)
+    p.add_argument("--size", default="640x480", help="Synthetic frame size WxH")
+    p.add_argument("--no-inference", action="store_true", help="Skip hands.process")
+    p.add_argument("--camera", type=int, default=None, help="Also benchmark capture from this camera")
+    p.add_argument("--camera-frames", type=int, default=300, help="Frames for the capture stage")
+    capture.add_arguments(p)
+    p.add_argument("--serial", type=int, default=500, help="Commands for the serial stage (0 = skip)")
+    p.add_argument("--motion", type=int, default=100,
+                   help="Commands for the emulator command-to-motion stage (0 = skip)")
+    p.add_argument("--baud", type=int, default=115200, help="Emulated baud rate for the motion stage")
+    p.add_argument("--protocol", choices=["text", "binary", "auto"], default="text")
+    p.add_argument("--out", default=None, help="Write results as JSON")
+    p.add_argument("--compare", default=None, help="Earlier --out file to compare against")
+    args = p.parse_args(argv)
+
+    size = tuple(int(v) for v in args.size.lower().split("x"))
+    rss0 = peak_rss_mb()
+    results = {"meta": {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "opencv": cv2.__version__,
+        "numpy": np.__version__,
+        "source": args.video or f"synthetic {args.size}",
+    }}
+    if args.camera is not None:
+        results["capture"] = bench_capture(args.camera, args.camera_frames, capture.camera_args(args))
+    results["tracking"] = bench_tracking(frame_source(args.video, args.frames, size), not args.no_inference)
+    if args.serial > 0:
+        results["serial"] = bench_serial(args.serial, args.protocol)
+    if args.motion > 0:
+        results["motion"] = bench_motion(args.motion, args.protocol, args.baud)
+    results["memory"] = {"peak_rss_mb_start": rss0, "peak_rss_mb": peak_rss_mb()}
+
+    print_table(results)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"wrote {args.out}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,199 @@
+"""Low-latency camera capture with per-frame timestamps.
+
+  python hand_tracker.py --backend v4l2 --fourcc MJPG --resolution 640x480 --fps 60 --drain
+  python benchmark.py --camera 0 --backend v4l2 --fourcc MJPG --fps 60     # measure it
+
+cv2.VideoCapture(0) opens whatever the default backend negotiates: on Linux
+V4L2 that is often raw YUYV (converted on the CPU every frame) with four
+driver buffers, so a reader that falls behind gets frames that are several
+periods old. Camera asks for a backend, pixel format, size and rate, and a
+one-frame buffer (CAP_PROP_BUFFERSIZE, where the backend supports it), and
+reports what it actually got; drivers are free to pick something else.
+
+read() is grab() + retrieve(), so the time a frame arrived can be taken
+before it is decoded. The frame's timestamp (``t_frame``, time.monotonic())
+is the driver's buffer time when the backend gives one on the same clock
+(V4L2 buffers are stamped with CLOCK_MONOTONIC), else the moment grab()
+returned. With ``drain``, a grab() that returns in less than half a frame
+period took a frame that was already queued, i.e. stale; it is dropped and
+the next one grabbed, up to ``max_drain`` times, before retrieving.
+
+stats() reports delivered FPS (frames returned per second, not what the
+driver claims), drained frames, grab and decode times and the age of each
+frame when read() returns it.
+"""
+
+import time
+
+import cv2
+
+BACKENDS = {
+    "auto": cv2.CAP_ANY,
+    "v4l2": cv2.CAP_V4L2,
+    "dshow": cv2.CAP_DSHOW,
+    "msmf": cv2.CAP_MSMF,
+    "avfoundation": cv2.CAP_AVFOUNDATION,
+    "gstreamer": cv2.CAP_GSTREAMER,
+}
+BUFFER_SIZE = 1             # driver buffers requested (CAP_PROP_BUFFERSIZE)
+MAX_DRAIN = 4               # stale frames dropped per read at most
+FPS_ALPHA = 0.05            # EMA weight for delivered FPS and timings
+
+
+def add_arguments(parser):
+    """The capture flags shared by the tracker and the benchmark."""
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='auto',
+                        help='Capture backend (v4l2 on Linux, dshow/msmf on Windows, see capture.py)')
+    parser.add_argument('--fourcc', default=None, help='Camera pixel format, e.g. MJPG or YUYV')
+    parser.add_argument('--resolution', default=None, help='Camera resolution WxH, e.g. 640x480')
+    parser.add_argument('--fps', type=float, default=None, help='Camera frame rate to request')
+    parser.add_argument('--buffer-size', type=int, default=BUFFER_SIZE,
+                        help='Driver frame buffers (fewer = fresher frames; 0 = backend default)')
+    parser.add_argument('--drain', action='store_true',
+                        help='Drop frames that were already queued when read (grab/retrieve drain)')
+
+
+def camera_args(args) -> dict:
+    """Keyword arguments for Camera from add_arguments()' flags."""
+    size = tuple(int(v) for v in args.resolution.lower().split("x")) if args.resolution else None
+    return {"backend": args.backend, "fourcc": args.fourcc, "size": size, "fps": args.fps,
+            "buffer_size": args.buffer_size, "drain": args.drain}
+
+
+def fourcc_str(code: float) -> str:
+    code = int(code)
+    return "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4)).strip("\0") or "?"
+
+
+class Camera:
+    """cv2.VideoCapture with capture settings, timestamps and stats (see the module docstring).
+
+    Drop-in for cv2.VideoCapture in the tracker's pipeline (read, isOpened,
+    release, get, set).
+    """
+
+    def __init__(self, index: int = 0, backend: str = "auto", fourcc: str = None, size=None,
+                 fps: float = None, buffer_size: int = BUFFER_SIZE, drain: bool = False,
+                 max_drain: int = MAX_DRAIN):
+        if backend not in BACKENDS:
+            raise ValueError(f"unknown backend {backend!r}")
+        self.index = index
+        self.cap = cv2.VideoCapture(index, BACKENDS[backend])
+        if self.cap.isOpened():
+            # the pixel format first: some drivers only offer large sizes/rates in MJPG
+            if fourcc:
+                self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc[:4].ljust(4)))
+            if size:
+                self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, size[0])
+                self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, size[1])
+            if fps:
+                self.cap.set(cv2.CAP_PROP_FPS, fps)
+            if buffer_size:
+                self.cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+        self.drain = drain
+        self.max_drain = max_drain
+        nominal = self.cap.get(cv2.CAP_PROP_FPS) if self.cap.isOpened() else 0.0
+        self.period = 1.0 / (nominal if 1.0 <= nominal <= 1000.0 else 30.0)
+        self._driver_ts = self.backend() == "V4L2"
+        self.t_frame = None         # monotonic time of the last frame read
+        self.ts_source = "grab"     # "driver" once a buffer timestamp was used
+        # stats
+        self.frames = 0
+        self.drained = 0
+        self.fps = None             # delivered frames per second (EMA)
+        self.grab_ms = None
+        self.decode_ms = None
+        self.age_ms = None          # frame age when read() returns it
+        self._last_read = None
+
+    # --- cv2.VideoCapture interface ---
+    def isOpened(self) -> bool:
+        return self.cap.isOpened()
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+
+    def release(self):
+        self.cap.release()
+
+    def read(self):
+        t0 = time.monotonic()
+        if not self.cap.grab():
+            return False, None
+        t = time.monotonic()
+        drained = 0
+        while self.drain and drained < self.max_drain and t - t0 < self.period / 2:
+            # returned at once: the frame was already queued; take a newer one
+            t0 = t
+            if not self.cap.grab():
+                break
+            t = time.monotonic()
+            drained += 1
+        ok, img = self.cap.retrieve()
+        t_done = time.monotonic()
+        if not ok:
+            return False, None
+        self.t_frame = self._timestamp(t)
+        self.frames += 1
+        self.drained += drained
+        self.grab_ms = self._ema(self.grab_ms, (t - t0) * 1000.0)
+        self.decode_ms = self._ema(self.decode_ms, (t_done - t) * 1000.0)
+        self.age_ms = self._ema(self.age_ms, (t_done - self.t_frame) * 1000.0)
+        if self._last_read is not None and t_done > self._last_read:
+            self.fps = self._ema(self.fps, 1.0 / (t_done - self._last_read))
+        self._last_read = t_done
+        return True, img
+
+    def _timestamp(self, t_grab: float) -> float:
+        """The driver's buffer time if it is on our clock and plausible, else t_grab."""
+        if self._driver_ts:
+            ts = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            if 0.0 <= t_grab - ts < 1.0:
+                self.ts_source = "driver"
+                return ts
+        return t_grab
+
+    @staticmethod
+    def _ema(old, v):
+        return v if old is None else old + FPS_ALPHA * (v - old)
+
+    # --- reporting ---
+    def backend(self) -> str:
+        try:
+            return self.cap.getBackendName()
+        except cv2.error:
+            return "?"
+
+    def settings(self) -> dict:
+        """What the driver actually negotiated."""
+        c = self.cap
+        return {"backend": self.backend(), "width": int(c.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                "height": int(c.get(cv2.CAP_PROP_FRAME_HEIGHT)), "fps": round(c.get(cv2.CAP_PROP_FPS), 2),
+                "fourcc": fourcc_str(c.get(cv2.CAP_PROP_FOURCC)),
+                "buffer_size": int(c.get(cv2.CAP_PROP_BUFFERSIZE))}
+
+    def describe(self) -> str:
+        s = self.settings()
+        return (f"CAMERA {self.index} backend={s['backend']} {s['width']}x{s['height']} @{s['fps']:g}fps "
+                f"fourcc={s['fourcc']} buffer={s['buffer_size']} drain={'on' if self.drain else 'off'}")
+
+    def stats(self) -> dict:
+        r = lambda v: None if v is None else round(v, 2)
+        return {"frames": self.frames, "drained": self.drained, "fps": r(self.fps), "grab_ms": r(self.grab_ms),
+                "decode_ms": r(self.decode_ms), "age_ms": r(self.age_ms), "ts_source": self.ts_source}
+
+    def summary(self) -> str:
+        st = self.stats()
+        f = lambda v: "-" if v is None else f"{v:.1f}"
+        return (f"cam {f(st['fps'])}fps grab:{f(st['grab_ms'])} decode:{f(st['decode_ms'])} "
+                f"age:{f(st['age_ms'])}ms drained:{st['drained']} ts:{st['ts_source']}")
+
+
+def open_camera(index: int, **camera_args) -> Camera:
+    cam = Camera(index, **camera_args)
+    if cam.isOpened():
+        print(cam.describe(), flush=True)
+    return cam
@@ -0,0 +1,172 @@
+"""Motion filters for the angle path, selectable with hand_tracker.py --filter.
+
+Every filter is called as ``f(t, x, lead=0.0)`` with a timestamp in seconds
+and a value (scalar or array, one element per channel, in degrees), and
+returns the filtered value. Each instance keeps the state of one hand; with
+``circular=True`` values are angles that wrap at +-180 deg (the palm angle).
+
+  ema      fixed exponential moving average (the old SMOOTH_ALPHA behaviour)
+  oneeuro  One Euro filter: heavy smoothing when still, little lag when moving
+  kalman   constant-velocity Kalman filter; its output is predicted ``lead``
+           seconds ahead to make up for pipeline latency
+
+Filters are chosen with a spec string "name[:key=value,...]", e.g.
+"oneeuro:min_cutoff=0.8,beta=0.03" or "kalman:q=800,r=2".
+"""
+
+import inspect
+
+import numpy as np
+
+
+def _wrap(d):
+    """Wrap degrees to [-180, 180)."""
+    return (d + 180.0) % 360.0 - 180.0
+
+
+class EmaFilter:
+    """Exponential moving average; circular values are averaged as unit vectors."""
+
+    def __init__(self, alpha: float = 0.2, circular: bool = False):
+        self.alpha = alpha
+        self.circular = circular
+        self.reset()
+
+    def reset(self):
+        self._s = None
+
+    def __call__(self, t: float, x, lead: float = 0.0):
+        x = np.asarray(x, np.float64)
+        v = np.stack([np.cos(np.radians(x)), np.sin(np.radians(x))]) if self.circular else x
+        self._s = v if self._s is None else self.alpha * v + (1 - self.alpha) * self._s
+        if self.circular:
+            return np.degrees(np.arctan2(self._s[1], self._s[0]))
+        return self._s.copy()
+
+
+class OneEuroFilter:
+    """One Euro filter (Casiez et al.): the cutoff rises with the filtered speed.
+
+    min_cutoff (Hz) sets the smoothing at rest, beta how fast the cutoff
+    grows per deg/s of motion, d_cutoff (Hz) the smoothing of the speed.
+    """
+
+    def __init__(self, min_cutoff: float = 1.0, beta: float = 0.02, d_cutoff: float = 1.0,
+                 circular: bool = False):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.circular = circular
+        self.reset()
+
+    def reset(self):
+        self._x = None
+        self._dx = None
+        self._t = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        r = 2 * np.pi * cutoff * dt
+        return r / (r + 1)
+
+    def __call__(self, t: float, x, lead: float = 0.0):
+        x = np.asarray(x, np.float64)
+        if self._x is None:
+            self._x, self._dx, self._t = x.copy(), np.zeros_like(x), t
+            return x.copy()
+        dt = max(t - self._t, 1e-3)
+        self._t = t
+        if self.circular:
+            x = self._x + _wrap(x - self._x)    # unwrap against the last estimate
+        a_d = self._alpha(self.d_cutoff, dt)
+        self._dx = a_d * (x - self._x) / dt + (1 - a_d) * self._dx
+        a = self._alpha(self.min_cutoff + self.beta * np.abs(self._dx), dt)
+        self._x = a * x + (1 - a) * self._x
+        return _wrap(self._x) if self.circular else self._x.copy()
+
+
+class KalmanFilter:
+    """Constant-velocity Kalman filter per element, with prediction.
+
+    q is the process noise (white acceleration, deg^2/s^3), r the
+    measurement noise variance (deg^2). The returned value is the position
+    estimate extrapolated ``lead`` seconds with the velocity estimate.
+    """
+
+    def __init__(self, q: float = 800.0, r: float = 2.0, circular: bool = False):
+        self.q = q
+        self.r = r
+        self.circular = circular
+        self.reset()
+
+    def reset(self):
+        self._x = None
+        self._t = None
+
+    def __call__(self, t: float, z, lead: float = 0.0):
+        z = np.asarray(z, np.float64)
+        if self._x is None:
+            self._x, self._v = z.copy(), np.zeros_like(z)
+            self._p00 = np.full_like(z, self.r)
+            self._p01 = np.zeros_like(z)
+            self._p11 = np.full_like(z, 1e4)    # velocity unknown at start
+            self._t = t
+            return z.copy()
+        dt = max(t - self._t, 1e-3)
+        self._t = t
+        q = self.q
+
+        # predict
+        self._x = self._x + self._v * dt
+        self._p00 = self._p00 + dt * (2 * self._p01 + dt * self._p11) + q * dt ** 3 / 3
+        self._p01 = self._p01 + dt * self._p11 + q * dt ** 2 / 2
+        self._p11 = self._p11 + q * dt
+
+        # update
+        y = _wrap(z - self._x) if self.circular else z - self._x
+        s = self._p00 + self.r
+        k0, k1 = self._p00 / s, self._p01 / s
+        self._x = self._x + k0 * y
+        self._v = self._v + k1 * y
+        self._p11 = self._p11 - k1 * self._p01
+        self._p01 = (1 - k0) * self._p01
+        self._p00 = (1 - k0) * self._p00
+        if self.circular:
+            self._x = _wrap(self._x)
+
+        out = self._x + self._v * lead
+        return _wrap(out) if self.circular else out
+
+
+FILTERS = {"ema": EmaFilter, "oneeuro": OneEuroFilter, "kalman": KalmanFilter}
+
+
+def parse_filter_spec(spec: str):
+    """"name[:key=value,...]" -> (name, {key: float})."""
+    name, _, rest = spec.partition(":")
+    name = name.strip().lower()
+    if name not in FILTERS:
+        raise ValueError(f"unknown filter {name!r} (choose from {', '.join(FILTERS)})")
+    params = {}
+    for item in rest.split(","):
+        if not item.strip():
+            continue
+        key, sep, val = item.partition("=")
+        if not sep:
+            raise ValueError(f"bad filter parameter {item!r} (want key=value)")
+        params[key.strip()] = float(val)
+    return name, params
+
+
+def make_filter(spec: str, circular: bool = False, **defaults):
+    """Build a filter from a spec; ``defaults`` apply unless the spec overrides them."""
+    name, params = parse_filter_spec(spec)
+    cls = FILTERS[name]
+    accepted = [n for n, p in inspect.signature(cls).parameters.items()
+                if n != "circular" and p.kind in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY)]
+    kwargs = {k: v for k, v in defaults.items() if k in accepted}
+    kwargs.update(params)
+    unknown = set(kwargs) - set(accepted)
+    if unknown:
+        raise ValueError(f"filter {name!r} has no parameter {', '.join(sorted(unknown))}")
+    return cls(circular=circular, **kwargs)
@@ -0,0 +1,102 @@
+"""Stable per-hand identity and state across frames.
+
+MediaPipe returns hands in no particular order, so the index of a hand in one
+frame says nothing about the next. HandIdentities matches each detection to
+a known hand by centroid distance, with a penalty when the handedness label
+disagrees, and gives every hand a slot (0..max_hands-1) that stays the same
+while the hand is in view. Each slot has its own HandState (smoothing and
+send-throttle state) and drives its own set of servo channels, so two hands
+never share a filter or starve each other's sends.
+
+A new hand takes the lowest free slot, so a single hand always drives slot
+0's channels; when several hands appear in the same frame, "Right" is
+placed first. A hand that has not been seen for ``timeout`` seconds is
+forgotten and starts fresh.
+"""
+
+import numpy as np
+
+MAX_MATCH_DIST = 0.25       # normalized image units; farther is a different hand
+LABEL_PENALTY = 0.15        # added to the distance when handedness disagrees
+HAND_TIMEOUT = 0.5          # seconds before an unseen hand is forgotten
+SLOT_ORDER = {"Right": 0, "Left": 1}     # order of new hands appearing together
+
+
+class HandState:
+    """Everything kept per tracked hand between frames."""
+
+    def __init__(self, slot: int, label: str, centroid, now: float):
+        self.slot = slot
+        self.label = label
+        self.centroid = centroid
+        self.first_seen = now
+        self.last_seen = now
+        # motion filters (see filters.py), created by the tracker on first use
+        self.palm_filter = None
+        self.servo_filter = None
+        # send throttle
+        self.last_sent_time = float("-inf")
+        self.last_sent = None       # values compared against SEND_DELTA
+
+
+class HandIdentities:
+    """Assigns detections to stable hand slots, see the module docstring."""
+
+    def __init__(self, max_hands: int = 2, max_dist: float = MAX_MATCH_DIST,
+                 label_penalty: float = LABEL_PENALTY, timeout: float = HAND_TIMEOUT):
+        self.max_hands = max_hands
+        self.max_dist = max_dist
+        self.label_penalty = label_penalty
+        self.timeout = timeout
+        self.hands = {}             # slot -> HandState
+
+    def assign(self, lm: np.ndarray, labels, now: float) -> list:
+        """Return a HandState (or None if no slot is free) for each detected hand.
+
+        lm is the (hands, 21, 3) normalized landmark array, labels the
+        handedness label per hand ("" if unknown).
+        """
+        for slot in [s for s, h in self.hands.items() if now - h.last_seen > self.timeout]:
+            del self.hands[slot]
+
+        n = len(lm)
+        labels = [labels[i] if i < len(labels) else "" for i in range(n)]
+        out = [None] * n
+        if n == 0:
+            return out
+        centroids = lm[:, :, :2].mean(axis=1)
+
+        # greedy matching on the cheapest (detection, known hand) pairs
+        known = list(self.hands.values())
+        pairs = []
+        for i in range(n):
+            for h in known:
+                cost = float(np.hypot(*(centroids[i] - h.centroid)))
+                if labels[i] and h.label and labels[i] != h.label:
+                    cost += self.label_penalty
+                if cost < self.max_dist:
+                    pairs.append((cost, i, h.slot))
+        taken = set()
+        for cost, i, slot in sorted(pairs):
+            if out[i] is None and slot not in taken:
+                out[i] = self.hands[slot]
+                taken.add(slot)
+
+        # unmatched detections become new hands in the lowest free slots
+        new = sorted((i for i in range(n) if out[i] is None), key=lambda i: SLOT_ORDER.get(labels[i], 2))
+        for i in new:
+            free = [s for s in range(self.max_hands) if s not in self.hands]
+            if not free:
+                break
+            self.hands[free[0]] = out[i] = HandState(free[0], labels[i], centroids[i], now)
+
+        for i, h in enumerate(out):
+            if h is not None:
+                h.centroid = centroids[i]
+                h.last_seen = now
+                if labels[i]:
+                    h.label = labels[i]
+        return out
+
+    def reset(self):
+        self.hands.clear()
@@ -1,199 +1,736 @@
 import argparse
-import cv2
-import mediapipe as mp
+import numpy as np
+import threading
 import time
 import math
-import subprocess
 import sys
 from pathlib import Path
 
-# allow disabling sends from CLI
-parser = argparse.ArgumentParser(add_help=False)
-parser.add_argument('--no-send', action='store_true', help='Do not send angles to handSerial (for testing)')
-known_args, _ = parser.parse_known_args()
-NO_SEND_FLAG = known_args.no_send
-
-# Open default camera
-videoCap = cv2.VideoCapture(0)
-lastFrameTime = 0.0
-
-# Hand initialization
-handSolution = mp.solutions.hands
-hands = handSolution.Hands(static_image_mode=False, max_num_hands=2,
-                           min_detection_confidence=0.5, min_tracking_confidence=0.5)
-
-# smoothing state (circular: keep cos/sin components)
-smoothed_x = None
-smoothed_y = None
+# handSerial.py lives at the repo root (two parents up from Applications/HandTracker)
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+from handSerial import format_frame
+from handDevices import open_link
+import handIpc
+import handTelemetry
+import handNet
+import handPreview
+from handJournal import JournalWriter
+from pipeline import FrameRing, StageTimer, CaptureStage, InferenceStage
+import filters
+import kinematics
+import recording
+from hand_state import HandIdentities
+from servo_schedule import SendScheduler
+
+def build_parser() -> argparse.ArgumentParser:
+    """The tracker's flags (built in main so replay loads without OpenCV and the camera modules)."""
+    import capture
+    import multicam
+
+    # allow disabling sends from CLI
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--no-send', action='store_true', help='Do not send angles to handSerial (for testing)')
+    parser.add_argument('--port', default=None,
+                        help='Serial port of the hand (default: handSerial platform default); several ports '
+                             '(a,b) or auto drive one board per 16 channels (see handDevices.py)')
+    parser.add_argument('--protocol', choices=['text', 'binary', 'auto'], default='text',
+                        help='Serial protocol for servo targets (see handSerial.HandLink)')
+    parser.add_argument('--channel', type=int, default=None, help='Servo channel for the palm angle (HAND_CHANNEL)')
+    parser.add_argument('--channels', default=None,
+                        help='Palm channel per hand slot, e.g. 0,1 (default: HAND_CHANNEL + slot)')
+    parser.add_argument('--publish', default=None,
+                        help='Publish angles and servo targets to these IPC addresses (comma separated, '
+                             'see handIpc.py) instead of opening the serial port')
+    parser.add_argument('--net', default=None,
+                        help='Stream servo targets over UDP to handSerial.py --serve --net on host:port '
+                             '(see handNet.py) instead of opening the serial port')
+    parser.add_argument('--telemetry', default=None,
+                        help='Publish metrics snapshots to these addresses (comma separated, see handTelemetry.py)')
+    parser.add_argument('--metrics-out', default=None, help='Append metrics snapshots to this JSON-lines file')
+    parser.add_argument('--ring-size', type=int, default=2, choices=[1, 2],
+                        help='Frames buffered between pipeline stages (older frames are dropped)')
+    parser.add_argument('--filter', default=None,
+                        help='Motion filter per hand: ema, oneeuro or kalman, with optional parameters, '
+                             'e.g. oneeuro:beta=0.03 (see filters.py)')
+    parser.add_argument('--schedule', choices=['servo', 'fixed'], default=None,
+                        help='servo: send when a target or speed changes the firmware ramp (servo_schedule.py); '
+                             'fixed: SEND_INTERVAL/SEND_DELTA throttle')
+    parser.add_argument('--full-hand', action='store_true',
+                        help='Drive channels 0-15 (palm + 15 finger joints) instead of HAND_CHANNEL only')
+    parser.add_argument('--roi', action='store_true',
+                        help='Run inference on a padded box around the last hands (full frame when lost)')
+    parser.add_argument('--roi-pad', type=float, default=0.35, help='ROI padding as a fraction of the hand size')
+    parser.add_argument('--target-fps', type=float, default=None,
+                        help='Scale the inference input down/up automatically to hold this frame rate')
+    parser.add_argument('--keyframe', action='store_true',
+                        help='Run MediaPipe on keyframes only and carry landmarks with optical flow in between')
+    parser.add_argument('--keyframe-max', type=int, default=6, help='Most frames per keyframe (see keyframe.py)')
+    parser.add_argument('--keyframe-motion', type=float, default=25.0,
+                        help='Hand motion per frame (px) that forces a keyframe')
+    parser.add_argument('--standby', action='store_true',
+                        help='Load everything, then wait for start/stop/quit lines on stdin (used by the launcher)')
+    parser.add_argument('--standby-camera', action='store_true',
+                        help='With --standby, keep the camera open while idle too')
+    parser.add_argument('--headless', action='store_true',
+                        help='No OpenCV window (use --preview, or --standby stop, to watch and control it)')
+    parser.add_argument('--preview', default=None,
+                        help='Publish frames to this shared-memory block for the launcher (see handPreview.py)')
+    parser.add_argument('--preview-raw', action='store_true',
+                        help='With --preview, skip all drawing and publish raw frames plus landmarks')
+    parser.add_argument('--preview-fps', type=float, default=30.0, help='Most preview frames per second')
+    parser.add_argument('--camera', type=int, default=0, help='Camera index for live mode')
+    parser.add_argument('--cameras', default=None,
+                        help='Several sources (camera indices or video files), e.g. 0,2: the first is shown, '
+                             'each other one runs in its own process and is fused in (see multicam.py)')
+    parser.add_argument('--fusion-skew', type=float, default=multicam.MAX_SKEW,
+                        help='Most seconds between frames of different cameras that are fused')
+    parser.add_argument('--view-offsets', default=None,
+                        help='Palm angle offset (deg) per --cameras source, for cameras mounted rotated')
+    capture.add_arguments(parser)
+    parser.add_argument('--mode', choices=['live', 'video'], default='live',
+                        help='live: camera + window; video: headless batch processing of --video')
+    parser.add_argument('--video', default=None, help='Video file for --mode video')
+    parser.add_argument('--out', default=None, help='Output JSON lines for --mode video (default: <video>.angles.jsonl)')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes for --mode video (default: CPU count)')
+    parser.add_argument('--chunk', type=int, default=300, help='Frames per work unit for --mode video')
+    parser.add_argument('--record', default=None,
+                        help='Append landmarks, angles and sent servo values to this recording (see recording.py)')
+    parser.add_argument('--journal', default=None,
+                        help='Write the servo targets sent to this motion journal (see handJournal.py)')
+    return parser
+
+
+# smoothing: one filter per hand (and per channel in full-hand mode), see filters.py
+FILTER = "ema"      # ema | oneeuro | kalman, optionally with ":key=value,..."
 SMOOTH_ALPHA = 0.2  # EMA smoothing factor applied to unit-vector components
 
 # --- Settings for sending to the hand program ---
 SEND_TO_HAND = True                     # toggle sending from tracker
-HAND_CHANNEL = 0                        # default servo channel to control
+HAND_CHANNEL = 0                        # palm servo channel of hand slot 0
+HAND_CHANNELS = None                    # palm channel per hand slot; None = HAND_CHANNEL + slot
+FULL_HAND_STRIDE = 16                   # full hand: slot k drives global channels 16k..16k+15
+MAX_HANDS = 2                           # hands tracked (and max_num_hands for MediaPipe)
 HAND_PORT = None                        # if None, handSerial will pick platform default
-SEND_INTERVAL = 0.20                    # seconds between sends (rate limit)
-SEND_DELTA = 2                          # minimum change in degrees to trigger a send
+SEND_SCHEDULE = "servo"                 # servo: model the sketch's ramp; fixed: interval/delta throttle
+SEND_INTERVAL = 0.20                    # fixed schedule: seconds between sends (rate limit)
+SEND_DELTA = 2                          # fixed schedule: minimum change in degrees to trigger a send
+SEND_FULL_HAND = False                  # send all 16 channels (see kinematics.py)
 
 # Mapping from camera angle to servo angle
 IN_MIN, IN_MAX = -90.0, 90.0            # camera-angle expected range (deg)
 OUT_MIN, OUT_MAX = 0, 270               # servo range expected by Arduino/sketch
 
-_last_sent_time = 0.0
-_last_sent_angle = None
-
-# Locate handSerial.py at repo root (two parents up from Applications/HandTracker)
-HAND_SERIAL_PY = Path(__file__).resolve().parents[2] / "handSerial.py"
-
-print("Starting hand tracker (press ESC to quit)")
-
-while True:
-    success, img = videoCap.read()
-    if not success:
-        time.sleep(0.01)
-        continue
-
-    imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-
-    # Calculate fps (robust)
-    thisFrameTime = time.time()
-    if lastFrameTime:
-        fps = 1.0 / max(1e-6, (thisFrameTime - lastFrameTime))
-    else:
-        fps = 0.0
-    lastFrameTime = thisFrameTime
-    cv2.putText(img, f'FPS:{int(fps)}', (20, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-
-    recHands = hands.process(imgRGB)
-
-    if recHands.multi_hand_landmarks:
+identities = HandIdentities(MAX_HANDS)  # stable hand slots with per-hand smoothing/send state
+scheduler = SendScheduler()             # ramp model per output channel; scores every command sent
+_warned_unrouted = False
+
+hand_link = None                        # HandLink (or handIpc.Publisher), opened in main() when sending
+publisher = None                        # handIpc.Publisher when --publish is given
+journal = None                          # handJournal.JournalWriter when --journal is given
+metrics = handTelemetry.Metrics("tracker")   # counters/histograms for --telemetry/--metrics-out
+timer = StageTimer(observer=lambda stage, ms: metrics.observe(stage + "_ms", ms))   # shown on the overlay
+clock = time.time                       # time source for the send throttle (replay swaps it)
+LOG_SENDS = True                        # print SENT lines
+
+
+def map_range(x, in_min, in_max, out_min, out_max):
+    # clamp x first
+    if x < in_min: x = in_min
+    if x > in_max: x = in_max
+    return (x - in_min) / (in_max - in_min) * (out_max - out_min) + out_min
+
+
+def smooth_angle(hand, cx, cy, t: float = 0.0, lead: float = 0.0):
+    """Filter the palm direction (unit vector cx, cy) of one hand. Returns degrees.
+
+    lead is the pipeline latency in seconds; predicting filters extrapolate
+    by it.
+    """
+    if hand.palm_filter is None:
+        hand.palm_filter = filters.make_filter(FILTER, circular=True, alpha=SMOOTH_ALPHA)
+    return float(hand.palm_filter(t, math.degrees(math.atan2(cy, cx)), lead))
+
+
+def smooth_servo(hand, values: np.ndarray, t: float, lead: float = 0.0) -> np.ndarray:
+    """Per-channel filter for one hand's finger servo targets."""
+    if hand.servo_filter is None:
+        hand.servo_filter = filters.make_filter(FILTER, alpha=SMOOTH_ALPHA)
+    return hand.servo_filter(t, values, lead)
+
+
+def palm_channel(slot: int) -> int:
+    return HAND_CHANNELS[slot] if HAND_CHANNELS and slot < len(HAND_CHANNELS) else HAND_CHANNEL + slot
+
+
+def hand_channels(slot: int) -> list:
+    """Global output channels of a hand slot in full-hand mode (kinematics channel order)."""
+    return [slot * FULL_HAND_STRIDE + ch for ch in range(kinematics.NUM_CHANNELS)]
+
+
+def send_due(hand, now: float, values: np.ndarray) -> bool:
+    """Fixed schedule: one send per SEND_INTERVAL per hand, and only after a SEND_DELTA change."""
+    if now - hand.last_sent_time < SEND_INTERVAL:
+        return False
+    return hand.last_sent is None or np.max(np.abs(values - hand.last_sent)) >= SEND_DELTA
+
+
+def hand_targets(hand, values: np.ndarray, out: np.ndarray, chans: list, limit: int, now: float) -> dict:
+    """Targets to send for one hand now, {channel: angle or (angle, speed)}.
+
+    With SEND_SCHEDULE "servo" each channel is decided on its own by the
+    scheduler (which may also set a speed); "fixed" sends all of the hand's
+    channels once the hand's throttle is due.
+    """
+    routed = [(ch, v) for ch, v in zip(chans, out) if 0 <= ch < limit]
+    if SEND_SCHEDULE == "fixed":
+        return {ch: int(v) for ch, v in routed} if send_due(hand, now, values) else {}
+    targets = {}
+    for ch, v in routed:
+        cmd = scheduler.decide(ch, float(v), now)
+        if cmd is not None:
+            angle, speed = cmd
+            targets[ch] = (int(round(angle)), None if speed is None else int(round(speed)))
+    return targets
+
+
+def send_hands(states, smoothed, servo, now: float) -> np.ndarray:
+    """Scheduled send for every tracked hand; returns the (hands, 16) values sent.
+
+    Each hand (or, with the servo schedule, each channel) is scheduled on its
+    own, and the targets of all hands go out together in one set_frame()
+    call. servo is the (hands, 16) full-hand target array, or None to send
+    only the palm angle of each hand on palm_channel(slot). Channels beyond
+    the link (e.g. a second hand's 16-31 on a single board) are skipped.
+    """
+    global _warned_unrouted
+    sent = np.full((len(states), kinematics.NUM_CHANNELS), np.nan, np.float32)
+    limit = getattr(hand_link, "num_channels", kinematics.NUM_CHANNELS)
+    targets, due = {}, []
+    for i, hand in enumerate(states):
+        if hand is None:
+            continue
+        if servo is not None:
+            values, out, chans = servo[i], np.round(servo[i]), hand_channels(hand.slot)
+        else:
+            values = np.array([smoothed[i]])
+            out = np.array([round(map_range(smoothed[i], IN_MIN, IN_MAX, OUT_MIN, OUT_MAX))])
+            chans = [palm_channel(hand.slot)]
+        if not any(0 <= ch < limit for ch in chans):
+            if not _warned_unrouted:
+                print(f"WARNING: hand slot {hand.slot} channels {chans[0]}-{chans[-1]} "
+                      f"are not on the hand link ({limit} channels)", file=sys.stderr)
+                _warned_unrouted = True
+            continue
+        routed = hand_targets(hand, values, out, chans, limit, now)
+        if not routed:
+            continue
+        targets.update(routed)
+        due.append((i, hand, values, routed))
+
+    # queue on the open link; the writer thread does the serial I/O
+    if not targets or not hand_link.set_frame(targets):
+        return sent
+    metrics.inc("sends")
+    metrics.inc("send_channels", len(targets))
+    if journal is not None:
+        journal.write(now, targets)
+    for ch, val in targets.items():
+        angle, speed = (val if isinstance(val, tuple) else (val, None))
+        scheduler.record(ch, angle, speed, now)
+    for i, hand, values, routed in due:
+        hand.last_sent_time = now
+        hand.last_sent = values.copy()
+        for ch, val in routed.items():
+            sent[i, ch % kinematics.NUM_CHANNELS] = val[0] if isinstance(val, tuple) else val
+        if not LOG_SENDS:
+            continue
+        if servo is not None:
+            print(f"SENT frame hand {hand.slot} " + format_frame(routed)[2:])
+        else:
+            ch, val = next(iter(routed.items()))
+            angle, speed = (val if isinstance(val, tuple) else (val, None))
+            print(f"SENT {angle} (servo) from camera angle {smoothed[i]:.2f} "
+                  f"hand {hand.slot} ch {ch}" + ("" if speed is None else f" speed {speed}"))
+    return sent
+
+
+def draw_hands(img, pts, palm, smoothed):
+    """Overlay for every hand; pts is (hands, 21, 2) pixel coordinates."""
+    import cv2
+    # skeleton and all landmarks in two batched calls (a zero-length segment
+    # per landmark draws a round dot)
+    cv2.polylines(img, [c for hand in pts for c in (hand[chain] for chain in kinematics.SKELETON)],
+                  False, (120, 120, 120), 1)
+    dots = np.repeat(pts.reshape(-1, 1, 2), 2, axis=1)
+    cv2.polylines(img, dots, False, (150, 50, 200), 8)
+
+    for i, hand in enumerate(pts):
+        (wx, wy), (mx, my) = hand[kinematics.WRIST], hand[kinematics.MIDDLE_MCP]
+
+        # Draw reference points and line
+        cv2.circle(img, (wx, wy), 6, (0, 255, 255), cv2.FILLED)
+        cv2.circle(img, (mx, my), 6, (255, 0, 255), cv2.FILLED)
+        cv2.line(img, (wx, wy), (mx, my), (200, 200, 0), 2)
+
+        # Display angles and palm width
+        cv2.putText(img, f'A1:{int(math.degrees(palm["a1"][i]))}d', (wx + 10, wy - 30), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255,255,0), 2)
+        cv2.putText(img, f'A2:{int(math.degrees(palm["a2"][i]))}d', (wx + 10, wy - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255,200,0), 2)
+        cv2.putText(img, f'H{palm["id"][i]} Sm:{int(smoothed[i])}d', (wx + 10, wy + 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0,255,0), 2)
+        cv2.putText(img, f'PW:{palm["pw_frac"][i]:.2f}', (wx + 10, wy + 30), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200,200,200), 1)
+
+
+def process_hands(lm, labels, w_img, h_img, latency: float = 0.0, fused=None):
+    """Angle, smoothing and send path for one frame (no drawing).
+
+    lm is the (hands, 21, 3) landmark array from kinematics.landmarks_array and
+    labels the matching handedness labels ("Left"/"Right"). Returns the palm
+    angles dict (plus "id", the stable hand slot per hand, -1 if untracked),
+    the smoothed angle per hand and a (hands, 16) array of the servo values
+    sent (NaN where nothing was sent). latency (seconds since capture) is the
+    lead for predicting filters. fused, from multicam.Fusion.fuse, replaces
+    the palm direction with the one fused over all camera views.
+    """
+    now = clock()
+    with timer.measure("angle"):
+        # palm orientation (and finger flexion) for all hands in one pass;
+        # left hands are flipped to keep a consistent direction
+        left = [i < len(labels) and labels[i].lower().startswith('l') for i in range(len(lm))]
+        palm = kinematics.palm_angles(lm, w_img, h_img, left)
+        if fused is not None:
+            palm["cx"], palm["cy"] = fused["cx"], fused["cy"]
+            palm["angle"] = np.degrees(np.arctan2(fused["cy"], fused["cx"]))
+        states = identities.assign(lm, labels, now)
+        palm["id"] = np.array([-1 if h is None else h.slot for h in states], np.int8)
+        smoothed = [smooth_angle(h, cx, cy, now, latency) if h is not None else math.degrees(math.atan2(cy, cx))
+                    for h, cx, cy in zip(states, palm["cx"], palm["cy"])]
+        servo = None
+        if SEND_FULL_HAND:
+            servo = kinematics.servo_targets(np.array(smoothed), kinematics.joint_flexion(lm, w_img, h_img))
+            servo[:, 0] = [map_range(a, IN_MIN, IN_MAX, OUT_MIN, OUT_MAX) for a in smoothed]
+            for i, h in enumerate(states):
+                if h is not None:
+                    servo[i, 1:] = smooth_servo(h, servo[i, 1:], now, latency)
+
+    sent = np.full((len(lm), kinematics.NUM_CHANNELS), np.nan, np.float32)
+    if SEND_TO_HAND:
+        # Map smoothed camera-space angles to servo angles and send via the hand link
+        with timer.measure("send"):
+            sent = send_hands(states, smoothed, servo, now)
+    return palm, smoothed, sent
+
+
+def handle_result(img, lm, labels, latency: float = 0.0, draw: bool = True, fused=None):
+    """Render/send stage for one frame; returns process_hands()' result or None."""
+    if len(lm) == 0:
+        return None
+
+    h_img, w_img, _ = img.shape
+    palm, smoothed, sent = process_hands(lm, labels, w_img, h_img, latency, fused)
+
+    # Print the smoothed angle to stdout (one line per tracked hand)
+    # Format: ANGLE <hand_slot> <degrees>
+    for hand_id, smoothed_angle in zip(palm["id"], smoothed):
+        if hand_id < 0:
+            continue
+        print(f"ANGLE {hand_id} {smoothed_angle:.2f}")
+        if publisher is not None:
+            publisher.publish_angle(int(hand_id), smoothed_angle)
+
+    if draw:
+        with timer.measure("draw"):
+            draw_hands(img, kinematics.to_pixels(lm, w_img, h_img), palm, smoothed)
+    return palm, smoothed, sent
+
+
+def phase(name: str, t0: float, t: float = None):
+    """Report a startup phase: PHASE <name> <ms from t0 to t (default: now)>."""
+    t = time.monotonic() if t is None else t
+    print(f"PHASE {name} {(t - t0) * 1000.0:.0f}ms", flush=True)
+
+
+def standby_commands(active: threading.Event, quitting: threading.Event):
+    """stdin reader for --standby: "start", "stop" and "quit" (EOF quits too)."""
+    for raw in sys.stdin:
+        cmd = raw.strip().lower()
+        if cmd == "start":
+            active.set()
+        elif cmd == "stop":
+            active.clear()
+        elif cmd == "quit":
+            break
+        elif cmd:
+            print(f"WARNING: unknown standby command {cmd!r}", file=sys.stderr)
+    active.clear()
+    quitting.set()
+
+
+def main(argv=None):
+    global SEND_TO_HAND, SEND_FULL_HAND, SEND_SCHEDULE, HAND_PORT, HAND_CHANNEL, HAND_CHANNELS, FILTER, \
+        hand_link, publisher, journal
+    known_args, _ = build_parser().parse_known_args(argv)
+    # camera/OpenCV modules imported here so replay loads without them
+    import cv2
+    import capture
+    import multicam
+    from keyframe import KeyframeScheduler
+    from roi import RoiInference
+    SEND_TO_HAND = SEND_TO_HAND and not known_args.no_send
+    SEND_FULL_HAND = SEND_FULL_HAND or known_args.full_hand
+    SEND_SCHEDULE = known_args.schedule or SEND_SCHEDULE
+    HAND_PORT = known_args.port or HAND_PORT
+    if known_args.channel is not None:
+        HAND_CHANNEL = known_args.channel
+    if known_args.channels:
+        HAND_CHANNELS = [int(c) for c in known_args.channels.split(",")]
+    if known_args.filter:
+        try:
+            filters.make_filter(known_args.filter)
+        except ValueError as e:
+            print(f"ERROR: --filter: {e}", file=sys.stderr)
+            return 2
+        FILTER = known_args.filter
+
+    # Offline mode: no camera, window or serial link
+    if known_args.mode == 'video':
+        if not known_args.video:
+            print("ERROR: --mode video needs --video <file>", file=sys.stderr)
+            return 2
+        import video_batch
+        out = known_args.out or str(Path(known_args.video).with_suffix(".angles.jsonl"))
+        return video_batch.run(known_args.video, out, known_args.workers, known_args.chunk)
+
+    # One serial link for the whole session (opened once, reconnects on failure),
+    # or publish to a hand server that owns the port
+    t = time.monotonic()
+    if known_args.publish:
+        publisher = handIpc.Publisher(known_args.publish)
+        if SEND_TO_HAND and not known_args.net:
+            hand_link = publisher
+    if known_args.net and SEND_TO_HAND:
+        try:
+            hand_link = handNet.NetPublisher(known_args.net)
+        except (OSError, ValueError) as e:
+            print(f"ERROR: --net: {e}", file=sys.stderr)
+            return 2
+    elif SEND_TO_HAND and not known_args.publish:
+        try:
+            hand_link = open_link(HAND_PORT, protocol=known_args.protocol, metrics=metrics)
+        except ValueError as e:
+            print(f"ERROR: --port: {e}", file=sys.stderr)
+            return 2
+        hand_link.connect()
+    phase("link", t)
+    if known_args.journal and SEND_TO_HAND:
+        journal = JournalWriter(known_args.journal)
+
+    # Hand initialization (imported here so replay/offline tools load without MediaPipe)
+    t = time.monotonic()
+    import mediapipe as mp
+    phase("import", t)
+    t = time.monotonic()
+    handSolution = mp.solutions.hands
+    hands = handSolution.Hands(static_image_mode=False, max_num_hands=MAX_HANDS,
+                               min_detection_confidence=0.5, min_tracking_confidence=0.5)
+    # one blank frame builds the graph and loads the models before the first real one
+    hands.process(np.zeros((240, 320, 3), np.uint8))
+    phase("model", t)
+
+    # optional ROI crop / adaptive input scale around hands.process (see roi.py)
+    roi_infer = None
+    if known_args.roi or known_args.target_fps:
+        roi_infer = RoiInference(hands, crop=known_args.roi, pad=known_args.roi_pad,
+                                 target_fps=known_args.target_fps)
+
+    def detect(img):
+        if roi_infer is not None:
+            with timer.measure("inference"):
+                return roi_infer.process(img)
+        with timer.measure("convert"):
+            imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        with timer.measure("inference"):
+            recHands = hands.process(imgRGB)
         # multi_hand_landmarks and multi_handedness are aligned by index
-        handedness = []
-        if recHands.multi_handedness:
-            handedness = [h.classification[0].label for h in recHands.multi_handedness]
-
-        for i, hand in enumerate(recHands.multi_hand_landmarks):
-            h_img, w_img, _ = img.shape
-
-            # Landmark indices: 0 = wrist, 9 = middle_finger_mcp, 5 = index_finger_mcp, 17 = pinky_mcp
-            w = hand.landmark[0]
-            m = hand.landmark[9]
-            idx = hand.landmark[5]
-            pinky = hand.landmark[17]
-
-            # screen coordinates (pixels)
-            wx, wy = int(w.x * w_img), int(w.y * h_img)
-            mx, my = int(m.x * w_img), int(m.y * h_img)
-            ix, iy = int(idx.x * w_img), int(idx.y * h_img)
-            px, py = int(pinky.x * w_img), int(pinky.y * h_img)
-
-            # Compute two candidate angles:
-            #  - a1: wrist -> middle_mcp (gives direction of fingers relative to wrist)
-            #  - a2: index_mcp -> pinky_mcp (gives palm orientation across the hand)
-            dx1 = mx - wx
-            dy1 = my - wy
-            a1 = math.atan2(dy1, dx1)
-
-            dx2 = px - ix
-            dy2 = py - iy
-            a2 = math.atan2(dy2, dx2)
-
-            # Palm width as a simple reliability measure (pixels)
-            palm_width = math.hypot(dx2, dy2)
-
-            # Normalize palm width to 0..1 based on empirical min/max (as fraction of image width)
-            pw_frac = palm_width / max(1.0, w_img)
-            PW_MIN = 0.04   # when palm is very narrow (closed), prefer a1
-            PW_MAX = 0.20   # when palm is wide (open hand), prefer a2
-            t = (pw_frac - PW_MIN) / (PW_MAX - PW_MIN)
-            t = max(0.0, min(1.0, t))
-
-            # combine angles as weighted average of unit vectors (avoids wrap issues)
-            cx = (1.0 - t) * math.cos(a1) + t * math.cos(a2)
-            cy = (1.0 - t) * math.sin(a1) + t * math.sin(a2)
-            # if both vectors cancel out (very small magnitude), fall back to a1
-            mag = math.hypot(cx, cy)
-            if mag < 1e-3:
-                cx, cy = math.cos(a1), math.sin(a1)
-
-            # Normalize
-            cx /= math.hypot(cx, cy)
-            cy /= math.hypot(cx, cy)
-
-            # Normalize sign for handedness to keep consistent direction (optional)
-            if i < len(handedness) and handedness[i].lower().startswith('l'):
-                cx, cy = -cx, -cy
-
-            # Circular smoothing: EMA on unit-vector components
-            if smoothed_x is None:
-                smoothed_x = cx
-                smoothed_y = cy
-            else:
-                smoothed_x = SMOOTH_ALPHA * cx + (1 - SMOOTH_ALPHA) * smoothed_x
-                smoothed_y = SMOOTH_ALPHA * cy + (1 - SMOOTH_ALPHA) * smoothed_y
-
-            # derive angle in degrees from smoothed vector
-            smoothed_angle = math.degrees(math.atan2(smoothed_y, smoothed_x))
-            angle_deg = math.degrees(math.atan2(cy, cx))
-
-            # Draw reference points and line
-            cv2.circle(img, (wx, wy), 6, (0, 255, 255), cv2.FILLED)
-            cv2.circle(img, (mx, my), 6, (255, 0, 255), cv2.FILLED)
-            cv2.line(img, (wx, wy), (mx, my), (200, 200, 0), 2)
-
-            # Display angles and palm width
-            cv2.putText(img, f'A1:{int(math.degrees(a1))}d', (wx + 10, wy - 30), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255,255,0), 2)
-            cv2.putText(img, f'A2:{int(math.degrees(a2))}d', (wx + 10, wy - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255,200,0), 2)
-            cv2.putText(img, f'Sm:{int(smoothed_angle)}d', (wx + 10, wy + 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0,255,0), 2)
-            cv2.putText(img, f'PW:{pw_frac:.2f}', (wx + 10, wy + 30), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200,200,200), 1)
-
-            # Print the smoothed angle to stdout (one line per detected hand)
-            # Format: ANGLE <hand_index> <degrees>
-            print(f"ANGLE {i} {smoothed_angle:.2f}")
-
-            # Map smoothed camera-space angle to servo angle and send via handSerial.py
-            def map_range(x, in_min, in_max, out_min, out_max):
-                # clamp x first
-                if x < in_min: x = in_min
-                if x > in_max: x = in_max
-                return (x - in_min) / (in_max - in_min) * (out_max - out_min) + out_min
-
-            def try_send_to_hand(angle_deg: float):
-                global _last_sent_time, _last_sent_angle
-                now = time.time()
-                if now - _last_sent_time < SEND_INTERVAL:
-                    return
-                if _last_sent_angle is not None and abs(angle_deg - _last_sent_angle) < SEND_DELTA:
-                    return
-
-                # map
-                servo_val = int(round(map_range(angle_deg, IN_MIN, IN_MAX, OUT_MIN, OUT_MAX)))
-
-                # build args
-                args = [sys.executable, str(HAND_SERIAL_PY), "--channel", str(HAND_CHANNEL), "--angle", str(servo_val)]
-                if HAND_PORT:
-                    args += ["--port", str(HAND_PORT)]
-
-                # start subprocess (non-blocking). It will open serial, send the command and exit.
-                try:
-                    subprocess.Popen(args)
-                    _last_sent_time = now
-                    _last_sent_angle = angle_deg
-                    print(f"SENT {servo_val} (servo) from camera angle {angle_deg:.2f}")
-                except Exception as e:
-                    print(f"ERROR launching handSerial: {e}", file=sys.stderr)
-
-            if SEND_TO_HAND:
-                try_send_to_hand(smoothed_angle)
-
-            # Draw all landmarks for clarity
-            for datapoint_id, point in enumerate(hand.landmark):
-                x, y = int(point.x * w_img), int(point.y * h_img)
-                cv2.circle(img, (x, y), 4, (150, 50, 200), cv2.FILLED)
-
-    cv2.imshow("CamOutput", img)
-    key = cv2.waitKey(1) & 0xFF
-    if key == 27:  # ESC
-        break
-
-videoCap.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+        return (kinematics.landmarks_array(recHands.multi_hand_landmarks),
+                [h.classification[0].label for h in recHands.multi_handedness or []], recHands)
+
+    # optional keyframing: MediaPipe every N frames, optical flow in between (see keyframe.py)
+    keyframes = None
+    if known_args.keyframe:
+        keyframes = KeyframeScheduler(detect, known_args.target_fps or 30.0, known_args.keyframe_max,
+                                      known_args.keyframe_motion)
+
+    def infer(pkt):
+        if keyframes is not None:
+            pkt.landmarks, pkt.labels, pkt.result = keyframes.process(pkt.image)
+        else:
+            pkt.landmarks, pkt.labels, pkt.result = detect(pkt.image)
+
+    # extra camera views: one worker process each, fused per frame (see multicam.py)
+    cam_args = capture.camera_args(known_args)
+    sources = [multicam.parse_source(s) for s in (known_args.cameras or "").split(",") if s.strip()]
+    source = sources[0] if sources else known_args.camera
+    fusion = views = None
+    if len(sources) > 1:
+        t = time.monotonic()
+        offsets = [float(o) for o in known_args.view_offsets.split(",")] if known_args.view_offsets else None
+        fusion = multicam.Fusion(len(sources), known_args.fusion_skew, offsets)
+        views = multicam.ViewPool(sources[1:], fusion, MAX_HANDS, keep_open=known_args.standby_camera,
+                                  camera_args=cam_args)
+        views.start()
+        if not views.wait_ready():
+            print("WARNING: camera views not ready: " + ("; ".join(views.errors) or "timeout"), file=sys.stderr)
+        phase("views", t)
+
+    recorder = None
+    t_start = time.monotonic()
+    rings = {}                  # current session's frame rings, for the drop gauges
+    videoCap = None
+
+    def collect(m):
+        if isinstance(videoCap, capture.Camera):
+            st = videoCap.stats()
+            if st["fps"] is not None:
+                m.gauge("capture_fps", st["fps"])
+            m.gauge("capture_drained", st["drained"])
+        if "frames" in rings:
+            m.gauge("dropped_capture", rings["frames"].dropped)
+            m.gauge("dropped_inference", rings["results"].dropped)
+        if hand_link is not None and hasattr(hand_link, "stats"):
+            st = hand_link.stats(reset_rate=False)
+            m.gauge("coalesced", st["coalesced"])
+            m.gauge("dropped", st["dropped"])
+        if publisher is not None:
+            m.gauge("ipc_dropped", publisher.dropped)
+        if isinstance(hand_link, handNet.NetPublisher):
+            if hand_link.rtt_ms is not None:
+                m.gauge("net_rtt_ms", hand_link.rtt_ms)
+            if hand_link.remote.get("latency_ms") is not None:
+                m.gauge("net_latency_ms", hand_link.remote["latency_ms"])
+        if fusion is not None:
+            m.gauge("fusion_rescued", fusion.rescued)
+            for v, st in enumerate(fusion.stats[1:], 1):
+                m.gauge(f"view{v}_used", st.used)
+                m.gauge(f"view{v}_missed", st.missed)
+                if st.skew_ms is not None:
+                    m.gauge(f"view{v}_skew_ms", st.skew_ms)
+        sched = scheduler.stats(clock())
+        m.gauge("sched_useful", sched["useful"])
+        if sched["efficiency"] is not None:
+            m.gauge("sched_efficiency", sched["efficiency"])
+
+    reporter = None
+    if known_args.telemetry or known_args.metrics_out:
+        reporter = handTelemetry.Reporter(metrics, known_args.telemetry, known_args.metrics_out,
+                                          collect=collect)
+        reporter.start()
+
+    # the cv2 window (and ESC) unless running headless; overlays are drawn
+    # unless the preview carries raw frames and the UI draws them
+    show_window = not known_args.headless
+    draw = show_window or (known_args.preview and not known_args.preview_raw)
+    preview = None
+    preview_due = 0.0
+
+    def publish_preview(pkt, out):
+        nonlocal preview, preview_due
+        now = time.monotonic()
+        if now < preview_due:
+            return
+        preview_due = now + 1.0 / max(1.0, known_args.preview_fps)
+        img = pkt.image
+        if preview is None or (preview.height, preview.width) != img.shape[:2]:
+            if preview is not None:
+                preview.close()
+            preview = handPreview.PreviewWriter(known_args.preview, img.shape[1], img.shape[0],
+                                                raw=known_args.preview_raw)
+        hands = []
+        if out is not None:
+            palm, smoothed, _ = out
+            hands = [(hid, smoothed[i], pkt.landmarks[i]) for i, hid in enumerate(palm["id"])]
+        with timer.measure("preview"):
+            preview.publish(img, hands)
+
+    def session(videoCap, active, t0):
+        """Run capture -> inference -> render until ESC or ``active`` is cleared.
+
+        Returns True if the user pressed ESC. t0 is when the session was
+        requested; the first frame, result and send are reported against it.
+        """
+        nonlocal recorder
+        # capture -> inference -> render, each stage on its own thread; the
+        # rings keep only the newest frames so no stage works through a backlog
+        stop = threading.Event()
+        frames = FrameRing(known_args.ring_size)
+        results = FrameRing(known_args.ring_size)
+        rings.update(frames=frames, results=results)
+        capture_stage = CaptureStage(videoCap, frames, timer, stop)
+        inference = InferenceStage(infer, frames, results, timer, stop)
+        capture_stage.start()
+        inference.start()
+        if views is not None:
+            views.resume()
+        first = {"frame", "result", "send"}
+
+        lastFrameTime = 0.0
+        try:
+            while active.is_set():
+                pkt = results.get(timeout=0.5)
+                if pkt is None:
+                    if results.closed:
+                        return False
+                    continue
+                img = pkt.image
+                if "frame" in first:
+                    first.discard("frame")
+                    phase("first_frame", t0, pkt.t_capture)
+
+                # Calculate fps (robust)
+                thisFrameTime = time.time()
+                if lastFrameTime:
+                    fps = 1.0 / max(1e-6, (thisFrameTime - lastFrameTime))
+                else:
+                    fps = 0.0
+                lastFrameTime = thisFrameTime
+
+                fused = None
+                if fusion is not None:
+                    with timer.measure("fusion"):
+                        primary = multicam.Observation(0, pkt.seq, pkt.t_capture, img.shape[1], img.shape[0],
+                                                       pkt.landmarks, pkt.labels,
+                                                       multicam.scores_of(pkt.result, len(pkt.landmarks)))
+                        pkt.landmarks, pkt.labels, fused = fusion.fuse(primary)
+
+                with timer.measure("render"):
+                    # the predicting filters lead by the time since the frame was captured
+                    out = handle_result(img, pkt.landmarks, pkt.labels, time.monotonic() - pkt.t_capture, draw,
+                                        fused)
+                if "result" in first:
+                    first.discard("result")
+                    phase("first_result", t0)
+                if out is not None and "send" in first and not np.all(np.isnan(out[2])):
+                    first.discard("send")
+                    phase("first_send", t0)
+
+                if known_args.record and out is not None:
+                    if recorder is None:
+                        recorder = recording.Recorder(known_args.record, img.shape[1], img.shape[0])
+                    palm, smoothed, sent = out
+                    recorder.write(pkt.t_capture - t_start, pkt.seq, pkt.landmarks, pkt.labels,
+                                   palm["angle"], smoothed, sent)
+
+                # camera-to-render latency and per-stage timings (ms)
+                latency_ms = (time.monotonic() - pkt.t_capture) * 1000.0
+                metrics.inc("frames")
+                metrics.observe("latency_ms", latency_ms)
+                if not draw:
+                    if known_args.preview:
+                        publish_preview(pkt, out)
+                    continue
+                cv2.putText(img, f'FPS:{int(fps)}  LAT:{int(latency_ms)}ms', (20, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+                cv2.putText(img, timer.summary(), (20, 55), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 0), 1)
+                cv2.putText(img, f'dropped cap:{frames.dropped} inf:{results.dropped}', (20, 75), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 0), 1)
+                if roi_infer is not None:
+                    cv2.putText(img, roi_infer.summary(), (20, 95), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 0), 1)
+                    if roi_infer.roi is not None:
+                        x0, y0, x1, y1 = roi_infer.roi
+                        cv2.rectangle(img, (x0, y0), (x1, y1), (0, 200, 255), 1)
+                if SEND_TO_HAND:
+                    cv2.putText(img, scheduler.summary(clock()), (20, 135), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 0), 1)
+                if isinstance(hand_link, handNet.NetPublisher):
+                    cv2.putText(img, hand_link.summary(), (20, 155), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 0), 1)
+                if fusion is not None:
+                    cv2.putText(img, fusion.summary(), (20, 175), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 0), 1)
+                if isinstance(videoCap, capture.Camera):
+                    cv2.putText(img, videoCap.summary(), (20, 195), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 0), 1)
+                if keyframes is not None:
+                    cv2.putText(img, keyframes.summary(), (20, 115), cv2.FONT_HERSHEY_SIMPLEX, 0.45,
+                                (0, 255, 0) if keyframes.last_kind == "key" else (0, 200, 255), 1)
+
+                if known_args.preview:
+                    publish_preview(pkt, out)
+                if not show_window:
+                    continue
+                cv2.imshow("CamOutput", img)
+                key = cv2.waitKey(1) & 0xFF
+                if key == 27:  # ESC
+                    return True
+            return False
+        finally:
+            stop.set()
+            if views is not None:
+                views.pause()
+            capture_stage.join(timeout=1.0)
+            inference.join(timeout=2.0)
+            if show_window:
+                cv2.destroyAllWindows()
+                cv2.waitKey(1)      # lets the window actually close while we sit idle
+
+    try:
+        if not known_args.standby:
+            t = time.monotonic()
+            # Open the selected camera (default 0)
+            videoCap = multicam.open_source(source, **cam_args)
+            phase("camera", t)
+            print("Starting hand tracker" + ("" if known_args.headless else " (press ESC to quit)"))
+            active = threading.Event()
+            active.set()
+            session(videoCap, active, t)
+            return 0
+
+        # Warm standby: everything above stays loaded; stdin switches between
+        # active and idle (see standby_commands)
+        if known_args.standby_camera:
+            t = time.monotonic()
+            videoCap = multicam.open_source(source, **cam_args)
+            phase("camera", t)
+        active, quitting = threading.Event(), threading.Event()
+        threading.Thread(target=standby_commands, args=(active, quitting), name="standby-stdin",
+                         daemon=True).start()
+        print("READY", flush=True)
+        while not quitting.is_set():
+            if not active.wait(0.2):
+                continue
+            t = time.monotonic()
+            print("ACTIVE", flush=True)
+            if videoCap is None:
+                videoCap = multicam.open_source(source, **cam_args)
+                phase("camera", t)
+            if session(videoCap, active, t):
+                active.clear()      # ESC goes back to idle, like "stop"
+            identities.reset()      # hands seen in this session start fresh next time
+            if isinstance(videoCap, capture.Camera):
+                print(videoCap.summary(), flush=True)
+            if not known_args.standby_camera:
+                videoCap.release()
+                videoCap = None
+            print("IDLE", flush=True)
+        return 0
+    finally:
+        if videoCap is not None:
+            if isinstance(videoCap, capture.Camera):
+                print(videoCap.summary(), flush=True)
+            videoCap.release()
+        if SEND_TO_HAND:
+            print(scheduler.summary(clock()), flush=True)
+        if isinstance(hand_link, handNet.NetPublisher):
+            print(hand_link.summary(), flush=True)
+        if views is not None:
+            print(fusion.summary(), flush=True)
+            views.close()
+        if hand_link is not None:
+            hand_link.close()
+        if publisher is not None:
+            publisher.close()
+        if recorder is not None:
+            recorder.close()
+        if journal is not None:
+            journal.close()
+        if reporter is not None:
+            reporter.close()
+        if preview is not None:
+            preview.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,123 @@
+"""Keyframe inference with optical-flow landmark propagation.
+
+KeyframeScheduler runs the expensive detector (hands.process, possibly via
+roi.RoiInference) only on keyframes. On the frames in between, the 21
+landmarks of every hand are carried forward with pyramidal Lucas-Kanade
+optical flow (cv2.calcOpticalFlowPyrLK), which costs a millisecond or two,
+and fed into the same angle computation as detected ones.
+
+A frame becomes a keyframe when:
+  - no hand is being tracked,
+  - ``interval`` frames have passed since the last keyframe,
+  - flow lost too many points of a hand, or failed the forward-backward check,
+  - the hand moved more than ``motion_px`` pixels since the last frame.
+
+``interval`` is retuned continuously from the measured costs: with an
+inference time I, a flow time F and a frame budget B = 1/target_fps, the
+average cost (I + (N-1) F) / N stays within B when
+N >= (I - F) / (B - F). It is clamped to 1..max_interval.
+"""
+
+import math
+import time
+
+import cv2
+import numpy as np
+
+LK_PARAMS = dict(winSize=(21, 21), maxLevel=3,
+                 criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03))
+
+
+class KeyframeScheduler:
+    def __init__(self, detect, target_fps: float = 30.0, max_interval: int = 6,
+                 motion_px: float = 25.0, max_fb_error: float = 2.0, min_tracked: float = 0.7):
+        self.detect = detect            # img_bgr -> (landmarks (hands, 21, 3), labels, result)
+        self.target_fps = target_fps
+        self.max_interval = max_interval
+        self.motion_px = motion_px      # per-frame motion that forces a keyframe
+        self.max_fb_error = max_fb_error
+        self.min_tracked = min_tracked  # fraction of a hand's points flow must keep
+        self.interval = 1
+        self.infer_ms = None            # EMA of detect() time
+        self.flow_ms = None             # EMA of a flow step
+        self.keyframes = 0
+        self.flow_frames = 0
+        self.last_kind = None           # "key" or "flow"
+        self._gray = None
+        self._lm = np.zeros((0, 21, 3), np.float32)
+        self._labels = []
+        self._since_key = 0
+
+    def process(self, img_bgr):
+        """Landmarks for this frame, detected or propagated: (landmarks, labels, result)."""
+        gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
+        h, w = gray.shape
+        if len(self._lm) and self._gray is not None and self._since_key < self.interval:
+            t0 = time.perf_counter()
+            lm = self._flow(gray, w, h)
+            self.flow_ms = self._ema(self.flow_ms, time.perf_counter() - t0)
+            if lm is not None:
+                self._gray = gray
+                self._lm = lm
+                self._since_key += 1
+                self.flow_frames += 1
+                self.last_kind = "flow"
+                return lm.copy(), list(self._labels), None
+
+        t0 = time.perf_counter()
+        lm, labels, result = self.detect(img_bgr)
+        self.infer_ms = self._ema(self.infer_ms, time.perf_counter() - t0)
+        self._gray = gray
+        self._lm = lm
+        self._labels = labels
+        self._since_key = 1
+        self.keyframes += 1
+        self.last_kind = "key"
+        self._retune()
+        return lm, labels, result
+
+    def _flow(self, gray, w: int, h: int):
+        """Propagate the landmarks into ``gray``; None when a keyframe is needed."""
+        lm = self._lm.copy()
+        p0 = (lm[..., :2] * (w, h)).reshape(-1, 1, 2).astype(np.float32)
+        p1, st, _ = cv2.calcOpticalFlowPyrLK(self._gray, gray, p0, None, **LK_PARAMS)
+        if p1 is None:
+            return None
+        back, st_b, _ = cv2.calcOpticalFlowPyrLK(gray, self._gray, p1, None, **LK_PARAMS)
+        fb = np.linalg.norm((back - p0).reshape(-1, 2), axis=1)
+        ok = (st.ravel() == 1) & (st_b.ravel() == 1) & (fb < self.max_fb_error)
+        ok = ok.reshape(len(lm), -1)
+        if np.any(ok.mean(axis=1) < self.min_tracked):
+            return None
+        d = (p1 - p0).reshape(len(lm), -1, 2)
+        # points flow lost follow the median motion of their hand
+        med = np.array([np.median(d[i][ok[i]], axis=0) for i in range(len(lm))])
+        d = np.where(ok[..., None], d, med[:, None, :])
+        if np.max(np.linalg.norm(med, axis=1)) > self.motion_px:
+            return None
+        lm[..., 0] += d[..., 0] / w
+        lm[..., 1] += d[..., 1] / h
+        return lm
+
+    def _retune(self):
+        if not self.target_fps or self.infer_ms is None:
+            return
+        budget = 1000.0 / self.target_fps
+        flow = self.flow_ms if self.flow_ms is not None else 0.0
+        if self.infer_ms <= budget:
+            n = 1
+        elif budget <= flow:
+            n = self.max_interval
+        else:
+            n = math.ceil((self.infer_ms - flow) / (budget - flow))
+        self.interval = max(1, min(self.max_interval, n))
+
+    @staticmethod
+    def _ema(old, seconds: float) -> float:
+        ms = seconds * 1000.0
+        return ms if old is None else old + 0.2 * (ms - old)
+
+    def summary(self) -> str:
+        total = max(1, self.keyframes + self.flow_frames)
+        return (f"key N={self.interval} inf:{self.infer_ms or 0:.1f} flow:{self.flow_ms or 0:.1f}ms "
+                f"key%:{100 * self.keyframes / total:.0f}")
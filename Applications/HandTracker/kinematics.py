@@ -0,0 +1,125 @@
+"""Vectorized hand kinematics on MediaPipe landmarks.
+
+All functions work on a (hands, 21, 3) float array of normalized landmarks
+(x, y in 0..1 of the image, z on roughly the same scale as x), so every
+detected hand is handled in one NumPy pass instead of per-point Python math.
+
+Servo channel layout produced by servo_targets():
+  channel 0      palm orientation (the tracker's original single angle)
+  channels 1-15  finger joint flexion, in JOINT_NAMES order
+"""
+
+import numpy as np
+
+NUM_LANDMARKS = 21
+NUM_CHANNELS = 16
+
+# Landmark indices
+WRIST = 0
+INDEX_MCP = 5
+MIDDLE_MCP = 9
+PINKY_MCP = 17
+
+# Joints as (parent, joint, child) landmark triplets; flexion is the angle
+# between the bone entering the joint and the bone leaving it (0 = straight).
+JOINTS = np.array([
+    (0, 1, 2), (1, 2, 3), (2, 3, 4),            # thumb CMC, MCP, IP
+    (0, 5, 6), (5, 6, 7), (6, 7, 8),            # index MCP, PIP, DIP
+    (0, 9, 10), (9, 10, 11), (10, 11, 12),      # middle
+    (0, 13, 14), (13, 14, 15), (14, 15, 16),    # ring
+    (0, 17, 18), (17, 18, 19), (18, 19, 20),    # pinky
+])
+JOINT_NAMES = [f"{finger}_{joint}" for finger, joints in (
+    ("thumb", ("cmc", "mcp", "ip")), ("index", ("mcp", "pip", "dip")),
+    ("middle", ("mcp", "pip", "dip")), ("ring", ("mcp", "pip", "dip")),
+    ("pinky", ("mcp", "pip", "dip"))) for joint in joints]
+
+# Bone chains for drawing the skeleton (one polyline per finger plus the palm)
+SKELETON = [np.array(c) for c in (
+    (0, 1, 2, 3, 4), (0, 5, 6, 7, 8), (9, 10, 11, 12), (13, 14, 15, 16),
+    (0, 17, 18, 19, 20), (5, 9, 13, 17))]
+
+# Palm width bounds (fraction of image width) for blending a1/a2
+PW_MIN = 0.04   # when palm is very narrow (closed), prefer a1
+PW_MAX = 0.20   # when palm is wide (open hand), prefer a2
+
+# Mapping to servo degrees: palm angle range and per-joint flexion range
+PALM_IN = (-90.0, 90.0)
+FLEX_IN = (0.0, 90.0)
+SERVO_OUT = (0.0, 270.0)
+
+
+def landmarks_array(multi_hand_landmarks) -> np.ndarray:
+    """MediaPipe multi_hand_landmarks -> (hands, 21, 3) float32 array."""
+    if not multi_hand_landmarks:
+        return np.zeros((0, NUM_LANDMARKS, 3), np.float32)
+    return np.array([[(p.x, p.y, p.z) for p in hand.landmark] for hand in multi_hand_landmarks],
+                    dtype=np.float32)
+
+
+def to_pixels(lm: np.ndarray, w_img: int, h_img: int) -> np.ndarray:
+    """(hands, 21, 3) normalized -> (hands, 21, 2) int32 pixel coordinates."""
+    return (lm[..., :2] * np.array([w_img, h_img], np.float32)).astype(np.int32)
+
+
+def palm_angles(lm: np.ndarray, w_img: int, h_img: int, left=None) -> dict:
+    """Palm orientation for every hand, same blend as the original tracker.
+
+    a1 is wrist -> middle MCP (finger direction), a2 is index MCP -> pinky MCP
+    (across the palm). They are blended as unit vectors weighted by palm width,
+    so a wide open palm trusts a2 and a narrow one falls back to a1. ``left``
+    is an optional bool array; left hands get their direction flipped.
+    Returns arrays of shape (hands,): a1, a2 (radians), pw_frac, cx, cy and
+    angle (degrees).
+    """
+    scale = np.array([w_img, h_img], np.float32)
+    pts = lm[..., :2] * scale
+    d1 = pts[:, MIDDLE_MCP] - pts[:, WRIST]
+    d2 = pts[:, PINKY_MCP] - pts[:, INDEX_MCP]
+    a1 = np.arctan2(d1[:, 1], d1[:, 0])
+    a2 = np.arctan2(d2[:, 1], d2[:, 0])
+
+    pw_frac = np.hypot(d2[:, 0], d2[:, 1]) / max(1.0, w_img)
+    t = np.clip((pw_frac - PW_MIN) / (PW_MAX - PW_MIN), 0.0, 1.0)
+
+    cx = (1.0 - t) * np.cos(a1) + t * np.cos(a2)
+    cy = (1.0 - t) * np.sin(a1) + t * np.sin(a2)
+    # if both vectors cancel out (very small magnitude), fall back to a1
+    weak = np.hypot(cx, cy) < 1e-3
+    cx = np.where(weak, np.cos(a1), cx)
+    cy = np.where(weak, np.sin(a1), cy)
+    mag = np.hypot(cx, cy)
+    cx, cy = cx / mag, cy / mag
+
+    if left is not None:
+        sign = np.where(np.asarray(left, bool), -1.0, 1.0)
+        cx, cy = cx * sign, cy * sign
+
+    return {"a1": a1, "a2": a2, "pw_frac": pw_frac, "cx": cx, "cy": cy,
+            "angle": np.degrees(np.arctan2(cy, cx))}
+
+
+def joint_flexion(lm: np.ndarray, w_img: int, h_img: int) -> np.ndarray:
+    """Flexion of all 15 finger joints for every hand, (hands, 15) degrees."""
+    # isotropic scale so x, y and z are in comparable (pixel-like) units
+    p = lm * np.array([w_img, h_img, w_img], np.float32)
+    v_in = p[:, JOINTS[:, 1]] - p[:, JOINTS[:, 0]]
+    v_out = p[:, JOINTS[:, 2]] - p[:, JOINTS[:, 1]]
+    dot = np.einsum("hjk,hjk->hj", v_in, v_out)
+    norm = np.linalg.norm(v_in, axis=-1) * np.linalg.norm(v_out, axis=-1)
+    cos = np.clip(dot / np.maximum(norm, 1e-6), -1.0, 1.0)
+    return np.degrees(np.arccos(cos))
+
+
+def _map(x, in_range, out_range):
+    lo, hi = in_range
+    t = np.clip((x - lo) / (hi - lo), 0.0, 1.0)
+    return t * (out_range[1] - out_range[0]) + out_range[0]
+
+
+def servo_targets(palm_deg: np.ndarray, flexion: np.ndarray) -> np.ndarray:
+    """Palm angle (hands,) and flexion (hands, 15) -> servo degrees (hands, 16)."""
+    out = np.empty((len(palm_deg), NUM_CHANNELS), np.float32)
+    out[:, 0] = _map(np.asarray(palm_deg), PALM_IN, SERVO_OUT)
+    out[:, 1:] = _map(flexion, FLEX_IN, SERVO_OUT)
+    return out
@@ -0,0 +1,348 @@
+"""Extra camera views in worker processes, fused into the tracked hands.
+
+  python hand_tracker.py --cameras 0,2                  # camera 0 shown, camera 2 fused in
+  python hand_tracker.py --cameras 0,side.mp4 --fusion-skew 0.04 --view-offsets 0,90
+
+The tracker keeps its own capture -> inference pipeline for the first
+source, the one it shows, previews and records. Every other source (a camera
+index or a video file) gets a view worker: a spawned process with its own
+capture and MediaPipe Hands. Per frame it sends an Observation: the capture
+time (time.monotonic(), the same clock in every process), landmarks and,
+per hand, label, detection score, palm direction and pw_frac. Only these
+few hundred bytes cross the process boundary, never images, so each view
+costs one core and views scale with cores. Video files are played at their
+frame rate and loop (PacedCapture), so they line up with live cameras.
+
+Fusion picks, for each primary frame, the observation of every view closest
+to the frame's capture time and ignores views more than ``max_skew`` away.
+Hands are matched across views by handedness label (by order when there is
+no label). A hand's palm direction is the weighted mean of the unit vectors
+(cx, cy) of the views that see it, with weight = detection score * palm
+visibility (pw_frac mapped through kinematics.PW_MIN..PW_MAX, with a floor
+so an edge-on view still counts a little). A hand the primary view lost but
+another view still sees is taken from that view, landmarks included, so
+tracking carries on through occlusion.
+
+The views are assumed to share the primary camera's "up" (the palm angle is
+measured in the image plane); ``offsets`` adds a per-view angle in degrees
+for cameras mounted rotated.
+"""
+
+import math
+import multiprocessing
+import queue
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+import kinematics
+from capture import open_camera
+
+MAX_SKEW = 0.05             # seconds between a primary frame and a usable view observation
+HISTORY = 8                 # observations kept per view for timestamp matching
+MIN_VISIBILITY = 0.1        # weight floor for an edge-on palm (pw_frac at or below PW_MIN)
+QUEUE_SIZE = 16             # observations in flight from all views
+
+
+def parse_source(s: str):
+    """"2" -> camera index 2, anything else is a video file path."""
+    s = s.strip()
+    return int(s) if s.isdigit() else s
+
+
+def open_source(source, **camera_args):
+    """capture.Camera for a camera index, PacedCapture for a video file."""
+    if isinstance(source, str):
+        return PacedCapture(source)
+    return open_camera(source, **camera_args)
+
+
+class PacedCapture:
+    """cv2.VideoCapture of a file that reads at the file's frame rate and loops."""
+
+    def __init__(self, path: str, loop: bool = True):
+        self.cap = cv2.VideoCapture(path)
+        self.period = 1.0 / (self.cap.get(cv2.CAP_PROP_FPS) or 30.0)
+        self.loop = loop
+        self._due = None
+
+    def isOpened(self) -> bool:
+        return self.cap.isOpened()
+
+    def read(self):
+        now = time.monotonic()
+        if self._due is None or now - self._due > 1.0:
+            self._due = now                 # first read, or we fell far behind: resync
+        elif self._due > now:
+            time.sleep(self._due - now)
+        self._due += self.period
+        ok, img = self.cap.read()
+        if not ok and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, img = self.cap.read()
+        return ok, img
+
+    def release(self):
+        self.cap.release()
+
+
+class Observation:
+    """One view's hands at one capture time (picklable, no image)."""
+    __slots__ = ("view", "seq", "t_capture", "width", "height", "landmarks", "labels", "scores",
+                 "cx", "cy", "pw_frac", "infer_ms")
+
+    def __init__(self, view: int, seq: int, t_capture: float, width: int, height: int,
+                 landmarks: np.ndarray, labels, scores):
+        self.view = view
+        self.seq = seq
+        self.t_capture = t_capture
+        self.width, self.height = width, height
+        self.landmarks = landmarks
+        n = len(landmarks)
+        self.labels = (list(labels) + [""] * n)[:n]
+        self.scores = list(scores)
+        left = [lb.lower().startswith('l') for lb in self.labels]
+        palm = kinematics.palm_angles(landmarks, width, height, left)
+        self.cx, self.cy, self.pw_frac = palm["cx"], palm["cy"], palm["pw_frac"]
+        self.infer_ms = None
+
+    def weight(self, i: int) -> float:
+        vis = (self.pw_frac[i] - kinematics.PW_MIN) / (kinematics.PW_MAX - kinematics.PW_MIN)
+        return float(self.scores[i]) * min(1.0, max(MIN_VISIBILITY, float(vis)))
+
+
+def scores_of(result, n: int) -> list:
+    """Detection score per hand from a Hands result (1.0 where unknown, e.g. flow frames)."""
+    handed = getattr(result, "multi_handedness", None) or []
+    if len(handed) != n:
+        return [1.0] * n
+    return [float(h.classification[0].score) for h in handed]
+
+
+def _view_main(view: int, source, max_hands: int, out, active, stop, keep_open: bool, camera_args: dict):
+    """Worker process: capture and run Hands while ``active`` is set."""
+    import mediapipe as mp
+    hands = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=max_hands,
+                                     min_detection_confidence=0.5, min_tracking_confidence=0.5)
+    hands.process(np.zeros((240, 320, 3), np.uint8))
+    out.put(("ready", view, None))
+    cap = None
+    seq = 0
+    dropped = 0
+    try:
+        while not stop.is_set():
+            if not active.wait(0.2):
+                if cap is not None and not keep_open:
+                    cap.release()
+                    cap = None
+                continue
+            if cap is None:
+                cap = open_source(source, **camera_args)
+                if not cap.isOpened():
+                    out.put(("error", view, f"cannot open {source!r}"))
+                    return
+            ok, img = cap.read()
+            t_capture = getattr(cap, "t_frame", None) or time.monotonic()
+            if not ok:
+                time.sleep(0.01)
+                continue
+            t0 = time.perf_counter()
+            res = hands.process(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+            lm = kinematics.landmarks_array(res.multi_hand_landmarks)
+            labels = [h.classification[0].label for h in res.multi_handedness or []]
+            obs = Observation(view, seq, t_capture, img.shape[1], img.shape[0], lm, labels,
+                              scores_of(res, len(lm)))
+            obs.infer_ms = (time.perf_counter() - t0) * 1000.0
+            seq += 1
+            try:
+                out.put_nowait(("obs", view, (obs, dropped)))
+            except queue.Full:
+                dropped += 1        # the tracker is behind; it only wants the newest anyway
+    finally:
+        if cap is not None:
+            cap.release()
+
+
+class ViewStats:
+    __slots__ = ("received", "used", "missed", "dropped", "skew_ms", "infer_ms", "last_t")
+
+    def __init__(self):
+        self.received = 0           # observations from the worker
+        self.used = 0               # primary frames this view contributed to
+        self.missed = 0             # primary frames with no observation within max_skew
+        self.dropped = 0            # observations the worker could not queue
+        self.skew_ms = None         # EMA of |view capture time - primary capture time|
+        self.infer_ms = None
+        self.last_t = None
+
+
+class Fusion:
+    """Timestamp-matched, confidence-weighted fusion, see the module docstring.
+
+    View 0 is the primary; add() takes observations of views 1.. from any
+    thread, fuse() is called once per primary frame.
+    """
+
+    def __init__(self, views: int, max_skew: float = MAX_SKEW, offsets=None, history: int = HISTORY):
+        self.views = views
+        self.max_skew = max_skew
+        offsets = list(offsets or [])
+        self.offsets = [math.radians(offsets[v]) if v < len(offsets) else 0.0 for v in range(views)]
+        self._history = [deque(maxlen=history) for _ in range(views)]
+        self._lock = threading.Lock()
+        self.stats = [ViewStats() for _ in range(views)]
+        self.frames = 0
+        self.rescued = 0            # hand-frames taken from another view (primary lost the hand)
+
+    def add(self, obs: Observation, dropped: int = 0):
+        with self._lock:
+            self._history[obs.view].append(obs)
+            st = self.stats[obs.view]
+            st.received += 1
+            st.dropped = dropped
+            st.last_t = obs.t_capture
+            if obs.infer_ms is not None:
+                st.infer_ms = obs.infer_ms if st.infer_ms is None else st.infer_ms + 0.1 * (obs.infer_ms - st.infer_ms)
+
+    def match(self, t: float) -> list:
+        """The observation of each other view closest to time t, or None."""
+        out = []
+        with self._lock:
+            for v in range(1, self.views):
+                best = min(self._history[v], key=lambda o: abs(o.t_capture - t), default=None)
+                st = self.stats[v]
+                if best is None or abs(best.t_capture - t) > self.max_skew:
+                    st.missed += 1
+                    continue
+                skew = abs(best.t_capture - t) * 1000.0
+                st.skew_ms = skew if st.skew_ms is None else st.skew_ms + 0.1 * (skew - st.skew_ms)
+                st.used += 1
+                out.append(best)
+        return out
+
+    def _rotated(self, obs: Observation, i: int):
+        a = self.offsets[obs.view]
+        cx, cy = float(obs.cx[i]), float(obs.cy[i])
+        if a:
+            cx, cy = cx * math.cos(a) - cy * math.sin(a), cx * math.sin(a) + cy * math.cos(a)
+        return cx, cy
+
+    def fuse(self, primary: Observation):
+        """Fused hands for one primary frame: (landmarks, labels, {"cx", "cy", "views"}).
+
+        Hands seen by the primary view come first, in its order, with its
+        landmarks; hands only other views see follow. "views" is the number
+        of views that contributed to each hand.
+        """
+        self.frames += 1
+        groups, order = {}, []
+        for obs in [primary] + self.match(primary.t_capture):
+            used = set()
+            for i in range(len(obs.landmarks)):
+                key = obs.labels[i] if i < len(obs.labels) and obs.labels[i] else f"#{i}"
+                if key in used:
+                    key = f"{key}#{i}"
+                used.add(key)
+                if key not in groups:
+                    groups[key] = []
+                    order.append(key)
+                groups[key].append((obs, i))
+
+        lm, labels, cx, cy, views = [], [], [], [], []
+        for key in order:
+            members = groups[key]
+            weights = [obs.weight(i) for obs, i in members]
+            vx = sum(w * self._rotated(obs, i)[0] for w, (obs, i) in zip(weights, members))
+            vy = sum(w * self._rotated(obs, i)[1] for w, (obs, i) in zip(weights, members))
+            best = max(range(len(members)), key=weights.__getitem__)
+            if math.hypot(vx, vy) < 1e-6:
+                vx, vy = self._rotated(*members[best])
+            # primary landmarks when it has the hand, else the most confident view's
+            src, i = members[0] if members[0][0] is primary else members[best]
+            if src is not primary:
+                self.rescued += 1
+            lm.append(src.landmarks[i])
+            labels.append(src.labels[i] if i < len(src.labels) else "")
+            norm = math.hypot(vx, vy)
+            cx.append(vx / norm)
+            cy.append(vy / norm)
+            views.append(len(members))
+        lm = np.array(lm, np.float32).reshape(-1, kinematics.NUM_LANDMARKS, 3)
+        return lm, labels, {"cx": np.array(cx), "cy": np.array(cy), "views": views}
+
+    def summary(self) -> str:
+        parts = [f"views:{self.views} rescued:{self.rescued}"]
+        for v, st in enumerate(self.stats[1:], 1):
+            share = st.used / max(1, st.used + st.missed) * 100.0
+            skew = "-" if st.skew_ms is None else f"{st.skew_ms:.0f}"
+            inf = "-" if st.infer_ms is None else f"{st.infer_ms:.0f}"
+            parts.append(f"v{v} used:{share:.0f}% skew:{skew}ms inf:{inf}ms drop:{st.dropped}")
+        return "  ".join(parts)
+
+
+class ViewPool:
+    """One worker process per extra source, feeding a Fusion.
+
+    start() spawns the workers (they load their models right away); resume()
+    and pause() switch capture on and off, so warm standby keeps them loaded.
+    """
+
+    def __init__(self, sources: list, fusion: Fusion, max_hands: int = 2, keep_open: bool = False,
+                 camera_args: dict = None):
+        ctx = multiprocessing.get_context("spawn")
+        self.sources = sources
+        self.fusion = fusion
+        self._queue = ctx.Queue(QUEUE_SIZE)
+        self._active = ctx.Event()
+        self._stop = ctx.Event()
+        self._procs = [ctx.Process(target=_view_main, name=f"view-{v}",
+                                   args=(v, src, max_hands, self._queue, self._active, self._stop, keep_open,
+                                         camera_args or {}),
+                                   daemon=True)
+                       for v, src in enumerate(sources, 1)]
+        self.ready = set()
+        self.errors = []
+        self._collector = threading.Thread(target=self._collect, name="view-collect", daemon=True)
+
+    def start(self):
+        for p in self._procs:
+            p.start()
+        self._collector.start()
+
+    def wait_ready(self, timeout: float = 30.0) -> bool:
+        deadline = time.monotonic() + timeout
+        while len(self.ready) + len(self.errors) < len(self._procs) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return len(self.ready) == len(self._procs)
+
+    def resume(self):
+        self._active.set()
+
+    def pause(self):
+        self._active.clear()
+
+    def _collect(self):
+        while not self._stop.is_set():
+            try:
+                kind, view, payload = self._queue.get(timeout=0.2)
+            except (queue.Empty, OSError, EOFError):
+                continue
+            if kind == "obs":
+                self.fusion.add(*payload)
+            elif kind == "ready":
+                self.ready.add(view)
+            elif kind == "error":
+                self.errors.append(f"view {view}: {payload}")
+
+    def close(self, timeout: float = 2.0):
+        self._active.clear()
+        self._stop.set()
+        for p in self._procs:
+            p.join(timeout)
+            if p.is_alive():
+                p.terminate()
+        if self._collector.is_alive():
+            self._collector.join(timeout=0.5)
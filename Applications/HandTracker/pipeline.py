@@ -0,0 +1,153 @@
+"""Threaded capture -> inference -> render pipeline for the hand tracker.
+
+Each stage runs on its own thread and passes work to the next one through a
+FrameRing: a 1-2 slot buffer that keeps only the newest frames. A slow stage
+therefore never works through a backlog; it always picks up the freshest
+frame and the older ones are counted as dropped. StageTimer keeps a running
+average of how long each stage takes so the tracker can show where the time
+goes.
+
+Packets carry the frame's capture time: the camera's own timestamp when the
+capture object has one (capture.Camera.t_frame), else the time read()
+returned. The inference stage records how old each frame is when it starts
+on it ("age"), which is the part of the latency a camera's buffering adds.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class Packet:
+    """One camera frame travelling through the pipeline."""
+    __slots__ = ("seq", "t_capture", "image", "result", "landmarks", "labels", "t_inferred")
+
+    def __init__(self, seq: int, t_capture: float, image):
+        self.seq = seq
+        self.t_capture = t_capture      # time.monotonic() when the frame was captured
+        self.image = image
+        self.result = None              # filled in by the inference stage
+        self.landmarks = None           # (hands, 21, 3) array, see kinematics.py
+        self.labels = []                # handedness label per hand
+        self.t_inferred = None
+
+
+class FrameRing:
+    """Bounded buffer of the newest items; put() drops the oldest when full."""
+
+    def __init__(self, size: int = 2):
+        self._items = deque(maxlen=size)
+        self._cond = threading.Condition()
+        self.closed = False
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout: float = None):
+        """Return the newest item (discarding older ones), or None on timeout/close."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._items or self.closed, timeout)
+            if not self._items:
+                return None
+            item = self._items.pop()
+            self.dropped += len(self._items)
+            self._items.clear()
+            return item
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class StageTimer:
+    """Running average (EMA) of per-stage durations, in milliseconds.
+
+    ``observer(stage, ms)``, if set, also sees every single measurement
+    (the tracker feeds them to its telemetry histograms).
+    """
+
+    def __init__(self, alpha: float = 0.1, observer=None):
+        self.alpha = alpha
+        self.observer = observer
+        self._ms = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float):
+        ms = seconds * 1000.0
+        with self._lock:
+            old = self._ms.get(stage)
+            self._ms[stage] = ms if old is None else old + self.alpha * (ms - old)
+        if self.observer is not None:
+            self.observer(stage, ms)
+
+    @contextmanager
+    def measure(self, stage: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - t0)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._ms)
+
+    def summary(self) -> str:
+        return " ".join(f"{k}:{v:.1f}" for k, v in self.snapshot().items())
+
+
+class CaptureStage(threading.Thread):
+    """Reads frames from a cv2.VideoCapture-like object into a FrameRing."""
+
+    def __init__(self, cap, out: FrameRing, timer: StageTimer, stop: threading.Event):
+        super().__init__(name="capture", daemon=True)
+        self.cap = cap
+        self.out = out
+        self.timer = timer
+        self.stop = stop
+        self.frames = 0
+
+    def run(self):
+        while not self.stop.is_set():
+            t0 = time.perf_counter()
+            success, img = self.cap.read()
+            if not success:
+                time.sleep(0.01)
+                continue
+            self.timer.add("capture", time.perf_counter() - t0)
+            t_frame = getattr(self.cap, "t_frame", None)
+            self.out.put(Packet(self.frames, t_frame or time.monotonic(), img))
+            self.frames += 1
+        self.out.close()
+
+
+class InferenceStage(threading.Thread):
+    """Runs ``process(packet)`` on the newest captured frame, forwards the result."""
+
+    def __init__(self, process, inp: FrameRing, out: FrameRing, timer: StageTimer, stop: threading.Event):
+        super().__init__(name="inference", daemon=True)
+        self.process = process
+        self.inp = inp
+        self.out = out
+        self.timer = timer
+        self.stop = stop
+
+    def run(self):
+        while not self.stop.is_set():
+            pkt = self.inp.get(timeout=0.1)
+            if pkt is None:
+                if self.inp.closed:
+                    break
+                continue
+            self.timer.add("age", time.monotonic() - pkt.t_capture)
+            self.process(pkt)
+            pkt.t_inferred = time.monotonic()
+            self.out.put(pkt)
+        self.out.close()
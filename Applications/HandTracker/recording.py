@@ -0,0 +1,136 @@
+"""Append-only binary recording of tracking sessions.
+
+A recording is a 32-byte header followed by fixed-size records (one per
+detected hand per frame), so a reader can np.memmap the whole file without
+parsing:
+
+  header: magic "PRISMREC" | version u16 | record size u16 | width u32 | height u32 | padding
+  record: RECORD_DTYPE below
+
+Timestamps are seconds since the start of the recording. ``servo`` holds the
+values sent for that record (NaN for channels that were not sent).
+"""
+
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b"PRISMREC"
+VERSION = 1
+HEADER = struct.Struct("<8sHHII12x")
+HEADER_SIZE = HEADER.size   # 32
+
+HANDEDNESS = {"Right": 0, "Left": 1}
+
+RECORD_DTYPE = np.dtype([
+    ("t", "<f8"),                   # seconds since recording start
+    ("frame", "<u4"),               # frame counter
+    ("hand", "u1"),                 # index of the hand within the frame
+    ("handedness", "i1"),           # 0 right, 1 left, -1 unknown
+    ("sent", "u1"),                 # 1 if servo values were sent for this hand
+    ("_pad", "u1"),
+    ("angle", "<f4"),               # raw palm angle (deg)
+    ("smoothed", "<f4"),            # smoothed palm angle (deg)
+    ("servo", "<f4", (16,)),        # servo values sent, NaN if not sent
+    ("landmarks", "<f4", (21, 3)),  # normalized landmarks
+])
+
+
+class Recorder:
+    """Appends records to a recording file.
+
+    A new file gets the header first. When appending to an existing file,
+    frame numbers and timestamps continue after its last record so the file
+    stays one increasing timeline.
+    """
+
+    def __init__(self, path: str, width: int, height: int, flush_every: int = 64):
+        self.path = path
+        exists = os.path.exists(path) and os.path.getsize(path) >= HEADER_SIZE
+        if exists:
+            hdr = read_header(path)
+            if (hdr["width"], hdr["height"]) != (width, height):
+                raise ValueError(f"{path} was recorded at {hdr['width']}x{hdr['height']}, not {width}x{height}")
+        self.t_offset = 0.0
+        self.frame_offset = 0
+        if exists:
+            # drop a partially written trailing record so appends stay aligned
+            whole = (os.path.getsize(path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+            os.truncate(path, HEADER_SIZE + whole * RECORD_DTYPE.itemsize)
+            _, old = open_recording(path)
+            if len(old):
+                self.t_offset = float(old["t"][-1]) + 1.0
+                self.frame_offset = int(old["frame"][-1]) + 1
+            del old
+        self._f = open(path, "ab")
+        if not exists:
+            self._f.write(HEADER.pack(MAGIC, VERSION, RECORD_DTYPE.itemsize, width, height))
+        self._flush_every = flush_every
+        self._unflushed = 0
+        self.records = 0
+
+    def write(self, t: float, frame: int, lm: np.ndarray, labels, angles, smoothed, servo=None):
+        """Append one record per hand.
+
+        servo is an optional (hands, 16) array of values that were sent, NaN
+        where nothing was sent.
+        """
+        n = len(lm)
+        if n == 0:
+            return
+        rec = np.zeros(n, RECORD_DTYPE)
+        rec["t"] = t + self.t_offset
+        rec["frame"] = frame + self.frame_offset
+        rec["hand"] = np.arange(n)
+        rec["handedness"] = [HANDEDNESS.get(labels[i], -1) if i < len(labels) else -1 for i in range(n)]
+        rec["angle"] = angles
+        rec["smoothed"] = smoothed
+        rec["landmarks"] = lm
+        if servo is None:
+            rec["servo"] = np.nan
+        else:
+            rec["servo"] = servo
+            rec["sent"] = ~np.all(np.isnan(servo), axis=1)
+        self._f.write(rec.tobytes())
+        self.records += n
+        self._unflushed += 1
+        if self._unflushed >= self._flush_every:
+            self._f.flush()
+            self._unflushed = 0
+
+    def close(self):
+        self._f.close()
+
+
+def read_header(path: str) -> dict:
+    with open(path, "rb") as f:
+        raw = f.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE:
+        raise ValueError(f"{path}: truncated header")
+    magic, version, size, width, height = HEADER.unpack(raw)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a PRISM recording")
+    if version != VERSION or size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"{path}: unsupported recording version {version} (record size {size})")
+    return {"version": version, "width": width, "height": height}
+
+
+def open_recording(path: str):
+    """Return (header dict, read-only memmap of records).
+
+    A partially written trailing record (e.g. after a crash) is ignored.
+    """
+    hdr = read_header(path)
+    count = (os.path.getsize(path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+    if count == 0:
+        return hdr, np.zeros(0, RECORD_DTYPE)
+    return hdr, np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+
+def frame_slices(records) -> list:
+    """Split records into per-frame slices (records of a frame are contiguous)."""
+    if len(records) == 0:
+        return []
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(records["frame"])) + 1, [len(records)]))
+    return [slice(int(a), int(b)) for a, b in zip(starts[:-1], starts[1:])]
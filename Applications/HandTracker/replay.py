@@ -0,0 +1,204 @@
+"""Replay a recording through the tracker's angle/smoothing/send path.
+
+  python replay.py session.prec                    # as fast as possible, dry run
+  python replay.py session.prec --realtime         # at recorded speed (--speed 2 = twice as fast)
+  python replay.py session.prec --send --port /dev/ttyACM0
+  python replay.py session.prec --alpha 0.3 --schedule fixed --interval 0.1 --delta 1
+  python replay.py session.prec --filter kalman --lead 60   # predict 60 ms ahead
+  python replay.py session.prec --compare-filters          # ema vs oneeuro vs kalman
+  python replay.py session.prec --journal session.journal  # commands sent -> motion journal
+
+Recordings come from `hand_tracker.py --record session.prec` (see
+recording.py). Landmarks are fed back through kinematics.palm_angles,
+hand_tracker.smooth_angle and the send throttle, with the throttle clocked by
+the recorded timestamps, so runs are deterministic. Without --send, commands
+go to a DryLink that only counts them; this makes it cheap to tune
+SMOOTH_ALPHA and the send schedule offline. The summary includes the
+scheduler's command efficiency (commands that changed the modelled servo
+ramp vs. commands sent, see servo_schedule.py) for either schedule.
+
+Filters (see filters.py) are compared on jitter (frame-to-frame noise of the
+filtered palm angle) and lag: lag_deg is the mean distance from the raw
+angle, lag_ms the time shift that best aligns the filtered angle with the
+raw one (negative when a predicting filter runs ahead).
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+import hand_tracker as ht
+import recording
+from handDevices import open_link
+from handJournal import JournalWriter
+from servo_schedule import SendScheduler
+
+
+class DryLink:
+    """Stands in for HandLink when replaying without a board; counts commands."""
+
+    def __init__(self):
+        self.commands = 0
+
+    def set_angle(self, channel, angle, speed=None):
+        self.commands += 1
+        return True
+
+    def set_frame(self, targets):
+        self.commands += 1
+        return True
+
+    def close(self):
+        pass
+
+
+def best_shift(raw: np.ndarray, filtered: np.ndarray, max_shift: int = 15) -> int:
+    """Frame shift k minimizing |filtered[t] - raw[t - k]|; k > 0 means filtered lags."""
+    n = len(raw)
+    best, best_err = 0, float("inf")
+    for k in range(-max_shift, max_shift + 1):
+        if n - abs(k) < 2:
+            continue
+        a, b = (filtered[k:], raw[:n - k]) if k >= 0 else (filtered[:n + k], raw[-k:])
+        err = float(np.mean(np.abs(a - b)))
+        if err < best_err:
+            best, best_err = k, err
+    return best
+
+
+def replay(path: str, realtime: bool = False, speed: float = 1.0, link=None, lead: float = 0.0) -> dict:
+    """Run the recording through the send path; returns summary statistics."""
+    hdr, rec = recording.open_recording(path)
+    w_img, h_img = hdr["width"], hdr["height"]
+    slices = recording.frame_slices(rec)
+
+    now = [0.0]
+    ht.clock = lambda: now[0]
+    ht.hand_link = link or DryLink()
+    ht.identities.reset()
+    ht.scheduler = SendScheduler()
+    ht.SEND_TO_HAND = True
+    ht.LOG_SENDS = False
+
+    raw, smoothed_out, times, sends = [], [], [], 0
+    t0 = float(rec["t"][0]) if len(rec) else 0.0
+    wall0 = time.monotonic()
+    for sl in slices:
+        r = rec[sl]
+        t = float(r["t"][0])
+        if realtime:
+            delay = (t - t0) / speed - (time.monotonic() - wall0)
+            if delay > 0:
+                time.sleep(delay)
+        now[0] = t
+        labels = ["Left" if h == 1 else ("Right" if h == 0 else "") for h in r["handedness"]]
+        palm, smoothed, sent = ht.process_hands(np.asarray(r["landmarks"]), labels, w_img, h_img, lead)
+        sends += int(np.count_nonzero(~np.all(np.isnan(sent), axis=1)))
+        raw.append(palm["angle"][0])
+        smoothed_out.append(smoothed[0])
+        times.append(t)
+    wall = time.monotonic() - wall0
+
+    duration = float(rec["t"][-1]) - t0 if len(rec) else 0.0
+    raw = np.unwrap(np.radians(raw)) if raw else np.zeros(0)
+    sm = np.unwrap(np.radians(smoothed_out)) if smoothed_out else np.zeros(0)
+    sched = ht.scheduler.stats(now[0])    # scored up to the last frame
+    frame_dt = float(np.median(np.diff(times))) if len(times) > 1 else 0.0
+    return {
+        "filter": ht.FILTER,
+        "frames": len(slices),
+        "records": len(rec),
+        "duration_s": round(duration, 3),
+        "wall_s": round(wall, 3),
+        "speedup": round(duration / wall, 1) if wall > 0 else None,
+        "sends": sends,
+        "recorded_sends": int(np.count_nonzero(rec["sent"])) if len(rec) else 0,
+        "sends_per_s": round(sends / duration, 2) if duration > 0 else None,
+        "schedule": ht.SEND_SCHEDULE,
+        "commands": sched["sent"],
+        "useful": sched["useful"],
+        "efficiency": sched["efficiency"],
+        # frame-to-frame noise of the smoothed angle, and how far it trails the raw angle
+        "jitter_deg": round(float(np.degrees(np.std(np.diff(sm)))), 3) if len(sm) > 1 else None,
+        "lag_deg": round(float(np.degrees(np.mean(np.abs(sm - raw)))), 3) if len(sm) else None,
+        "lag_ms": round(best_shift(raw, sm) * frame_dt * 1000, 1) if len(sm) > 1 else None,
+    }
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Replay a tracker recording through the send path")
+    p.add_argument("recording")
+    p.add_argument("--realtime", action="store_true", help="Pace frames at recorded timestamps")
+    p.add_argument("--speed", type=float, default=1.0, help="Playback speed factor for --realtime")
+    p.add_argument("--alpha", type=float, default=None, help="Override SMOOTH_ALPHA")
+    p.add_argument("--schedule", choices=["servo", "fixed"], default=None,
+                   help="Send schedule (see hand_tracker.SEND_SCHEDULE)")
+    p.add_argument("--interval", type=float, default=None, help="Override SEND_INTERVAL (s, fixed schedule)")
+    p.add_argument("--delta", type=float, default=None, help="Override SEND_DELTA (deg, fixed schedule)")
+    p.add_argument("--filter", default=None, help="Motion filter spec, e.g. oneeuro:beta=0.03 (see filters.py)")
+    p.add_argument("--lead", type=float, default=0.0,
+                   help="Latency (ms) predicting filters compensate, as the live tracker measures it")
+    p.add_argument("--compare-filters", action="store_true",
+                   help="Replay with ema, oneeuro and kalman and print a jitter/lag table")
+    p.add_argument("--full-hand", action="store_true", help="Replay the 16-channel send path")
+    p.add_argument("--send", action="store_true", help="Send to the hand instead of a dry run")
+    p.add_argument("--port", default=None)
+    p.add_argument("--protocol", choices=["text", "binary", "auto"], default="text")
+    p.add_argument("--journal", default=None,
+                   help="Write the commands sent, at recorded times, to this motion journal (see handJournal.py)")
+    p.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = p.parse_args(argv)
+
+    if args.alpha is not None:
+        ht.SMOOTH_ALPHA = args.alpha
+    if args.interval is not None:
+        ht.SEND_INTERVAL = args.interval
+    if args.delta is not None:
+        ht.SEND_DELTA = args.delta
+    ht.SEND_FULL_HAND = args.full_hand
+    if args.schedule:
+        ht.SEND_SCHEDULE = args.schedule
+    if args.filter:
+        ht.FILTER = args.filter
+
+    if args.compare_filters:
+        rows = []
+        for spec in ("ema", "oneeuro", "kalman"):
+            ht.FILTER = spec
+            rows.append(replay(args.recording, lead=args.lead / 1000.0))
+        if args.json:
+            print(json.dumps(rows))
+        else:
+            print(f"{'filter':>10} {'jitter_deg':>11} {'lag_deg':>8} {'lag_ms':>7} {'sends/s':>8}")
+            for r in rows:
+                print(f"{r['filter']:>10} {r['jitter_deg']:>11} {r['lag_deg']:>8} {r['lag_ms']:>7} {r['sends_per_s']:>8}")
+        return 0
+
+    link = None
+    if args.send:
+        link = open_link(args.port, protocol=args.protocol)
+        if not link.connect():
+            return 2
+    if args.journal:
+        ht.journal = JournalWriter(args.journal)
+    try:
+        summary = replay(args.recording, args.realtime, args.speed, link, args.lead / 1000.0)
+    finally:
+        if link is not None:
+            link.close()
+        if ht.journal is not None:
+            ht.journal.close()
+
+    if args.json:
+        print(json.dumps(summary))
+    else:
+        for k, v in summary.items():
+            print(f"{k:>15}: {v}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
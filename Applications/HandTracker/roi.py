@@ -0,0 +1,119 @@
+"""ROI-cropped, adaptive-resolution hand inference.
+
+RoiInference wraps a MediaPipe Hands instance. With ``crop`` enabled it runs
+inference on a padded box around the last landmarks instead of the whole
+frame. The box only moves when the hand gets close to its edge, so the
+image MediaPipe sees stays steady between frames. When no hand is found in
+the box, the same frame is retried at full size and the box is dropped.
+Every ``full_every`` frames a full frame is processed anyway, so a second
+hand entering the view is picked up.
+
+With ``target_fps`` set, the input (crop or full frame) is also scaled down
+while inference is slower than the frame budget and back up when there is
+room, between ``min_scale`` and 1.0.
+
+Landmarks are always returned in normalized full-frame coordinates, the same
+as a plain ``hands.process()`` on the whole image.
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+import kinematics
+
+
+class RoiInference:
+    def __init__(self, hands, crop: bool = True, pad: float = 0.35, min_size: float = 0.2,
+                 target_fps: float = None, min_scale: float = 0.4, full_every: int = 30):
+        self.hands = hands
+        self.crop = crop
+        self.pad = pad                  # box padding, as a fraction of the hand size
+        self.min_size = min_size        # smallest box side, as a fraction of the frame
+        self.target_fps = target_fps
+        self.min_scale = min_scale
+        self.full_every = full_every
+        self.scale = 1.0                # current input scale
+        self.roi = None                 # (x0, y0, x1, y1) in pixels, or None for full frame
+        self.infer_ms = None            # EMA of hands.process time
+        self.frames = 0
+        self.full_frames = 0
+        self.fallbacks = 0              # ROI misses retried at full frame
+
+    def process(self, img_bgr):
+        """Run Hands on a BGR frame; returns (landmarks (hands, 21, 3), labels, result)."""
+        h, w = img_bgr.shape[:2]
+        self.frames += 1
+        roi = self.roi if self.crop and self.frames % self.full_every else None
+        lm, labels, result = self._run(img_bgr, roi)
+        if roi is not None and len(lm) == 0:
+            # tracking lost inside the box: look at the whole frame
+            self.fallbacks += 1
+            roi = None
+            lm, labels, result = self._run(img_bgr, None)
+        if roi is None:
+            self.full_frames += 1
+        if self.crop:
+            self.roi = self._next_roi(lm, w, h)
+        return lm, labels, result
+
+    def _run(self, img_bgr, roi):
+        h, w = img_bgr.shape[:2]
+        x0, y0, x1, y1 = roi if roi is not None else (0, 0, w, h)
+        view = img_bgr[y0:y1, x0:x1]
+        if self.scale < 1.0:
+            view = cv2.resize(view, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        rgb = cv2.cvtColor(view, cv2.COLOR_BGR2RGB)
+        t0 = time.perf_counter()
+        result = self.hands.process(rgb)
+        self._adapt(time.perf_counter() - t0)
+
+        lm = kinematics.landmarks_array(result.multi_hand_landmarks)
+        labels = [c.classification[0].label for c in result.multi_handedness or []]
+        if len(lm) and roi is not None:
+            # crop-normalized -> full-frame-normalized (z is scaled like x)
+            cw, ch = x1 - x0, y1 - y0
+            lm[..., 0] = (x0 + lm[..., 0] * cw) / w
+            lm[..., 1] = (y0 + lm[..., 1] * ch) / h
+            lm[..., 2] *= cw / w
+        return lm, labels, result
+
+    def _adapt(self, seconds: float):
+        ms = seconds * 1000.0
+        self.infer_ms = ms if self.infer_ms is None else self.infer_ms + 0.2 * (ms - self.infer_ms)
+        if not self.target_fps:
+            return
+        budget = 1000.0 / self.target_fps
+        if self.infer_ms > budget * 1.05:
+            self.scale = max(self.min_scale, self.scale * 0.9)
+        elif self.infer_ms < budget * 0.7:
+            self.scale = min(1.0, self.scale * 1.05)
+
+    def _next_roi(self, lm, w: int, h: int):
+        """Keep the current box while all hands stay well inside it, else rebuild it."""
+        if len(lm) == 0:
+            return None
+        xs, ys = lm[..., 0] * w, lm[..., 1] * h
+        bx0, by0, bx1, by1 = xs.min(), ys.min(), xs.max(), ys.max()
+        if self.roi is not None:
+            x0, y0, x1, y1 = self.roi
+            mx, my = (x1 - x0) * 0.1, (y1 - y0) * 0.1
+            if bx0 > x0 + mx and by0 > y0 + my and bx1 < x1 - mx and by1 < y1 - my:
+                return self.roi
+        size = max(bx1 - bx0, by1 - by0)
+        side = max(size * (1 + 2 * self.pad), self.min_size * max(w, h))
+        cx, cy = (bx0 + bx1) / 2, (by0 + by1) / 2
+        x0 = int(np.clip(cx - side / 2, 0, w))
+        y0 = int(np.clip(cy - side / 2, 0, h))
+        x1 = int(np.clip(cx + side / 2, 0, w))
+        y1 = int(np.clip(cy + side / 2, 0, h))
+        if x1 - x0 < 32 or y1 - y0 < 32:
+            return None
+        if (x1 - x0) * (y1 - y0) > 0.8 * w * h:
+            return None             # hardly smaller than the frame: not worth cropping
+        return (x0, y0, x1, y1)
+
+    def summary(self) -> str:
+        mode = "roi" if self.roi is not None else "full"
+        return f"{mode} scale:{self.scale:.2f} full:{self.full_frames}/{self.frames} miss:{self.fallbacks}"
@@ -0,0 +1,199 @@
+"""Servo-aware send scheduling.
+
+hand1.2.ino does not jump to a target: every 10 ms (rampUpdate) it moves
+each channel's output towards targetAngle by at most speedDps * dt, with
+speedDps 60 deg/s after reset. A fixed "every 200 ms, if it moved 2 deg"
+throttle ignores that, so it sends targets the ramp has no time to reach
+and holds back ones that would change the motion right now.
+
+ServoModel mirrors one channel's ramp (position, target, speed) from the
+commands sent to it. SendScheduler keeps one model per global channel and
+decides, per channel and per frame, whether a new target or speed actually
+changes the motion:
+
+  - the servo has stopped (or will stop within ``lookahead``) short of the
+    new target, or
+  - the new target is behind the servo or on the way to the old target,
+    so it has to turn or stop earlier, or
+  - the speed needed to arrive by the next update differs from the
+    current one by more than ``speed_tolerance``.
+
+Speeds are chosen so the servo covers the remaining distance in one update
+interval (estimated per channel from how often targets arrive), within
+[min_speed, max_speed]. Every command, including ones from the fixed
+throttle, is also scored: it is "useful" if it changed the ramp's target or
+speed and stayed in effect for at least one ramp tick. stats() reports
+sent, useful and their ratio, with the ramps advanced to ``now`` (by
+default the latest time the scheduler was given) so the last command on
+each channel is scored even when nothing was decided after it, as under
+the fixed throttle.
+"""
+
+RAMP_TICK = 0.010           # rampUpdate() period in the sketch (s)
+DEFAULT_SPEED = 60.0        # speedDps[] after reset (deg/s)
+DEADBAND = 1.0              # target changes smaller than this are not sent (deg)
+MIN_SPEED = 30.0            # deg/s
+MAX_SPEED = 400.0           # deg/s; above what hobby servos can follow
+SPEED_TOLERANCE = 0.25      # relative speed change worth a command
+LOOKAHEAD = 0.05            # send a further target this long before the old one is reached (s)
+
+
+class ServoModel:
+    """One channel of the sketch's ramp, advanced in RAMP_TICK steps."""
+
+    def __init__(self, speed: float = DEFAULT_SPEED):
+        self.pos = None             # unknown until the first command
+        self.target = None
+        self.speed = speed
+        self.t = 0.0                # time the model was advanced to
+        self.cmd_time = None        # when the current target/speed was commanded
+        self.cmd_useful = False     # the current command changed target or speed
+
+    def advance(self, now: float):
+        if self.pos is None or now <= self.t:
+            return
+        ticks = int((now - self.t) / RAMP_TICK)
+        if ticks <= 0:
+            return
+        self.t += ticks * RAMP_TICK
+        step = self.speed * ticks * RAMP_TICK
+        d = self.target - self.pos
+        self.pos = self.target if abs(d) <= step else self.pos + (step if d > 0 else -step)
+
+    def time_to_target(self) -> float:
+        if self.pos is None or self.speed <= 0:
+            return 0.0
+        return abs(self.target - self.pos) / self.speed
+
+    def command(self, angle: float, speed: float, now: float) -> bool:
+        """Apply a command as the sketch would; returns True if it changed target or speed."""
+        self.advance(now)
+        if self.pos is None:
+            # first command: the position is unknown, assume the servo is already there
+            self.pos, self.target, self.t = angle, angle, now
+            changed = True
+        else:
+            changed = abs(angle - self.target) >= 0.05 or (speed is not None and abs(speed - self.speed) >= 0.05)
+        self.target = angle
+        if speed is not None and speed > 0:
+            self.speed = speed
+        self.cmd_time = now
+        self.cmd_useful = changed
+        return changed
+
+
+class SendScheduler:
+    """Per-channel send decisions against ServoModel, see the module docstring."""
+
+    def __init__(self, deadband: float = DEADBAND, min_speed: float = MIN_SPEED,
+                 max_speed: float = MAX_SPEED, speed_tolerance: float = SPEED_TOLERANCE,
+                 lookahead: float = LOOKAHEAD):
+        self.deadband = deadband
+        self.min_speed = min_speed
+        self.max_speed = max_speed
+        self.speed_tolerance = speed_tolerance
+        self.lookahead = lookahead
+        self.models = {}            # channel -> ServoModel
+        self._last_offer = {}       # channel -> time of the last decide() call
+        self._interval = {}         # channel -> EMA of the time between decide() calls
+        self.last_time = None       # latest time passed to decide() or record()
+        self.offered = 0
+        self.sent = 0
+        self.useful = 0
+        self.speed_changes = 0
+
+    def model(self, channel: int) -> ServoModel:
+        m = self.models.get(channel)
+        if m is None:
+            m = self.models[channel] = ServoModel()
+        return m
+
+    def _update_interval(self, channel: int, now: float) -> float:
+        last = self._last_offer.get(channel)
+        self._last_offer[channel] = now
+        iv = self._interval.get(channel)
+        if last is not None and now > last:
+            dt = min(now - last, 1.0)
+            iv = dt if iv is None else iv + 0.2 * (dt - iv)
+            self._interval[channel] = iv
+        return max(RAMP_TICK, iv if iv is not None else 0.1)
+
+    def decide(self, channel: int, desired: float, now: float):
+        """Return (angle, speed or None) if a command would change the motion, else None.
+
+        The caller sends it and reports back with record(); speed is None when
+        the current one is close enough.
+        """
+        self.offered += 1
+        self._seen(now)
+        horizon = self._update_interval(channel, now)
+        m = self.model(channel)
+        m.advance(now)
+        if m.pos is None:
+            return desired, None
+
+        dist = abs(desired - m.pos)
+        want = min(self.max_speed, max(self.min_speed, dist / horizon))
+        speed = want if abs(want - m.speed) > self.speed_tolerance * m.speed else None
+
+        moved = abs(desired - m.target) >= self.deadband
+        if not moved:
+            if speed is not None and dist >= self.deadband:
+                return m.target, speed      # same target, but too slow or too fast to arrive on time
+            return None
+        if m.time_to_target() <= self.lookahead:
+            return desired, speed           # stopped or about to stop
+        ahead = (m.target - m.pos) * (desired - m.pos)
+        if ahead <= 0 or dist < abs(m.target - m.pos):
+            return desired, speed           # turn around, or stop earlier than the old target
+        # further along the same direction: the old target is still on the way
+        if speed is not None:
+            return desired, speed
+        return None
+
+    def record(self, channel: int, angle: float, speed: float, now: float):
+        """Account for a command that was sent (by this scheduler or anything else)."""
+        self._seen(now)
+        m = self.model(channel)
+        m.advance(now)
+        # the command it replaces counts as useful once it had a ramp tick to act on
+        if m.cmd_time is not None and m.cmd_useful and now - m.cmd_time >= RAMP_TICK:
+            self.useful += 1
+        self.sent += 1
+        if speed is not None:
+            self.speed_changes += 1
+        m.command(angle, speed, now)
+
+    def _seen(self, now: float):
+        if self.last_time is None or now > self.last_time:
+            self.last_time = now
+
+    def stats(self, now: float = None) -> dict:
+        """Counts so far; ``now`` (default: last_time) is when the scoring ends."""
+        now = self.last_time if now is None else now
+        pending = 0
+        for m in self.models.values():
+            if now is not None:
+                m.advance(now)
+            # commands still in effect count once they have had a ramp tick
+            if m.cmd_useful and m.cmd_time is not None and m.t - m.cmd_time >= RAMP_TICK:
+                pending += 1
+        useful = self.useful + pending
+        return {
+            "offered": self.offered,
+            "sent": self.sent,
+            "useful": useful,
+            "speed_changes": self.speed_changes,
+            "efficiency": round(useful / self.sent, 3) if self.sent else None,
+        }
+
+    def summary(self, now: float = None) -> str:
+        st = self.stats(now)
+        eff = "-" if st["efficiency"] is None else f"{st['efficiency'] * 100:.0f}%"
+        return f"sched sent:{st['sent']} useful:{st['useful']} ({eff}) speed:{st['speed_changes']}"
+
+    def reset(self):
+        self.models.clear()
+        self._last_offer.clear()
+        self._interval.clear()
+        self.last_time = None
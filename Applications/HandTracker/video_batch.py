@@ -0,0 +1,115 @@
+"""Headless batch processing of recorded video.
+
+The video is split into frame ranges that are processed in parallel by a
+process pool, with one MediaPipe Hands instance per worker. Results are
+written as JSON lines in frame order, one line per frame:
+
+  {"frame": 12, "t": 0.4, "hands": [{"label": "Right", "score": 0.98,
+    "angle": 41.7, "pw_frac": 0.12, "flexion": [...15...], "landmarks": [[x, y, z], ...]}]}
+
+"angle" is the unsmoothed palm angle (degrees) from kinematics.palm_angles,
+"flexion" the 15 joint angles from kinematics.joint_flexion.
+
+Note: Hands keeps tracking state between frames, so the first frame of each
+range may be detected from scratch; use larger --chunk values for long,
+continuous takes.
+"""
+
+import json
+import multiprocessing
+import sys
+import time
+
+import cv2
+import mediapipe as mp
+
+import kinematics
+
+_hands = None   # per-worker Hands instance, created by _init_worker
+
+
+def _init_worker(max_hands: int):
+    global _hands
+    _hands = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=max_hands,
+                                      min_detection_confidence=0.5, min_tracking_confidence=0.5)
+
+
+def _process_range(job):
+    """Worker: run Hands on frames [start, stop) of the video, return records."""
+    path, start, stop = job
+    cap = cv2.VideoCapture(path)
+    if start:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    records = []
+    frame = start
+    while stop is None or frame < stop:
+        success, img = cap.read()
+        if not success:
+            break
+        records.append(frame_record(_hands, img, frame, fps))
+        frame += 1
+    cap.release()
+    return records
+
+
+def frame_record(hands, img, frame: int, fps: float) -> dict:
+    """Run Hands on one BGR frame and return its JSON-able record."""
+    h_img, w_img, _ = img.shape
+    recHands = hands.process(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+    lm = kinematics.landmarks_array(recHands.multi_hand_landmarks)
+    record = {"frame": frame, "t": round(frame / fps, 4), "hands": []}
+    if len(lm) == 0:
+        return record
+
+    classes = [h.classification[0] for h in recHands.multi_handedness or []]
+    left = [i < len(classes) and classes[i].label.lower().startswith('l') for i in range(len(lm))]
+    palm = kinematics.palm_angles(lm, w_img, h_img, left)
+    flex = kinematics.joint_flexion(lm, w_img, h_img)
+    for i in range(len(lm)):
+        record["hands"].append({
+            "label": classes[i].label if i < len(classes) else "",
+            "score": round(float(classes[i].score), 4) if i < len(classes) else 0.0,
+            "angle": round(float(palm["angle"][i]), 3),
+            "pw_frac": round(float(palm["pw_frac"][i]), 4),
+            "flexion": [round(float(v), 2) for v in flex[i]],
+            "landmarks": [[round(float(v), 5) for v in p] for p in lm[i]],
+        })
+    return record
+
+
+def frame_ranges(total: int, chunk: int):
+    return [(s, min(s + chunk, total)) for s in range(0, total, chunk)]
+
+
+def run(path: str, out_path: str, workers: int = None, chunk: int = 300, max_hands: int = 2) -> int:
+    """Process ``path`` with a process pool and write JSON lines to ``out_path``."""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        print(f"ERROR: cannot open video {path}", file=sys.stderr)
+        return 2
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    cap.release()
+
+    # unknown length (some containers): one worker reads the whole stream
+    jobs = [(path, s, e) for s, e in frame_ranges(total, chunk)] if total > 0 else [(path, 0, None)]
+    workers = max(1, min(workers or multiprocessing.cpu_count(), len(jobs)))
+    print(f"VIDEO {path}: {total or '?'} frames @{fps:.1f} fps, {len(jobs)} chunks on {workers} workers",
+          file=sys.stderr)
+
+    t0 = time.monotonic()
+    done = 0
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(workers, initializer=_init_worker, initargs=(max_hands,)) as pool, \
+            open(out_path, "w") as out:
+        # imap keeps chunk order, so the file is written in frame order
+        for records in pool.imap(_process_range, jobs):
+            for r in records:
+                out.write(json.dumps(r, separators=(",", ":")) + "\n")
+            done += len(records)
+            elapsed = time.monotonic() - t0
+            print(f"VIDEO {done}/{total or '?'} frames, {done / max(1e-6, elapsed):.1f} fps "
+                  f"({done / max(1e-6, elapsed) / fps:.1f}x real-time)", file=sys.stderr)
+    print(f"VIDEO wrote {done} frames to {out_path}", file=sys.stderr)
+    return 0
@@ -1,13 +1,16 @@
 # apps/launcher-desktop/launcher.py
 import sys, os, platform
+import json
+import time
+from collections import deque
 from pathlib import Path
-from PySide6.QtCore import QProcess, QTimer, Qt
+from PySide6.QtCore import QProcess, QTimer, Qt, QSocketNotifier, QPointF, QRectF
+from PySide6.QtGui import QImage, QPainter, QPen, QColor
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QLabel, QTextEdit, QSpinBox, QLineEdit, QFileDialog,
-    QComboBox, QMessageBox
+    QPushButton, QLabel, QPlainTextEdit, QSpinBox, QLineEdit, QFileDialog,
+    QComboBox, QMessageBox, QCheckBox
 )
-from PySide6.QtGui import QTextCursor
 
 
 
@@ -15,6 +18,127 @@ REPO_ROOT = Path(__file__).resolve().parents[2]
 TRACKER_DIR = REPO_ROOT / "Applications" / "HandTracker"
 DEFAULT_SCRIPT = TRACKER_DIR / "hand_tracker.py"      # adjust if different
 
+sys.path.insert(0, str(REPO_ROOT))
+from handSerial import default_port
+from handDevices import open_link
+import handIpc
+import handTelemetry
+import handPreview
+
+LOG_MAX_LINES = 5000                    # lines kept in the log model and the view
+LOG_REFRESH_MS = 66                     # view updates are batched at ~15 Hz
+TELEMETRY_REFRESH_MS = 250              # metrics panel updates (see handTelemetry.py)
+PREVIEW_REFRESH_MS = 50                 # embedded preview polls at most ~20 Hz (see handPreview.py)
+PREVIEW_STALE_S = 2.0                   # reattach when the tracker has not published for this long
+HIGH_RATE_PREFIXES = ("ANGLE ", "SENT ")  # per-frame tracker output, can be hidden
+SESSION_PHASES = ("camera", "first_frame", "first_result", "first_send")  # re-timed on every Start
+
+class LogBuffer:
+    """Ring buffer of log lines plus the batch not yet shown in the view.
+
+    Output arrives in arbitrary chunks; feed() splits it into complete lines
+    (keeping an unterminated tail per source) so per-line filtering and
+    ANGLE forwarding never see half a line. Both the history and the pending
+    batch are bounded, so a chatty process cannot grow memory or stall the
+    GUI thread.
+    """
+
+    def __init__(self, max_lines: int = LOG_MAX_LINES):
+        self.lines = deque(maxlen=max_lines)
+        self.pending = deque(maxlen=max_lines)
+        self.counts = {p.strip(): 0 for p in HIGH_RATE_PREFIXES}
+        self.total = 0
+        self._partial = {}
+
+    def feed(self, text: str, source: str = "") -> list:
+        """Add text; returns the complete lines it finished."""
+        text = self._partial.pop(source, "") + text
+        lines = text.split("\n")
+        if lines[-1]:
+            self._partial[source] = lines[-1]
+        lines = [l.rstrip("\r") for l in lines[:-1]]
+        for line in lines:
+            for prefix in HIGH_RATE_PREFIXES:
+                if line.startswith(prefix):
+                    self.counts[prefix.strip()] += 1
+                    break
+        self.lines.extend(lines)
+        self.pending.extend(lines)
+        self.total += len(lines)
+        return lines
+
+    def finish(self, source: str = "") -> list:
+        """Flush an unterminated last line, e.g. when a process exits."""
+        tail = self._partial.pop(source, "")
+        return self.feed(tail + "\n", source) if tail else []
+
+    def take_pending(self) -> list:
+        lines = list(self.pending)
+        self.pending.clear()
+        return lines
+
+def is_high_rate(line: str) -> bool:
+    return line.startswith(HIGH_RATE_PREFIXES)
+
+def parse_phase(line: str):
+    """"PHASE <name> <n>ms" -> (name, ms), or None for any other line."""
+    parts = line.split()
+    if len(parts) != 3 or parts[0] != "PHASE" or not parts[2].endswith("ms"):
+        return None
+    try:
+        return parts[1], float(parts[2][:-2])
+    except ValueError:
+        return None
+
+class PreviewView(QWidget):
+    """Shows the newest handPreview frame, scaled to fit; draws landmarks for raw frames."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumSize(320, 240)
+        self.image = None
+        self.hands = []
+        self.info = ""
+
+    def set_frame(self, f):
+        # QImage only wraps the bytes, so keep a deep copy
+        self.image = QImage(f.data, f.width, f.height, f.stride, QImage.Format_BGR888).copy()
+        self.hands = f.hands if f.raw else []
+        self.info = f"#{f.seq}  age {f.age_ms():.0f} ms"
+        self.update()
+
+    def clear(self):
+        self.image = None
+        self.hands = []
+        self.info = ""
+        self.update()
+
+    def paintEvent(self, event):
+        p = QPainter(self)
+        p.fillRect(self.rect(), QColor(20, 20, 20))
+        if self.image is None:
+            p.setPen(QColor(160, 160, 160))
+            p.drawText(self.rect(), Qt.AlignCenter, "no preview")
+            return
+        iw, ih = self.image.width(), self.image.height()
+        scale = min(self.width() / iw, self.height() / ih)
+        w, h = iw * scale, ih * scale
+        x0, y0 = (self.width() - w) / 2, (self.height() - h) / 2
+        p.drawImage(QRectF(x0, y0, w, h), self.image)
+        p.setRenderHint(QPainter.Antialiasing)
+        for hid, angle, pts in self.hands:
+            xy = [QPointF(x0 + x * w, y0 + y * h) for x, y in pts]
+            p.setPen(QPen(QColor(120, 120, 120), 1))
+            for chain in handPreview.SKELETON:
+                for a, b in zip(chain, chain[1:]):
+                    p.drawLine(xy[a], xy[b])
+            p.setPen(QPen(QColor(200, 50, 150), 5))
+            p.drawPoints(xy)
+            p.setPen(QColor(0, 255, 0))
+            p.drawText(xy[0] + QPointF(10, 10), f"H{hid} {angle:.0f}°")
+        p.setPen(QColor(0, 255, 0))
+        p.drawText(QPointF(x0 + 8, y0 + 16), self.info)
+
 def guess_python_for_tracker() -> str:
     """Prefer the hand-tracker's venv python; fall back to current python."""
     candidates = []
@@ -91,21 +215,41 @@ class Launcher(QMainWindow):
         self.cam_spin.setValue(0)
         self.mode_combo = QComboBox()
         self.mode_combo.addItems(["live", "video"])
+        # more views of the same hands, fused by the tracker (see multicam.py)
+        self.extra_cams = QLineEdit("")
+        self.extra_cams.setPlaceholderText("e.g. 2,3")
+        self.extra_cams.setToolTip("Extra camera indices or video files, each in its own process")
+        self.extra_cams.setMaximumWidth(120)
         args_row.addWidget(QLabel("Camera:"))
         args_row.addWidget(self.cam_spin)
+        args_row.addWidget(QLabel("+"))
+        args_row.addWidget(self.extra_cams)
         args_row.addWidget(QLabel("Mode:"))
         args_row.addWidget(self.mode_combo)
+        # where live frames are shown: the tracker's own window, or embedded below
+        self.preview_combo = QComboBox()
+        self.preview_combo.addItems(["Window", "Embedded", "Embedded (raw)"])
+        args_row.addWidget(QLabel("Preview:"))
+        args_row.addWidget(self.preview_combo)
+        # video file for the headless "video" mode
+        self.video_edit = QLineEdit("")
+        self.video_edit.setPlaceholderText("video file (mode: video)")
+        video_btn = QPushButton("Video…")
+        video_btn.clicked.connect(self.browse_video)
+        args_row.addWidget(self.video_edit, 1)
+        args_row.addWidget(video_btn)
         v.addLayout(args_row)
 
         # Hand control row (send angle to Arduino via handSerial.py)
         hand_row = QHBoxLayout()
         self.hand_channel = QSpinBox()
-        self.hand_channel.setRange(0, 15)
+        self.hand_channel.setRange(0, 63)      # global channel: board k has 16k..16k+15
         self.hand_channel.setValue(0)
         self.hand_angle = QSpinBox()
         self.hand_angle.setRange(0, 270)
         self.hand_angle.setValue(90)
         self.hand_port = QLineEdit("")
+        self.hand_port.setPlaceholderText("port, a,b or auto")
         send_hand_btn = QPushButton("Send Angle to Hand")
         send_hand_btn.clicked.connect(self.send_angle_to_hand)
         hand_row.addWidget(QLabel("CH:"))
@@ -125,12 +269,64 @@ class Launcher(QMainWindow):
         self.stop_btn.clicked.connect(self.stop_tracker)
         btns.addWidget(self.start_btn)
         btns.addWidget(self.stop_btn)
+        # warm standby: Stop idles the tracker and hand server instead of exiting them
+        self.keep_warm = QCheckBox("Keep warm")
+        self.keep_warm.setChecked(True)
+        self.keep_warm.toggled.connect(self.on_keep_warm)
+        self.keep_camera = QCheckBox("Keep camera open")
+        btns.addWidget(self.keep_warm)
+        btns.addWidget(self.keep_camera)
         v.addLayout(btns)
 
-        # Log output
-        self.log = QTextEdit()
+        # Startup phase timings reported by the tracker and hand server
+        self.phase_label = QLabel("")
+        v.addWidget(self.phase_label)
+
+        # Live metrics published by the tracker and hand server
+        metrics_row = QHBoxLayout()
+        self.metrics_label = QLabel("")
+        self.metrics_label.setStyleSheet("font-family: monospace;")
+        metrics_row.addWidget(self.metrics_label, 1)
+        self.export_metrics = QCheckBox("Export metrics…")
+        self.export_metrics.toggled.connect(self.on_export_metrics)
+        metrics_row.addWidget(self.export_metrics)
+        v.addLayout(metrics_row)
+
+        # Live angles received over IPC
+        self.ipc_label = QLabel("")
+        v.addWidget(self.ipc_label)
+
+        # Log filter + counters
+        log_row = QHBoxLayout()
+        self.hide_high_rate = QCheckBox("Hide ANGLE/SENT lines")
+        self.hide_high_rate.toggled.connect(self.rebuild_log_view)
+        log_row.addWidget(self.hide_high_rate)
+        log_row.addStretch()
+        self.log_counts = QLabel("")
+        log_row.addWidget(self.log_counts)
+        v.addLayout(log_row)
+
+        # Log output: bounded model, view refreshed in batches by a timer;
+        # the embedded preview sits next to it
+        self.log_buf = LogBuffer()
+        self.log = QPlainTextEdit()
         self.log.setReadOnly(True)
-        v.addWidget(self.log, 1)
+        self.log.setMaximumBlockCount(LOG_MAX_LINES)
+        out_row = QHBoxLayout()
+        out_row.addWidget(self.log, 1)
+        self.preview_view = PreviewView()
+        self.preview_view.setVisible(False)
+        out_row.addWidget(self.preview_view, 1)
+        v.addLayout(out_row, 1)
+        self.preview = None             # handPreview.PreviewReader while attached
+        self._preview_seen = 0.0
+        self._preview_timer = QTimer(self)
+        self._preview_timer.timeout.connect(self.poll_preview)
+        self._log_timer = QTimer(self)
+        self._log_timer.timeout.connect(self.flush_log)
+        self._log_timer.start(LOG_REFRESH_MS)
+        self._count_mark = (time.monotonic(), 0)
+        self._angle_rate = 0.0
 
         # Process used to run handSerial commands (separate from tracker proc)
         self.hand_proc = QProcess(self)
@@ -138,6 +334,31 @@ class Launcher(QMainWindow):
         self.hand_proc.readyReadStandardOutput.connect(self.on_hand_stdout)
         self.hand_proc.readyReadStandardError.connect(self.on_hand_stdout)
 
+        # In-process serial link for manual sends (kept open between clicks)
+        self.hand_link = None
+        self.hand_link_spec = None      # the port text it was opened for ("auto" stays "auto")
+
+        # Live Tracking: the tracker publishes to the hand server and to us (display only)
+        self.ipc = None
+        self._ipc_notifier = None
+        self._ipc_latest = {}           # hand -> last KIND_ANGLE message
+        self._ipc_targets = None        # last KIND_TARGETS message
+        self._ipc_latency_ms = 0.0      # EMA of publish-to-receive time
+
+        # Telemetry: newest snapshot per source, optional JSON-lines export
+        self.telemetry = None
+        self._telemetry_notifier = None
+        self._metrics = {}              # source -> last snapshot
+        self._metrics_out = None
+        self._metrics_timer = QTimer(self)
+        self._metrics_timer.timeout.connect(self.update_metrics_label)
+        self._metrics_timer.start(TELEMETRY_REFRESH_MS)
+
+        # Warm standby state (see start_tracker)
+        self._warm_args = None          # args of the running --standby tracker
+        self._hand_args = None          # args of the running hand server
+        self._phases = {"tracker": {}, "hand": {}}
+
         # Size
         self.resize(900, 600)
 
@@ -162,98 +383,240 @@ class Launcher(QMainWindow):
         if path:
             self.script_edit.setText(path)
 
+    def browse_video(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Select video", str(REPO_ROOT), "Video (*.mp4 *.avi *.mov *.mkv);;All files (*)")
+        if path:
+            self.video_edit.setText(path)
+
     def start_tracker(self):
-        if self.proc.state() != QProcess.NotRunning:
-            QMessageBox.information(self, "Already running", "Hand tracker is already running.")
-            return
+        """Start tracking.
 
+        In live mode with "Keep warm", the tracker runs as a --standby worker
+        that keeps MediaPipe (and optionally the camera) loaded, and the hand
+        server keeps its port open; Start and Stop only switch them between
+        active and idle. The worker is respawned when its arguments change.
+        """
         python = self.py_edit.text().strip()
         script = self.script_edit.text().strip()
         if not Path(script).exists():
             QMessageBox.warning(self, "Script not found", f"Cannot find:\n{script}")
             return
 
+        video = None
+        if self.mode_combo.currentText() == "video":
+            video = self.video_edit.text().strip()
+            if not video or not Path(video).exists():
+                QMessageBox.warning(self, "Video not found", "Pick a video file for the video mode.")
+                return
+        warm = self.keep_warm.isChecked() and video is None
+
+        # both processes report metrics to the panel
+        self.open_telemetry()
+        telemetry = ["--telemetry", self.telemetry.address] if self.telemetry is not None else []
+
         # If user selected Live Tracking, start a persistent hand server first
         live_mode = (self.launch_mode.currentText() == "Live Tracking")
         if live_mode:
-            # start hand server
+            hand_script = Path(REPO_ROOT) / "handSerial.py"
+            if not hand_script.exists():
+                QMessageBox.warning(self, "Script not found", f"Cannot find:\n{hand_script}")
+                return
+            args_h = [str(hand_script), "--serve", "--channel", str(self.hand_channel.value()),
+                      "--ipc", handIpc.default_address("hand")] + telemetry
+            port = self.hand_port.text().strip()
+            if port:
+                args_h += ["--port", port]
+            if self.hand_proc.state() != QProcess.NotRunning and args_h != self._hand_args:
+                self.stop_hand_server()
             if self.hand_proc.state() == QProcess.NotRunning:
-                hand_script = Path(REPO_ROOT) / "handSerial.py"
-                if not hand_script.exists():
-                    QMessageBox.warning(self, "Script not found", f"Cannot find:\n{hand_script}")
-                    return
-                args_h = [str(hand_script), "--serve", "--channel", str(self.hand_channel.value())]
-                port = self.hand_port.text().strip()
-                if port:
-                    args_h += ["--port", port]
+                # the server needs the port: release our manual-send link first
+                self.close_hand_link()
+                self._phases["hand"].clear()
                 self.hand_proc.setWorkingDirectory(str(REPO_ROOT))
                 self.append_log(f"$ {python} {' '.join(args_h)}\n")
                 self.hand_proc.start(python, args_h)
                 if not self.hand_proc.waitForStarted(3000):
                     self.append_log("ERROR: Failed to start hand server.\n")
                     return
+                self._hand_args = args_h
+        else:
+            # the tracker opens its own link to the hand
+            self.stop_hand_server()
 
-        args = [script, "--camera", str(self.cam_spin.value()), "--mode", self.mode_combo.currentText()]
+        args = [script, "--camera", str(self.cam_spin.value()), "--mode", self.mode_combo.currentText()] + telemetry
         # If your tracker expects different flags, adjust here.
+        if video:
+            args += ["--video", video]
+        extra = [c.strip() for c in self.extra_cams.text().split(",") if c.strip()]
+        if video is None and extra:
+            args += ["--cameras", ",".join([str(self.cam_spin.value())] + extra)]
+        if live_mode:
+            # the hand server owns the port; the tracker publishes targets to it
+            # directly and to the launcher for display
+            self.open_ipc_monitor()
+            publish = [handIpc.default_address("hand")]
+            if self.ipc is not None:
+                publish.append(self.ipc.address)
+            args += ["--channel", str(self.hand_channel.value()), "--publish", ",".join(publish)]
+        else:
+            port = self.hand_port.text().strip()
+            if port:
+                args += ["--port", port]
+            self.close_hand_link()
+        preview = self.preview_combo.currentText()
+        if video is None and preview != "Window":
+            # headless tracker; frames come back through shared memory
+            args += ["--headless", "--preview", handPreview.default_name()]
+            if preview == "Embedded (raw)":
+                args.append("--preview-raw")
+        if warm:
+            args += ["--standby"] + (["--standby-camera"] if self.keep_camera.isChecked() else [])
+
+        running = self.proc.state() != QProcess.NotRunning
+        if running and warm and args == self._warm_args:
+            self.proc.write(b"start\n")
+            return
+        if running and self._warm_args is None:
+            QMessageBox.information(self, "Already running", "Hand tracker is already running.")
+            return
+        if running:
+            self.stop_worker()
 
         # Ensure working dir (so relative assets load)
         self.proc.setWorkingDirectory(str(TRACKER_DIR))
 
+        self._phases["tracker"].clear()
+        self.close_preview()
+        if "--preview" in args:
+            self.preview_view.setVisible(True)
+            self._preview_timer.start(PREVIEW_REFRESH_MS)
         self.append_log(f"$ {python} {' '.join(args)}\n")
         self.proc.start(python, args)
         if not self.proc.waitForStarted(3000):
             self.append_log("ERROR: Failed to start process.\n")
             return
-        self.set_status("Running")
+        if warm:
+            # read by the worker once its models are loaded
+            self._warm_args = args
+            self.proc.write(b"start\n")
+            self.set_status("Loading")
+        else:
+            self.set_status("Running")
 
     def stop_tracker(self):
-        # stop tracker process
+        """Idle a warm worker, or stop the tracker and hand server."""
+        if self._warm_args is not None and self.keep_warm.isChecked() \
+                and self.proc.state() != QProcess.NotRunning:
+            self.proc.write(b"stop\n")
+            return
+        self.shutdown()
+
+    def shutdown(self):
+        """Exit the tracker and the hand server, warm or not."""
+        self.stop_worker()
+        self.stop_hand_server()
+        self.close_ipc_monitor()
+        self.close_telemetry()
+        self.close_preview()
+
+    def stop_worker(self):
+        # stop tracker process (a standby worker is asked to quit first)
         if self.proc.state() != QProcess.NotRunning:
+            if self._warm_args is not None:
+                self.proc.write(b"quit\n")
+                self.proc.closeWriteChannel()
+                if self.proc.waitForFinished(2000):
+                    return
             self.proc.terminate()
             if not self.proc.waitForFinished(2000):
                 self.proc.kill()
 
-        # stop hand server if running
+    def stop_hand_server(self):
         if self.hand_proc.state() != QProcess.NotRunning:
             self.hand_proc.terminate()
             if not self.hand_proc.waitForFinished(2000):
                 self.hand_proc.kill()
+        self._hand_args = None
+
+    def on_keep_warm(self, checked: bool):
+        # an idle worker has nothing left to wait for
+        if not checked and self.status.text() == "Standby":
+            self.shutdown()
 
     def on_stdout(self):
         data = bytes(self.proc.readAllStandardOutput()).decode(errors="ignore")
         if data:
-            self.append_log(data)
-            # parse ANGLE lines and forward to hand server if running
-            if self.hand_proc.state() != QProcess.NotRunning:
-                for line in data.splitlines():
-                    if not line.startswith("ANGLE "):
-                        continue
-                    parts = line.split()
-                    if len(parts) >= 3:
-                        try:
-                            angle_val = float(parts[2])
-                        except Exception:
-                            continue
-                        try:
-                            # write to stdin of hand_proc
-                            self.hand_proc.write(bytes(f"{angle_val}\n", encoding='utf-8'))
-                            # visual indicator
-                            self.set_send_indicator(True)
-                        except Exception as e:
-                            self.append_log(f"ERROR writing to hand server stdin: {e}\n")
+            # display only: in Live Tracking the tracker publishes to the hand
+            # server itself (see handIpc.py); only state and PHASE lines are read
+            self.on_lines(self.log_buf.feed(data, "tracker"), "tracker")
         data_err = bytes(self.proc.readAllStandardError()).decode(errors="ignore")
         if data_err:
-            self.append_log(data_err)
+            self.append_log(data_err, "tracker")
+
+    def on_lines(self, lines: list, source: str):
+        """Follow standby state (READY/ACTIVE/IDLE) and PHASE timings."""
+        for line in lines:
+            if source == "tracker" and line in ("READY", "ACTIVE", "IDLE"):
+                if line == "ACTIVE":
+                    for name in SESSION_PHASES:
+                        self._phases["tracker"].pop(name, None)
+                self.set_status({"READY": "Standby", "ACTIVE": "Running", "IDLE": "Standby"}[line])
+                continue
+            phase = parse_phase(line)
+            if phase is not None:
+                self._phases[source][phase[0]] = phase[1]
+                self.update_phase_label()
+
+    def update_phase_label(self):
+        parts = []
+        for source, phases in self._phases.items():
+            if phases:
+                parts.append(f"{source}: " + " ".join(f"{n} {ms:.0f}ms" for n, ms in phases.items()))
+        self.phase_label.setText("   ".join(parts))
 
     def on_finished(self):
+        self.log_buf.finish("tracker")
         self.append_log("\n[process exited]\n")
+        self._warm_args = None
         self.set_status("Idle")
 
-    def append_log(self, text: str):
-        self.log.moveCursor(QTextCursor.MoveOperation.End)
-        self.log.insertPlainText(text)
-        self.log.moveCursor(QTextCursor.MoveOperation.End)
-        self.log.ensureCursorVisible()
+    def append_log(self, text: str, source: str = ""):
+        """Queue text for the log; it is shown on the next flush_log()."""
+        return self.log_buf.feed(text, source)
+
+    def flush_log(self):
+        """Timer slot: append the pending batch to the view in one call."""
+        lines = self.log_buf.take_pending()
+        if self.hide_high_rate.isChecked():
+            lines = [l for l in lines if not is_high_rate(l)]
+        if lines:
+            bar = self.log.verticalScrollBar()
+            at_bottom = bar.value() >= bar.maximum() - 4
+            self.log.appendPlainText("\n".join(lines))
+            if at_bottom:
+                bar.setValue(bar.maximum())
+        self.update_log_counts()
+        self.update_ipc_label()
+
+    def update_log_counts(self):
+        now = time.monotonic()
+        t0, n0 = self._count_mark
+        counts = self.log_buf.counts
+        if now - t0 >= 1.0:
+            self._angle_rate = (counts["ANGLE"] - n0) / (now - t0)
+            self._count_mark = (now, counts["ANGLE"])
+        self.log_counts.setText(f"ANGLE {counts['ANGLE']} ({self._angle_rate:.0f}/s)  "
+                                f"SENT {counts['SENT']}  lines {self.log_buf.total}")
+
+    def rebuild_log_view(self):
+        """Re-render the kept history after the filter changes."""
+        self.log_buf.take_pending()
+        lines = list(self.log_buf.lines)
+        if self.hide_high_rate.isChecked():
+            lines = [l for l in lines if not is_high_rate(l)]
+        self.log.setPlainText("\n".join(lines))
+        bar = self.log.verticalScrollBar()
+        bar.setValue(bar.maximum())
 
 
     def set_status(self, s: str):
@@ -261,39 +624,183 @@ class Launcher(QMainWindow):
 
     # --- Hand command helpers ---
     def send_angle_to_hand(self):
-        """Run the handSerial.py script with the specified channel/angle (and optional port)."""
+        """Send the selected channel/angle to the hand.
+
+        While the Live Tracking hand server is running it owns the port, so the
+        command goes to its stdin; otherwise it is written on a link the
+        launcher keeps open between clicks.
+        """
+        ch = self.hand_channel.value()
+        ang = self.hand_angle.value()
+
         if self.hand_proc.state() != QProcess.NotRunning:
-            QMessageBox.information(self, "Already running", "Hand command is already running.")
+            self.hand_proc.write(bytes(f"{ch} {ang}\n", encoding='utf-8'))
+            self.set_send_indicator(True)
             return
 
-        python = self.py_edit.text().strip()
-        hand_script = Path(REPO_ROOT) / "handSerial.py"
-        if not hand_script.exists():
-            QMessageBox.warning(self, "Script not found", f"Cannot find:\n{hand_script}")
+        port = self.hand_port.text().strip() or default_port()
+        if self.hand_link is None or self.hand_link_spec != port:
+            self.close_hand_link()
+            self.append_log(f"Opening hand link on {port}\n")
+            try:
+                self.hand_link = open_link(port)
+                self.hand_link_spec = port
+            except ValueError as e:
+                self.append_log(f"ERROR: {e}\n")
+                return
+        try:
+            ok = self.hand_link.set_angle(ch, ang)
+        except ValueError as e:
+            self.append_log(f"ERROR: {e}\n")
             return
+        if ok:
+            self.append_log(f">> {ch} {ang}\n")
+            self.set_send_indicator(True)
+        else:
+            self.append_log(f"ERROR: cannot send to hand on {port}\n")
 
-        ch = str(self.hand_channel.value())
-        ang = str(self.hand_angle.value())
-        args = [str(hand_script), "--channel", ch, "--angle", ang]
-        port = self.hand_port.text().strip()
-        if port:
-            args += ["--port", port]
-
-        # ensure working dir so relative modules resolve
-        self.hand_proc.setWorkingDirectory(str(REPO_ROOT))
-        self.append_log(f"$ {python} {' '.join(args)}\n")
-        self.hand_proc.start(python, args)
-        if not self.hand_proc.waitForStarted(3000):
-            self.append_log("ERROR: Failed to start hand command.\n")
+    # --- IPC monitor (display of published angles/targets) ---
+    def open_ipc_monitor(self):
+        if self.ipc is not None:
+            return
+        try:
+            self.ipc = handIpc.Subscriber(handIpc.default_address("monitor"))
+        except (OSError, ValueError) as e:
+            self.append_log(f"WARNING: no live angle display ({e})\n")
+            return
+        self.ipc.sock.setblocking(False)
+        self._ipc_notifier = QSocketNotifier(self.ipc.fileno(), QSocketNotifier.Type.Read, self)
+        self._ipc_notifier.activated.connect(self.on_ipc)
+
+    def close_ipc_monitor(self):
+        if self._ipc_notifier is not None:
+            self._ipc_notifier.setEnabled(False)
+            self._ipc_notifier = None
+        if self.ipc is not None:
+            self.ipc.close()
+            self.ipc = None
+        self._ipc_latest.clear()
+        self._ipc_targets = None
+
+    def on_ipc(self):
+        # keep only the newest state; the label is refreshed by the log timer
+        for msg in self.ipc.drain():
+            self._ipc_latency_ms += 0.1 * (msg.age_ms() - self._ipc_latency_ms)
+            if msg.kind == handIpc.KIND_ANGLE:
+                self._ipc_latest[msg.hand] = msg
+            elif msg.kind == handIpc.KIND_TARGETS:
+                self._ipc_targets = msg
+                self.set_send_indicator(True)
+
+    def update_ipc_label(self):
+        if self.ipc is None:
+            return
+        parts = [f"hand {h}: {m.angle:.1f}°" for h, m in sorted(self._ipc_latest.items())]
+        t = self._ipc_targets
+        if t is not None:
+            sent = " ".join(f"{ch}={v:.0f}" for ch, (v, _) in t.targets().items())
+            parts.append(f"last sent {sent}")
+        if parts:
+            parts.append(f"IPC {self._ipc_latency_ms:.2f} ms")
+        self.ipc_label.setText("   ".join(parts))
+
+    # --- Embedded preview (see handPreview.py) ---
+    def poll_preview(self):
+        """Timer slot: show the newest shared-memory frame, attaching when the tracker has one."""
+        now = time.monotonic()
+        if self.preview is None:
+            try:
+                self.preview = handPreview.PreviewReader(handPreview.default_name())
+            except (FileNotFoundError, ValueError):
+                return
+            self._preview_seen = now
+        f = self.preview.read()
+        if f is not None:
+            self._preview_seen = now
+            self.preview_view.set_frame(f)
+        elif now - self._preview_seen > PREVIEW_STALE_S:
+            # idle, or the tracker made a new block (other frame size): reattach
+            self.preview.close()
+            self.preview = None
+
+    def close_preview(self):
+        self._preview_timer.stop()
+        if self.preview is not None:
+            self.preview.close()
+            self.preview = None
+        self.preview_view.clear()
+        self.preview_view.setVisible(False)
+
+    # --- Telemetry panel (see handTelemetry.py) ---
+    def open_telemetry(self):
+        if self.telemetry is not None:
+            return
+        try:
+            self.telemetry = handTelemetry.Subscriber(handIpc.default_address("telemetry"))
+        except (OSError, ValueError) as e:
+            self.append_log(f"WARNING: no metrics panel ({e})\n")
+            return
+        self.telemetry.sock.setblocking(False)
+        self._telemetry_notifier = QSocketNotifier(self.telemetry.fileno(), QSocketNotifier.Type.Read, self)
+        self._telemetry_notifier.activated.connect(self.on_telemetry)
+
+    def close_telemetry(self):
+        if self._telemetry_notifier is not None:
+            self._telemetry_notifier.setEnabled(False)
+            self._telemetry_notifier = None
+        if self.telemetry is not None:
+            self.telemetry.close()
+            self.telemetry = None
+        self._metrics.clear()
+
+    def on_telemetry(self):
+        for snap in self.telemetry.drain():
+            self._metrics[snap.get("source", "?")] = snap
+            if self._metrics_out is not None:
+                self._metrics_out.write(json.dumps(snap, separators=(",", ":")) + "\n")
+
+    def update_metrics_label(self):
+        now = time.time()
+        # a source that stopped reporting (idle or exited) is greyed out by age
+        lines = [handTelemetry.format_snapshot(s) + ("" if now - s.get("t", 0) < 2.0 else "  (stale)")
+                 for _, s in sorted(self._metrics.items())]
+        self.metrics_label.setText("\n".join(lines))
+
+    def on_export_metrics(self, checked: bool):
+        if self._metrics_out is not None:
+            self._metrics_out.close()
+            self._metrics_out = None
+        if not checked:
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Export metrics", str(REPO_ROOT / "metrics.jsonl"),
+                                              "JSON lines (*.jsonl);;All files (*)")
+        if not path:
+            self.export_metrics.setChecked(False)
             return
+        self._metrics_out = open(path, "a", buffering=1)
+        self.append_log(f"Exporting metrics to {path}\n")
+
+    def close_hand_link(self):
+        if self.hand_link is not None:
+            self.hand_link.close()
+            self.hand_link = None
+            self.hand_link_spec = None
+
+    def closeEvent(self, event):
+        self.shutdown()
+        if self._metrics_out is not None:
+            self._metrics_out.close()
+            self._metrics_out = None
+        self.close_hand_link()
+        super().closeEvent(event)
 
     def on_hand_stdout(self):
         data = bytes(self.hand_proc.readAllStandardOutput()).decode(errors="ignore")
         if data:
-            self.append_log(data)
+            self.on_lines(self.append_log(data, "hand"), "hand")
         data_err = bytes(self.hand_proc.readAllStandardError()).decode(errors="ignore")
         if data_err:
-            self.append_log(data_err)
+            self.append_log(data_err, "hand")
 
     def on_hand_finished(self):
         self.append_log("\n[hand command exited]\n")
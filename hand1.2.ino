@@ -10,6 +10,19 @@ int         SERVO_MAX_US   = 2400;   // pulse at max° (try 2300–2500)
 int         SERVO_MAX_DEG  = 270;    // set 180 or 270 depending on servo
 // =============================================
 
+// ====== Binary protocol (see handSerial.py) ======
+// SYNC | type | seq | len | payload[len] | crc16 LE (CRC-16/CCITT-FALSE over type..payload)
+// FRAME_SET payload: mask u16 LE | flags u8 | per set channel: angle u16 [speed u16], 0.1 units
+const int     PROTO_VERSION = 2;   // 1: binary frames, 2: text "f" frame command
+const uint8_t FRAME_SYNC    = 0xA5;
+const uint8_t FRAME_SET     = 0x01;
+const uint8_t FRAME_ACK     = 0x81;
+const uint8_t FRAME_NAK     = 0x82;
+const uint8_t FLAG_SPEEDS   = 0x01;
+const uint8_t FLAG_NO_ACK   = 0x02;
+const uint8_t MAX_PAYLOAD   = 3 + 16 * 4;
+// =============================================
+
 static float currentAngle[16];   // live (what we’re outputting now)
 static float targetAngle[16];    // where we want to go
 static float speedDps[16];       // degrees per second
@@ -37,7 +50,9 @@ void printHelp() {
   Serial.println(F("  a <angle>      : set target angle for current channel (0..SERVO_MAX_DEG)"));
   Serial.println(F("  s <speed>      : set speed for current channel (deg/sec, e.g. 60)"));
   Serial.println(F("  <ch> <angle>   : set target for a specific channel (keeps its speed)"));
+  Serial.println(F("  f <ch>:<angle>[:<speed>],... : set several channels at once"));
   Serial.println(F("  test           : sweep current channel"));
+  Serial.println(F("  v              : protocol version (binary frames start with 0xA5)"));
   Serial.print (F("  Current ch: ")); Serial.println(currentChannel);
   Serial.print (F("  SERVO_MAX_DEG=")); Serial.println(SERVO_MAX_DEG);
   Serial.print (F("> "));
@@ -45,6 +60,7 @@ void printHelp() {
 
 void setup() {
   Serial.begin(115200);
+  Serial.setTimeout(50);   // bound readStringUntil/readBytes on partial input
   while(!Serial){;}
   Serial.println(F("\n[PCA9685] Smooth ramp controller"));
 
@@ -93,25 +109,153 @@ void rampUpdate() {
   }
 }
 
-void doTestSweep(int ch) {
+// Test sweep as a state machine driven from loop(), so the ramp and command
+// parsing keep running while it plays. A new target for the swept channel
+// (from any command) ends the sweep.
+const float         SWEEP_TARGET[] = { 0, 1.0f, 0.5f };       // fractions of SERVO_MAX_DEG
+const unsigned long SWEEP_HOLD_MS[] = { 1000, 2000, 1500 };
+const int           SWEEP_STEPS    = 3;
+int           sweepCh   = -1;    // channel being swept, -1 = idle
+int           sweepStep = 0;
+unsigned long sweepAtMs = 0;     // when the current step started
+
+void startTestSweep(int ch) {
   Serial.println(F("[TEST] Sweep current channel"));
-  targetAngle[ch] = 0;    delay(1000);
-  targetAngle[ch] = SERVO_MAX_DEG;    delay(2000);
-  targetAngle[ch] = SERVO_MAX_DEG/2;  delay(1500);
-  Serial.println(F("[TEST] Done."));
+  sweepCh = ch;
+  sweepStep = 0;
+  sweepAtMs = millis();
+  targetAngle[ch] = SWEEP_TARGET[0] * SERVO_MAX_DEG;
+}
+
+void sweepUpdate() {
+  if (sweepCh < 0) return;
+  if (targetAngle[sweepCh] != SWEEP_TARGET[sweepStep] * SERVO_MAX_DEG) {
+    sweepCh = -1;                // overridden by a command
+    Serial.println(F("[TEST] Stopped."));
+    return;
+  }
+  unsigned long now = millis();
+  if (now - sweepAtMs < SWEEP_HOLD_MS[sweepStep]) return;
+  sweepAtMs += SWEEP_HOLD_MS[sweepStep];
+  if (++sweepStep >= SWEEP_STEPS) {
+    sweepCh = -1;
+    Serial.println(F("[TEST] Done."));
+    Serial.print("> ");
+    return;
+  }
+  targetAngle[sweepCh] = SWEEP_TARGET[sweepStep] * SERVO_MAX_DEG;
+}
+
+uint16_t crc16(const uint8_t* d, uint8_t n, uint16_t crc) {
+  while (n--) {
+    crc ^= (uint16_t)(*d++) << 8;
+    for (uint8_t i = 0; i < 8; i++) crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : (crc << 1);
+  }
+  return crc;
+}
+
+uint16_t readU16(const uint8_t* p) { return (uint16_t)p[0] | ((uint16_t)p[1] << 8); }
+
+void sendAck(uint8_t type, uint8_t seq) {
+  uint8_t f[6] = { FRAME_SYNC, type, seq, 0, 0, 0 };
+  uint16_t crc = crc16(f + 1, 3, 0xFFFF);
+  f[4] = crc & 0xFF; f[5] = crc >> 8;
+  Serial.write(f, 6);
+}
+
+// Apply a FRAME_SET payload; returns false if it is malformed.
+// All channels are updated before the next rampUpdate(), so they start together.
+bool applySetFrame(const uint8_t* p, uint8_t n) {
+  if (n < 3) return false;
+  uint16_t mask = readU16(p);
+  uint8_t flags = p[2];
+  uint8_t width = (flags & FLAG_SPEEDS) ? 4 : 2;
+  uint8_t count = 0;
+  for (uint8_t ch = 0; ch < 16; ch++) if (mask & (1u << ch)) count++;
+  if (n != 3 + count * width) return false;
+  const uint8_t* q = p + 3;
+  for (uint8_t ch = 0; ch < 16; ch++) {
+    if (!(mask & (1u << ch))) continue;
+    targetAngle[ch] = clampf(readU16(q) / 10.0f, 0, SERVO_MAX_DEG);
+    if (width == 4) {
+      uint16_t sp = readU16(q + 2);
+      if (sp) speedDps[ch] = sp / 10.0f;   // 0 = keep current speed
+    }
+    q += width;
+  }
+  return true;
+}
+
+// Parse "ch:angle[:speed],..." and apply every channel together, or nothing
+// if any entry is malformed. Returns the number of channels set (0 = error).
+int applyTextFrame(const char* s) {
+  float ang[16], sp[16];
+  uint16_t mask = 0;
+  while (*s) {
+    char* end;
+    long ch = strtol(s, &end, 10);
+    if (end == s || *end != ':' || ch < 0 || ch > 15) return 0;
+    s = end + 1;
+    ang[ch] = strtod(s, &end);
+    if (end == s) return 0;
+    s = end;
+    sp[ch] = -1;
+    if (*s == ':') {
+      s++;
+      sp[ch] = strtod(s, &end);
+      if (end == s) return 0;
+      s = end;
+    }
+    if (*s && *s != ',' && *s != ' ') return 0;
+    mask |= (1u << ch);
+    while (*s == ',' || *s == ' ') s++;
+  }
+  int count = 0;
+  for (int ch = 0; ch < 16; ch++) {
+    if (!(mask & (1u << ch))) continue;
+    targetAngle[ch] = clampf(ang[ch], 0, SERVO_MAX_DEG);
+    if (sp[ch] >= 0) speedDps[ch] = sp[ch];
+    count++;
+  }
+  return count;
+}
+
+void readBinaryFrame() {
+  uint8_t hdr[4];
+  uint8_t buf[MAX_PAYLOAD + 2];
+  if (Serial.readBytes(hdr, 4) != 4 || hdr[0] != FRAME_SYNC) return;
+  uint8_t type = hdr[1], seq = hdr[2], n = hdr[3];
+  if (n > MAX_PAYLOAD || Serial.readBytes(buf, n + 2) != (size_t)(n + 2)) { sendAck(FRAME_NAK, seq); return; }
+  uint16_t crc = crc16(buf, n, crc16(hdr + 1, 3, 0xFFFF));
+  if (crc != readU16(buf + n)) { sendAck(FRAME_NAK, seq); return; }
+  bool ok = (type == FRAME_SET) && applySetFrame(buf, n);
+  bool wantAck = !(n >= 3 && (buf[2] & FLAG_NO_ACK));
+  if (!ok) sendAck(FRAME_NAK, seq);
+  else if (wantAck) sendAck(FRAME_ACK, seq);
 }
 
 void loop() {
   rampUpdate();
+  sweepUpdate();
 
   if (!Serial.available()) return;
 
+  if (Serial.peek() == FRAME_SYNC) { readBinaryFrame(); return; }
+
   String line = Serial.readStringUntil('\n');
   line.trim();
   if (line.length()==0) { Serial.print("> "); return; }
 
   if (line == "h" || line == "H") { printHelp(); return; }
-  if (line == "test") { doTestSweep(currentChannel); Serial.print("> "); return; }
+  if (line == "test") { startTestSweep(currentChannel); Serial.print("> "); return; }
+  if (line == "v") { Serial.print(F("V ")); Serial.println(PROTO_VERSION); return; }
+
+  if (line.startsWith("f ")) {
+    int n = applyTextFrame(line.c_str() + 2);
+    if (n) { Serial.print(F("FRAME ")); Serial.print(n); Serial.println(F(" ch")); }
+    else   { Serial.println(F("[ERR] Bad frame. Use f <ch>:<angle>[:<speed>],...")); }
+    Serial.print("> "); return;
+  }
 
   if (line.startsWith("c ")) {
     int ch; if (sscanf(line.c_str(), "c %d", &ch) == 1) {
@@ -0,0 +1,340 @@
+"""Several hand boards behind one link.
+
+Usage:
+  python handDevices.py                          # list the hand boards found
+  python handDevices.py --probe-all              # ... probing every serial port
+  python handSerial.py --serve --port auto       # serve every hand board found
+  python handSerial.py --serve --port /dev/ttyACM0,/dev/ttyACM1
+  python hand_tracker.py --full-hand --port auto # hand slot k drives board k
+
+Ports come from serial.tools.list_ports; scans are cached for ``max_age``
+seconds so repeated lookups (launcher refreshes, reconnects) do not hit the
+OS every time. Probing opens a port (resetting most boards) and may write
+"h" to it, so only candidate ports are probed: those with the USB vendor id
+of an Arduino or a USB-serial chip found on clones (BOARD_VIDS), and ports
+already identified as hand boards. Other devices, such as modems, are left
+alone unless ``probe_all`` is given. A port is accepted as a hand board
+when it answers with the sketch's banner: "[PCA9685] ..." after the reset
+that opening the port causes, or the help text ("h") on boards that do not
+reset. The banner gives SERVO_MAX_DEG and "v" the protocol version; the USB
+serial number (the port name if there is none) is the board's id, so the
+order of boards, and with it the channel map, does not depend on
+enumeration order.
+
+HandRegistry maps global channel g to (board g // 16, channel g % 16), or to
+an explicit list of (board, channel) pairs. Every board has its own HandLink,
+and with it its own writer thread, so a frame spanning several boards is
+written to all ports at the same time; the per-command latency does not grow
+with the number of hands. HandRegistry has the HandLink interface
+(set_angle, set_frame, send, flush, stats, close), so the tracker, replay
+and --serve use it unchanged.
+"""
+
+import sys
+import threading
+import time
+
+import serial
+
+from handSerial import (BOOT_WAIT, MAX_CHANNELS, HandLink, default_port, query_version,
+                        read_banner)
+
+SCAN_MAX_AGE = 5.0          # seconds a port scan is reused
+BOARD_VIDS = {              # USB vendor ids probed by discover() without probe_all
+    0x2341,                 # Arduino
+    0x2A03,                 # Arduino (arduino.org)
+    0x1A86,                 # WCH CH340/CH341 (clones)
+    0x0403,                 # FTDI
+    0x10C4,                 # Silicon Labs CP210x
+    0x239A,                 # Adafruit
+}
+
+_scan_lock = threading.Lock()
+_scan = (float("-inf"), [])     # (time, ports)
+_identified = {}                # (port, hwid) -> BoardInfo or None
+
+
+class BoardInfo:
+    """What a port told us about itself."""
+    __slots__ = ("port", "board_id", "description", "max_deg", "version", "banner")
+
+    def __init__(self, port, board_id, description="", max_deg=None, version=0, banner=""):
+        self.port = port
+        self.board_id = board_id
+        self.description = description
+        self.max_deg = max_deg
+        self.version = version
+        self.banner = banner
+
+    def __repr__(self):
+        return (f"BoardInfo({self.port!r}, id={self.board_id!r}, max_deg={self.max_deg}, "
+                f"version={self.version})")
+
+
+def scan_ports(max_age: float = SCAN_MAX_AGE) -> list:
+    """serial.tools.list_ports.comports(), reused for ``max_age`` seconds."""
+    global _scan
+    from serial.tools import list_ports
+    with _scan_lock:
+        t, ports = _scan
+        now = time.monotonic()
+        if now - t > max_age:
+            ports = sorted(list_ports.comports(), key=lambda p: p.device)
+            _scan = (now, ports)
+        return ports
+
+
+def parse_banner(text: str) -> dict:
+    """Fields of the sketch's banner/help text: "sketch" and "max_deg" when present."""
+    out = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("[") and "]" in line:
+            out["sketch"] = line
+        elif line.startswith("SERVO_MAX_DEG="):
+            try:
+                out["max_deg"] = int(line.split("=", 1)[1].split()[0])
+            except (ValueError, IndexError):
+                pass
+    return out
+
+
+def identify(port: str, baud: int = 115200, board_id: str = None, timeout: float = BOOT_WAIT,
+             keep_open: bool = False):
+    """Open ``port`` and check for the hand sketch.
+
+    Returns (BoardInfo, serial port) with the port still open if keep_open,
+    (BoardInfo, None) otherwise, or (None, None) if no hand sketch answered.
+    """
+    try:
+        ser = serial.Serial(port, baud, timeout=1)
+    except (serial.SerialException, OSError):
+        return None, None
+    try:
+        text = read_banner(ser, timeout)
+        if not text:
+            # no reset on open: ask for the help text instead
+            ser.write(b"h\n")
+            text = read_banner(ser, 0.5)
+        fields = parse_banner(text)
+        if "max_deg" not in fields:
+            ser.close()
+            return None, None
+        ser.reset_input_buffer()
+        info = BoardInfo(port, board_id or port, fields.get("sketch", ""), fields["max_deg"],
+                         query_version(ser), text)
+    except (serial.SerialException, OSError):
+        ser.close()
+        return None, None
+    if not keep_open:
+        ser.close()
+        ser = None
+    return info, ser
+
+
+def is_board_port(p) -> bool:
+    """True if a list_ports entry has the USB vendor id of a board we probe."""
+    return p.vid in BOARD_VIDS
+
+
+def discover(baud: int = 115200, max_age: float = SCAN_MAX_AGE, keep_open: bool = False,
+             probe_all: bool = False) -> list:
+    """Hand boards on this machine, ordered by board id.
+
+    Each candidate port (is_board_port(), or every port with probe_all) is
+    probed (in parallel, a probe waits for the board's reset) once per
+    (port, hwid); later calls reuse the result. Returns (BoardInfo, serial
+    port or None) pairs; with keep_open, the known hand boards and new
+    candidates are probed again so they come with their port still open,
+    while ports known not to be hand boards are left alone.
+    """
+    found, probe = [], []
+    for p in scan_ports(max_age):
+        key = (p.device, p.hwid)
+        if key in _identified:
+            if _identified[key] is None:
+                continue
+            if not keep_open:
+                found.append((_identified[key], None))
+                continue
+        elif not (probe_all or is_board_port(p)):
+            continue
+        probe.append((p, key))
+
+    results = [None] * len(probe)
+
+    def run(i, p):
+        results[i] = identify(p.device, baud, p.serial_number or p.device, keep_open=keep_open)
+
+    threads = [threading.Thread(target=run, args=(i, p), daemon=True) for i, (p, _) in enumerate(probe)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for (p, key), (info, ser) in zip(probe, results):
+        _identified[key] = info
+        if info is not None:
+            if p.description and not info.description:
+                info.description = p.description
+            found.append((info, ser))
+    return sorted(found, key=lambda f: f[0].board_id)
+
+
+class HandRegistry:
+    """Several HandLinks addressed by global channel, see the module docstring.
+
+    ``channel_map`` is an optional list: entry g is the (board, channel) of
+    global channel g. Without it, board k has global channels 16k..16k+15.
+    """
+
+    def __init__(self, links: list, channel_map: list = None):
+        if not links:
+            raise ValueError("no hand boards")
+        self.links = links
+        self.boards = [None] * len(links)     # BoardInfo per link, when discovered
+        if channel_map is None:
+            channel_map = [(b, ch) for b in range(len(links)) for ch in range(MAX_CHANNELS)]
+        for b, ch in channel_map:
+            if not (0 <= b < len(links) and 0 <= ch < MAX_CHANNELS):
+                raise ValueError(f"bad channel map entry ({b}, {ch})")
+        self.channel_map = list(channel_map)
+        self.num_channels = len(self.channel_map)
+        self.port = ",".join(l.port for l in links)
+
+    @classmethod
+    def from_ports(cls, ports, baud: int = 115200, channel_map: list = None, **link_args):
+        """One HandLink per port ("a,b" or a list), in that order."""
+        if isinstance(ports, str):
+            ports = [p for p in ports.split(",") if p]
+        return cls([HandLink(p, baud, **link_args) for p in ports], channel_map)
+
+    @classmethod
+    def discover(cls, baud: int = 115200, channel_map: list = None, probe_all: bool = False,
+                 **link_args):
+        """Every hand board found (see discover()), ordered by board id.
+
+        The ports opened for probing are handed to the links, so each board
+        resets only once.
+        """
+        boards = discover(baud, keep_open=True, probe_all=probe_all)
+        if not boards:
+            raise ValueError("no hand boards found")
+        links = []
+        for info, ser in boards:
+            link = HandLink(info.port, baud, **link_args)
+            if ser is not None:
+                link.attach(ser, info.version)
+            links.append(link)
+        reg = cls(links, channel_map)
+        reg.boards = [info for info, _ in boards]
+        return reg
+
+    def route(self, channel: int):
+        """(link, board channel) of a global channel."""
+        if not 0 <= channel < self.num_channels:
+            raise ValueError(f"channel {channel} out of range (0..{self.num_channels - 1})")
+        b, ch = self.channel_map[channel]
+        return self.links[b], ch
+
+    # --- HandLink interface ---
+    def connect(self) -> bool:
+        """Open every port at once; True if all of them opened."""
+        ok = [False] * len(self.links)
+
+        def run(i, link):
+            ok[i] = link.connect()
+
+        threads = [threading.Thread(target=run, args=(i, l), daemon=True) for i, l in enumerate(self.links)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return all(ok)
+
+    @property
+    def connected(self) -> bool:
+        return all(l.connected for l in self.links)
+
+    @property
+    def binary(self) -> bool:
+        return all(l.binary for l in self.links)
+
+    def set_angle(self, channel: int, angle: float, speed: float = None) -> bool:
+        return self.set_frame({channel: (angle, speed)})
+
+    def set_frame(self, targets: dict) -> bool:
+        """Split targets by board and queue each part on its board's writer.
+
+        Parts are queued back to back without waiting for I/O, so the
+        boards' writer threads write them concurrently. Raises ValueError,
+        queuing nothing, if a channel is not in the channel map.
+        """
+        parts = {}
+        for g in targets:
+            if not 0 <= int(g) < self.num_channels:
+                raise ValueError(f"channel {g} out of range (0..{self.num_channels - 1})")
+        for g, val in targets.items():
+            b, ch = self.channel_map[int(g)]
+            parts.setdefault(b, {})[ch] = val
+        ok = True
+        for b, part in parts.items():
+            ok = self.links[b].set_frame(part) and ok
+        return ok
+
+    def send(self, line: str, board: int = 0) -> bool:
+        """Queue a raw command line for one board (board 0 by default)."""
+        return self.links[board].send(line)
+
+    def flush(self, timeout: float = 1.0) -> bool:
+        deadline = time.monotonic() + timeout
+        return all(l.flush(max(0.0, deadline - time.monotonic())) for l in self.links)
+
+    def stats(self, reset_rate: bool = True) -> dict:
+        """HandLink.stats() summed over the boards, plus "boards": the per-board dicts."""
+        per = [l.stats(reset_rate) for l in self.links]
+        total = {k: sum(st[k] for st in per) for k in per[0] if k != "connected"}
+        total["connected"] = all(st["connected"] for st in per)
+        total["boards"] = per
+        return total
+
+    def close(self, flush_timeout: float = 0.5):
+        for l in self.links:
+            l.close(flush_timeout)
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_link(port: str = None, baud: int = 115200, **link_args):
+    """HandLink for one port, HandRegistry for "a,b,..." or "auto" (discovery)."""
+    port = port or default_port()
+    if port == "auto":
+        return HandRegistry.discover(baud, **link_args)
+    if "," in port:
+        return HandRegistry.from_ports(port, baud, **link_args)
+    return HandLink(port, baud, **link_args)
+
+
+def main(argv=None):
+    import argparse
+    p = argparse.ArgumentParser(description="List the hand boards on this machine")
+    p.add_argument("--baud", type=int, default=115200)
+    p.add_argument("--probe-all", action="store_true",
+                   help="Probe every serial port, not only known board vendor ids (resets them)")
+    args = p.parse_args(argv)
+    boards = discover(args.baud, probe_all=args.probe_all)
+    if not boards:
+        print("no hand boards found", file=sys.stderr)
+        return 1
+    for k, (info, _) in enumerate(boards):
+        print(f"board {k}: {info.port} id={info.board_id} channels {16 * k}-{16 * k + 15} "
+              f"max_deg={info.max_deg} version={info.version} {info.description}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,505 @@
+"""Emulator of the hand1.2.ino sketch on a pseudo-terminal (Linux/macOS).
+
+Usage:
+  python handEmulator.py                        # prints the pty path to use as --port
+  python handEmulator.py --link /tmp/prism-hand --log positions.csv
+  python handSerial.py --serve --port /tmp/prism-hand
+
+The emulator implements the sketch's command set (h, c, a, s, <ch> <angle>,
+f, v, test and binary FRAME_SET frames) with the same replies and "> "
+prompts, and runs the same 100 Hz speed-limited ramp as rampUpdate(). Bytes
+in both directions are paced at the configured baud rate (10 bits per byte),
+and line/frame reads time out after 50 ms like the sketch's Serial.setTimeout.
+
+Servo positions can be logged to CSV (one row per ramp tick in which a servo
+moved), and stats() reports command-to-motion latency: the time from a
+command's first byte reaching the port to the first ramp tick that moves a
+servo it targeted.
+
+From Python:
+  emu = Emulator(); emu.start(); link = HandLink(emu.port); ...; emu.stop()
+"""
+
+import argparse
+import os
+import re
+import select
+import sys
+import threading
+import time
+from collections import deque
+
+from handSerial import (FRAME_ACK, FRAME_NAK, FRAME_SET, FRAME_SYNC, FLAG_NO_ACK, FLAG_SPEEDS,
+                        MAX_CHANNELS, MAX_PAYLOAD, PROTO_VERSION, crc16, encode_frame)
+
+SERVO_MAX_DEG = 270
+DEFAULT_SPEED = 60.0        # deg/s, as in setup()
+RAMP_PERIOD_MS = 10         # rampUpdate() runs at ~100 Hz
+READ_TIMEOUT = 0.05         # Serial.setTimeout(50)
+SWEEP = ((0.0, 1000), (1.0, 2000), (0.5, 1500))    # startTestSweep(): (fraction of max_deg, hold ms)
+
+HELP = (
+    "\r\n"
+    "Commands:\r\n"
+    "  h              : help\r\n"
+    "  c <ch>         : select current channel (0-15)\r\n"
+    "  a <angle>      : set target angle for current channel (0..SERVO_MAX_DEG)\r\n"
+    "  s <speed>      : set speed for current channel (deg/sec, e.g. 60)\r\n"
+    "  <ch> <angle>   : set target for a specific channel (keeps its speed)\r\n"
+    "  f <ch>:<angle>[:<speed>],... : set several channels at once\r\n"
+    "  test           : sweep current channel\r\n"
+    "  v              : protocol version (binary frames start with 0xA5)\r\n"
+)
+
+_INT = r"[+-]?\d+"
+_FLOAT = r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?"
+_FRAME_ITEM = re.compile(r"\s*(" + _INT + r"):\s*(" + _FLOAT + r")(?::\s*(" + _FLOAT + r"))?")
+
+
+def _clamp(v, lo, hi):
+    return lo if v < lo else (hi if v > hi else v)
+
+
+def _fmt(v: float) -> str:
+    """Serial.print(float): two decimals."""
+    return f"{v:.2f}"
+
+
+def parse_text_frame(s: str):
+    """Port of applyTextFrame(): {ch: (angle, speed or None)}, or None if malformed."""
+    out = {}
+    pos = 0
+    while pos < len(s):
+        m = _FRAME_ITEM.match(s, pos)
+        if not m:
+            return None
+        ch = int(m.group(1))
+        if not 0 <= ch < MAX_CHANNELS:
+            return None
+        pos = m.end()
+        if pos < len(s) and s[pos] not in ", ":
+            return None
+        while pos < len(s) and s[pos] in ", ":
+            pos += 1
+        out[ch] = (float(m.group(2)), float(m.group(3)) if m.group(3) else None)
+    return out
+
+
+class ServoBoard:
+    """State and command handling of the sketch, without any I/O.
+
+    handle_line() and handle_frame() return the bytes the sketch would print;
+    ramp() advances the servos like rampUpdate() and returns the channels
+    that moved, and sweep() advances the "test" sweep like sweepUpdate().
+    """
+
+    def __init__(self, max_deg: int = SERVO_MAX_DEG):
+        self.max_deg = max_deg
+        self.current = [0.0] * MAX_CHANNELS
+        self.target = [0.0] * MAX_CHANNELS
+        self.speed = [DEFAULT_SPEED] * MAX_CHANNELS
+        self.channel = 0
+        self.last_ms = 0
+        self.sweep_ch = -1          # channel of the running "test" sweep, -1 = idle
+        self.sweep_step = 0
+        self.sweep_at_ms = 0
+
+    def banner(self) -> bytes:
+        return b"\r\n\r\n[PCA9685] Smooth ramp controller\r\n" + self.help()
+
+    def help(self) -> bytes:
+        text = HELP + f"  Current ch: {self.channel}\r\n  SERVO_MAX_DEG={self.max_deg}\r\n> "
+        return text.encode("utf-8")
+
+    def ramp(self, now_ms: int) -> list:
+        if now_ms - self.last_ms < RAMP_PERIOD_MS:
+            return []
+        dt = (now_ms - self.last_ms) / 1000.0
+        self.last_ms = now_ms
+        moved = []
+        for ch in range(MAX_CHANNELS):
+            cur = self.current[ch]
+            tgt = _clamp(self.target[ch], 0, self.max_deg)
+            s = self.speed[ch]
+            if s <= 0:
+                continue
+            step = s * dt
+            if abs(tgt - cur) <= step:
+                new = tgt
+            elif tgt > cur:
+                new = cur + step
+            else:
+                new = cur - step
+            if new != cur:
+                self.current[ch] = new
+                moved.append(ch)
+        return moved
+
+    def _sweep_target(self) -> float:
+        return SWEEP[self.sweep_step][0] * self.max_deg
+
+    def sweep(self, now_ms: int) -> bytes:
+        """sweepUpdate(): next step of a running sweep; returns what the sketch prints."""
+        if self.sweep_ch < 0:
+            return b""
+        if self.target[self.sweep_ch] != self._sweep_target():
+            self.sweep_ch = -1      # overridden by a command
+            return b"[TEST] Stopped.\r\n"
+        hold = SWEEP[self.sweep_step][1]
+        if now_ms - self.sweep_at_ms < hold:
+            return b""
+        self.sweep_at_ms += hold
+        self.sweep_step += 1
+        if self.sweep_step >= len(SWEEP):
+            self.sweep_ch = -1
+            return b"[TEST] Done.\r\n> "
+        self.target[self.sweep_ch] = self._sweep_target()
+        return b""
+
+    def _target_reply(self, ch: int) -> str:
+        return f"CH {ch} target -> {_fmt(self.target[ch])}°\r\n> "
+
+    def handle_line(self, line: str):
+        """Apply one text command; returns (reply bytes, channels targeted)."""
+        line = line.strip()
+        if not line:
+            return b"> ", []
+        if line in ("h", "H"):
+            return self.help(), []
+        if line == "v":
+            return f"V {PROTO_VERSION}\r\n".encode(), []
+        if line == "test":
+            # startTestSweep(); the sweep runs on from sweep() without blocking
+            self.sweep_ch, self.sweep_step, self.sweep_at_ms = self.channel, 0, self.last_ms
+            self.target[self.channel] = self._sweep_target()
+            return b"[TEST] Sweep current channel\r\n> ", [self.channel]
+        if line.startswith("f "):
+            targets = parse_text_frame(line[2:])
+            if not targets:
+                return b"[ERR] Bad frame. Use f <ch>:<angle>[:<speed>],...\r\n> ", []
+            for ch, (angle, speed) in targets.items():
+                self.target[ch] = _clamp(angle, 0, self.max_deg)
+                if speed is not None and speed >= 0:
+                    self.speed[ch] = speed
+            return f"FRAME {len(targets)} ch\r\n> ".encode(), sorted(targets)
+        if line.startswith("c "):
+            m = re.match(r"c\s*(" + _INT + ")", line)
+            if m:
+                self.channel = _clamp(int(m.group(1)), 0, MAX_CHANNELS - 1)
+                return f"Current channel = {self.channel}\r\n> ".encode(), []
+            return b"> ", []
+        if line.startswith("a "):
+            m = re.match(r"a\s*(" + _FLOAT + ")", line)
+            if m:
+                self.target[self.channel] = _clamp(float(m.group(1)), 0, self.max_deg)
+                return self._target_reply(self.channel).encode("utf-8"), [self.channel]
+            return b"> ", []
+        if line.startswith("s "):
+            m = re.match(r"s\s*(" + _FLOAT + ")", line)
+            if m:
+                sp = float(m.group(1))
+                self.speed[self.channel] = 0.0 if sp < 0 else sp
+                return f"CH {self.channel} speed -> {_fmt(self.speed[self.channel])} °/s\r\n> ".encode("utf-8"), []
+            return b"> ", []
+        m = re.match(r"\s*(" + _INT + r")\s+(" + _INT + ")", line)
+        if m:
+            ch = _clamp(int(m.group(1)), 0, MAX_CHANNELS - 1)
+            self.target[ch] = _clamp(float(int(m.group(2))), 0, self.max_deg)
+            return self._target_reply(ch).encode("utf-8"), [ch]
+        return b"[ERR] Unknown command. Type 'h' for help.\r\n> ", []
+
+    def handle_frame(self, ftype: int, seq: int, payload: bytes):
+        """Port of readBinaryFrame() after the CRC check: (reply bytes, channels targeted)."""
+        chans = self._apply_set(payload) if ftype == FRAME_SET else None
+        if chans is None:
+            return encode_frame(FRAME_NAK, b"", seq), []
+        if len(payload) >= 3 and payload[2] & FLAG_NO_ACK:
+            return b"", chans
+        return encode_frame(FRAME_ACK, b"", seq), chans
+
+    def _apply_set(self, p: bytes):
+        if len(p) < 3:
+            return None
+        mask = int.from_bytes(p[0:2], "little")
+        width = 4 if p[2] & FLAG_SPEEDS else 2
+        chans = [ch for ch in range(MAX_CHANNELS) if mask & (1 << ch)]
+        if len(p) != 3 + len(chans) * width:
+            return None
+        q = 3
+        for ch in chans:
+            self.target[ch] = _clamp(int.from_bytes(p[q:q + 2], "little") / 10.0, 0, self.max_deg)
+            if width == 4:
+                sp = int.from_bytes(p[q + 2:q + 4], "little")
+                if sp:
+                    self.speed[ch] = sp / 10.0   # 0 = keep current speed
+            q += width
+        return chans
+
+
+class Emulator:
+    """Runs a ServoBoard behind a pseudo-terminal on a background thread.
+
+    ``port`` is the pty path a HandLink (or any serial program) can open.
+    ``log`` is an optional path for a CSV position log.
+    """
+
+    def __init__(self, baud: int = 115200, max_deg: int = SERVO_MAX_DEG, log: str = None,
+                 link: str = None, on_tick=None):
+        if not hasattr(os, "openpty"):
+            raise RuntimeError("the emulator needs a pseudo-terminal (Linux/macOS)")
+        import tty
+        self.board = ServoBoard(max_deg)
+        self.byte_time = 10.0 / baud
+        self.on_tick = on_tick          # called as on_tick(t, moved channels, positions)
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._master)
+        tty.setraw(self._slave)
+        os.set_blocking(self._master, False)
+        self.port = os.ttyname(self._slave)
+        self.link = link
+        if link:
+            if os.path.islink(link):
+                os.unlink(link)
+            os.symlink(self.port, link)
+        self._log = open(log, "w") if log else None
+        if self._log:
+            self._log.write("t," + ",".join(f"ch{i}" for i in range(MAX_CHANNELS)) + "\n")
+
+        self._wire = deque()            # [t_read, bytes] still being clocked in at the baud rate
+        self._rx = bytearray()          # bytes "received" by the sketch
+        self._rx_t0 = None              # when the oldest unprocessed byte was written by the host
+        self._rx_last = 0.0             # when the last byte finished arriving
+        self._tx = bytearray()
+        self._tx_t = 0.0
+        self._pending_motion = {}       # ch -> t of the command waiting to move it
+        self.motion_latency = deque(maxlen=100000)
+        self.counts = {"lines": 0, "frames": 0, "naks": 0, "errors": 0,
+                       "bytes_in": 0, "bytes_out": 0, "dropped_out": 0}
+        self._stop = threading.Event()
+        self._thread = None
+        self.t_start = None
+
+    def start(self):
+        self.t_start = time.monotonic()
+        self._emit(self.board.banner(), self.t_start)
+        self._thread = threading.Thread(target=self._run, name="hand-emulator", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(1.0)
+        if self._log:
+            self._log.close()
+        if self.link and os.path.islink(self.link):
+            os.unlink(self.link)
+        for fd in (self._master, self._slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def positions(self) -> list:
+        return list(self.board.current)
+
+    def stats(self) -> dict:
+        lat = sorted(self.motion_latency)
+        st = dict(self.counts)
+        st["motion_samples"] = len(lat)
+        if lat:
+            st["motion_p50_ms"] = round(lat[len(lat) // 2] * 1000, 3)
+            st["motion_p95_ms"] = round(lat[min(len(lat) - 1, int(len(lat) * 0.95))] * 1000, 3)
+            st["motion_max_ms"] = round(lat[-1] * 1000, 3)
+        return st
+
+    # --- loop ---------------------------------------------------------------
+
+    def _run(self):
+        while not self._stop.is_set():
+            now = time.monotonic()
+            self._tick(now)
+            self._deliver(now)
+            self._process(now)
+            self._flush_tx(now)
+            busy = self._wire or self._tx or self._rx
+            wait = 0.001 if busy else RAMP_PERIOD_MS / 1000.0 / 2
+            r, _, _ = select.select([self._master], [], [], wait)
+            if r:
+                try:
+                    data = os.read(self._master, 4096)
+                except (BlockingIOError, OSError):
+                    data = b""
+                if data:
+                    self.counts["bytes_in"] += len(data)
+                    self._wire.append([time.monotonic(), bytes(data)])
+
+    def _tick(self, now: float):
+        now_ms = int((now - self.t_start) * 1000)
+        moved = self.board.ramp(now_ms)
+        out = self.board.sweep(now_ms)
+        if out:
+            self._emit(out, now)
+        if not moved:
+            return
+        for ch in moved:
+            t_cmd = self._pending_motion.pop(ch, None)
+            if t_cmd is not None:
+                self.motion_latency.append(now - t_cmd)
+        if self._log:
+            self._log.write(f"{now - self.t_start:.3f}," + ",".join(f"{v:.2f}" for v in self.board.current) + "\n")
+        if self.on_tick:
+            self.on_tick(now - self.t_start, moved, self.board.current)
+
+    def _deliver(self, now: float):
+        """Move bytes that have been clocked in at the baud rate into the rx buffer."""
+        while self._wire:
+            entry = self._wire[0]
+            t_read, data = entry
+            start = max(t_read, self._rx_last)
+            n = min(len(data), int((now - start) / self.byte_time))
+            if n <= 0:
+                return
+            if not self._rx:
+                self._rx_t0 = t_read
+            self._rx += data[:n]
+            self._rx_last = start + n * self.byte_time
+            if n == len(data):
+                self._wire.popleft()
+            else:
+                entry[0] = self._rx_last
+                entry[1] = data[n:]
+                return
+
+    def _process(self, now: float):
+        """One pass of loop(): handle at most one complete command."""
+        if not self._rx:
+            return
+        timed_out = not self._wire and now - self._rx_last >= READ_TIMEOUT
+        t_cmd = self._rx_t0
+        if self._rx[0] == FRAME_SYNC:
+            reply, chans = self._read_frame(timed_out)
+            if reply is None:
+                return
+        else:
+            i = self._rx.find(b"\n")
+            if i < 0 and not timed_out:
+                return
+            end = i if i >= 0 else len(self._rx)
+            raw = bytes(self._rx[:end])
+            del self._rx[:end + 1]
+            self.counts["lines"] += 1
+            line = raw.decode("utf-8", errors="replace")
+            reply, chans = self.board.handle_line(line)
+            if reply.startswith(b"[ERR]"):
+                self.counts["errors"] += 1
+        if not self._rx:
+            self._rx_t0 = None
+        for ch in chans:
+            if self.board.current[ch] != _clamp(self.board.target[ch], 0, self.board.max_deg):
+                self._pending_motion.setdefault(ch, t_cmd)
+            else:
+                self._pending_motion.pop(ch, None)
+        if reply:
+            self._emit(reply, now)
+
+    def _read_frame(self, timed_out: bool):
+        """Mirror readBinaryFrame(); returns (reply, chans) or (None, None) while incomplete."""
+        rx = self._rx
+        if len(rx) < 4:
+            if timed_out:
+                rx.clear()          # readBytes(hdr, 4) failed: the sketch drops the bytes
+                return b"", []
+            return None, None
+        ftype, seq, n = rx[1], rx[2], rx[3]
+        if n > MAX_PAYLOAD:
+            del rx[:4]
+            self.counts["naks"] += 1
+            return encode_frame(FRAME_NAK, b"", seq), []
+        if len(rx) < 6 + n:
+            if timed_out:
+                rx.clear()
+                self.counts["naks"] += 1
+                return encode_frame(FRAME_NAK, b"", seq), []
+            return None, None
+        body = bytes(rx[1:4 + n])
+        crc = int.from_bytes(rx[4 + n:6 + n], "little")
+        del rx[:6 + n]
+        self.counts["frames"] += 1
+        if crc16(body) != crc:
+            self.counts["naks"] += 1
+            return encode_frame(FRAME_NAK, b"", seq), []
+        reply, chans = self.board.handle_frame(ftype, seq, body[3:])
+        if reply and reply[1] == FRAME_NAK:
+            self.counts["naks"] += 1
+        return reply, chans
+
+    def _emit(self, data: bytes, now: float):
+        if not self._tx:
+            self._tx_t = now
+        self._tx += data
+
+    def _flush_tx(self, now: float):
+        """Write the bytes the UART could have sent by ``now``."""
+        if not self._tx:
+            return
+        n = min(len(self._tx), int((now - self._tx_t) / self.byte_time))
+        if n <= 0:
+            return
+        try:
+            written = os.write(self._master, bytes(self._tx[:n]))
+        except (BlockingIOError, OSError):
+            # nobody is reading the port: drop like a USB CDC buffer would
+            written = n
+            self.counts["dropped_out"] += n
+        del self._tx[:written]
+        self._tx_t += written * self.byte_time
+        self.counts["bytes_out"] += written
+
+
+def format_stats(st: dict) -> str:
+    line = (f"EMU lines={st['lines']} frames={st['frames']} naks={st['naks']} errors={st['errors']} "
+            f"in={st['bytes_in']}B out={st['bytes_out']}B")
+    if st.get("motion_samples"):
+        line += (f" motion p50={st['motion_p50_ms']}ms p95={st['motion_p95_ms']}ms "
+                 f"max={st['motion_max_ms']}ms (n={st['motion_samples']})")
+    return line
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Emulate the hand sketch on a pseudo-terminal")
+    p.add_argument("--baud", type=int, default=115200, help="Emulated line rate (bytes are paced at baud/10)")
+    p.add_argument("--link", default=None, help="Also expose the pty at this path (symlink)")
+    p.add_argument("--log", default=None, help="CSV file for servo positions over time")
+    p.add_argument("--max-deg", type=int, default=SERVO_MAX_DEG, help="SERVO_MAX_DEG of the emulated sketch")
+    p.add_argument("--stats-interval", type=float, default=5.0, help="Seconds between EMU lines (0 = off)")
+    args = p.parse_args(argv)
+
+    try:
+        emu = Emulator(args.baud, args.max_deg, args.log, args.link)
+    except (RuntimeError, OSError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    emu.start()
+    print(f"Emulating hand1.2.ino on {args.link or emu.port} @{args.baud}", flush=True)
+    try:
+        while True:
+            time.sleep(args.stats_interval if args.stats_interval > 0 else 3600)
+            if args.stats_interval > 0:
+                print(format_stats(emu.stats()), flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        emu.stop()
+        print(format_stats(emu.stats()), flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
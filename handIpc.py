@@ -0,0 +1,205 @@
+"""Local IPC channel between the tracker, the hand server and the launcher.
+
+Fixed-size binary messages go over datagram sockets: Unix-domain sockets on
+Linux/macOS, UDP on 127.0.0.1 on Windows. A publisher never blocks; if a
+receiver is missing or its buffer is full, the message is dropped and
+counted. Receivers only ever want the newest targets anyway, so they should
+drain their socket promptly (Linux queues only ~10 datagrams per Unix socket).
+
+  msg: magic "PR" | version u8 | kind u8 | seq u32 | t_ns i64 | hand i8 | pad |
+       mask u16 | angle f32 | servo f32[16] | speed f32[16]
+
+t_ns is time.monotonic_ns() at publish time (the clock is shared by processes
+on one machine), so receivers can measure delivery latency. KIND_ANGLE
+carries the smoothed palm angle of one hand for display; KIND_TARGETS carries
+servo targets for the channels set in ``mask`` (speed NaN = keep the current
+speed).
+
+Addresses are strings: "unix:/tmp/prism-hand.sock" or "udp:127.0.0.1:47810".
+
+  python hand_tracker.py --publish unix:/tmp/prism-hand.sock
+  python handSerial.py --serve --ipc unix:/tmp/prism-hand.sock
+"""
+
+import math
+import os
+import platform
+import socket
+import struct
+import tempfile
+import time
+
+MAGIC = b"PR"
+VERSION = 1
+KIND_ANGLE = 1
+KIND_TARGETS = 2
+NUM_CHANNELS = 16
+MESSAGE = struct.Struct("<2sBBIqbxHf16f16f")
+MESSAGE_SIZE = MESSAGE.size     # 152
+
+DEFAULT_UDP_PORTS = {"hand": 47810, "monitor": 47811, "telemetry": 47812}
+
+
+class Message:
+    """One decoded IPC message."""
+    __slots__ = ("kind", "seq", "t_ns", "hand", "angle", "mask", "servo", "speed")
+
+    def targets(self) -> dict:
+        """{channel: (angle, speed or None)} for the channels in the mask."""
+        return {ch: (self.servo[ch], None if math.isnan(self.speed[ch]) else self.speed[ch])
+                for ch in range(NUM_CHANNELS) if self.mask & (1 << ch)}
+
+    def age_ms(self) -> float:
+        return (time.monotonic_ns() - self.t_ns) / 1e6
+
+
+def encode_message(kind: int, seq: int, hand: int = -1, angle: float = math.nan,
+                   targets: dict = None, t_ns: int = None) -> bytes:
+    """Pack a message; targets is {ch: angle or (angle, speed)} like HandLink.set_frame()."""
+    servo = [math.nan] * NUM_CHANNELS
+    speed = [math.nan] * NUM_CHANNELS
+    mask = 0
+    for ch, val in (targets or {}).items():
+        a, s = (val if isinstance(val, (tuple, list)) else (val, None))
+        ch = int(ch)
+        if not 0 <= ch < NUM_CHANNELS:
+            raise ValueError(f"channel {ch} out of range")
+        mask |= 1 << ch
+        servo[ch] = float(a)
+        if s is not None:
+            speed[ch] = float(s)
+    return MESSAGE.pack(MAGIC, VERSION, kind, seq & 0xFFFFFFFF,
+                        time.monotonic_ns() if t_ns is None else t_ns,
+                        hand, mask, angle, *servo, *speed)
+
+
+def decode_message(data: bytes) -> Message:
+    if len(data) != MESSAGE_SIZE:
+        raise ValueError(f"bad message size {len(data)}")
+    fields = MESSAGE.unpack(data)
+    if fields[0] != MAGIC or fields[1] != VERSION:
+        raise ValueError("not a hand IPC message")
+    m = Message()
+    m.kind, m.seq, m.t_ns, m.hand, m.mask, m.angle = fields[2:8]
+    m.servo = fields[8:8 + NUM_CHANNELS]
+    m.speed = fields[8 + NUM_CHANNELS:]
+    return m
+
+
+def default_address(name: str = "hand") -> str:
+    """Per-user default address for the "hand" server, the "monitor" or "telemetry" (launcher)."""
+    if platform.system() == "Windows" or not hasattr(socket, "AF_UNIX"):
+        return f"udp:127.0.0.1:{DEFAULT_UDP_PORTS.get(name, 0)}"
+    user = os.environ.get("USER") or str(os.getuid())
+    return f"unix:{os.path.join(tempfile.gettempdir(), f'prism-{name}-{user}.sock')}"
+
+
+def parse_address(addr: str):
+    """"unix:/path" or "udp:host:port" -> (family, sockaddr)."""
+    kind, _, rest = addr.partition(":")
+    if kind == "unix":
+        return socket.AF_UNIX, rest
+    if kind == "udp":
+        host, _, port = rest.rpartition(":")
+        return socket.AF_INET, (host or "127.0.0.1", int(port))
+    raise ValueError(f"bad IPC address {addr!r} (want unix:/path or udp:host:port)")
+
+
+class Publisher:
+    """Sends messages to one or more receivers without ever blocking.
+
+    It also works as a drop-in for HandLink in the tracker: set_angle() and
+    set_frame() publish KIND_TARGETS messages.
+    """
+
+    def __init__(self, addresses):
+        if isinstance(addresses, str):
+            addresses = [a for a in addresses.split(",") if a]
+        self.addresses = [parse_address(a) for a in addresses]
+        self._socks = {}
+        for family, _ in self.addresses:
+            if family not in self._socks:
+                s = socket.socket(family, socket.SOCK_DGRAM)
+                s.setblocking(False)
+                self._socks[family] = s
+        self.seq = 0
+        self.sent = 0
+        self.dropped = 0
+
+    def publish(self, kind: int, hand: int = -1, angle: float = math.nan, targets: dict = None) -> bool:
+        data = encode_message(kind, self.seq, hand, angle, targets)
+        self.seq += 1
+        ok = False
+        for family, addr in self.addresses:
+            try:
+                self._socks[family].sendto(data, addr)
+                self.sent += 1
+                ok = True
+            except OSError:
+                # no receiver bound yet, or its queue is full
+                self.dropped += 1
+        return ok
+
+    def publish_angle(self, hand: int, angle: float) -> bool:
+        return self.publish(KIND_ANGLE, hand, angle)
+
+    def set_angle(self, channel: int, angle: float, speed: float = None) -> bool:
+        return self.set_frame({channel: (angle, speed)})
+
+    def set_frame(self, targets: dict, hand: int = -1) -> bool:
+        self.publish(KIND_TARGETS, hand, targets=targets)
+        return True
+
+    def close(self):
+        for s in self._socks.values():
+            s.close()
+        self._socks.clear()
+
+
+class Subscriber:
+    """Bound receiving end of an IPC address."""
+
+    def __init__(self, address: str, rcvbuf: int = 64 * 1024):
+        self.address = address
+        family, self._addr = parse_address(address)
+        if family == socket.AF_UNIX and os.path.exists(self._addr):
+            os.unlink(self._addr)      # stale socket file from an earlier run
+        self.sock = socket.socket(family, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+        self.sock.bind(self._addr)
+        self._family = family
+        self.received = 0
+        self.bad = 0
+
+    def fileno(self) -> int:
+        return self.sock.fileno()
+
+    def recv(self, timeout: float = None):
+        """Next message, or None on timeout."""
+        self.sock.settimeout(timeout)
+        while True:
+            try:
+                data = self.sock.recv(MESSAGE_SIZE + 1)
+            except (socket.timeout, BlockingIOError):
+                return None
+            try:
+                msg = decode_message(data)
+            except ValueError:
+                self.bad += 1
+                continue
+            self.received += 1
+            return msg
+
+    def drain(self) -> list:
+        """All messages that are already queued (non-blocking)."""
+        out = []
+        while True:
+            msg = self.recv(0)
+            if msg is None:
+                return out
+            out.append(msg)
+
+    def close(self):
+        self.sock.close()
+        if self._family == socket.AF_UNIX and os.path.exists(self._addr):
+            os.unlink(self._addr)
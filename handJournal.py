@@ -0,0 +1,309 @@
+"""Motion journals: timestamped servo targets, and time-accurate playback.
+
+Usage:
+  python handJournal.py play wave.journal --port auto [--speed 0.5] [--loop 0] [--rate 100]
+  python handJournal.py play wave.journal --net serialhost:47820
+  python handJournal.py info wave.journal
+  python hand_tracker.py --journal session.journal      # record what the tracker sends
+
+A journal is a text file, one entry per line, easy to write by hand:
+
+  # comments and blank lines are ignored
+  0.000  0:135:45          <t seconds> <ch:angle[:speed],...>  (handSerial frame spec)
+  1.500  0:270,1:90,17:45  channels are global: 16..31 is the second hand (handDevices.py)
+  3.000                    a time alone: hold until then (sets the length of a loop)
+
+Player streams a journal to anything with set_frame() (HandLink,
+HandRegistry, handIpc.Publisher, handNet.NetPublisher). Each entry is due
+at start + t / speed on time.monotonic(); due times are absolute, so a late
+send never pushes back the ones after it and nothing drifts over long or
+looped runs. The thread sleeps until ``SPIN`` before an entry and spins for
+the rest. Sends are at most ``rate`` per second (default: the sketch's
+100 Hz rampUpdate): entries due within one period of a send are merged
+into it, the newest target per channel winning. Speeds in the journal are
+scaled with the playback speed, so a half-speed run also ramps at half speed.
+Channels the link does not have (its ``num_channels``, 16 for a link
+without one) are left out of every send and counted in ``skipped``.
+
+Every send records its lateness against its slot; report() gives p50/p95/max
+lateness, jitter (standard deviation) and drift (how far the last send's
+lateness moved from the first's).
+"""
+
+import argparse
+import math
+import sys
+import threading
+import time
+
+from handSerial import MAX_CHANNELS, format_frame, parse_frame_spec
+
+RATE = 100.0                # sends per second at most (the sketch ramps at 100 Hz)
+SPIN = 0.002                # seconds before a due time that the player stops sleeping
+MAX_JOURNAL_CHANNELS = 4 * MAX_CHANNELS     # global channels a journal may address
+
+
+class Journal:
+    """Entries (t, {channel: (angle, speed or None)}), sorted by t."""
+
+    def __init__(self, entries=None):
+        self.entries = sorted(entries or [], key=lambda e: e[0])
+
+    @classmethod
+    def parse(cls, lines, name: str = "<journal>"):
+        entries = []
+        for n, raw in enumerate(lines, 1):
+            line = raw.split("#", 1)[0].strip()
+            if not line:
+                continue
+            t, _, spec = line.partition(" ")
+            try:
+                t = float(t)
+                targets = parse_frame_spec(spec, MAX_JOURNAL_CHANNELS) if spec.strip() else {}
+            except ValueError as e:
+                raise ValueError(f"{name}:{n}: {e}") from None
+            if t < 0:
+                raise ValueError(f"{name}:{n}: negative time")
+            entries.append((t, targets))
+        return cls(entries)
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path) as f:
+            return cls.parse(f, path)
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            for t, targets in self.entries:
+                f.write(format_entry(t, targets) + "\n")
+
+    @property
+    def duration(self) -> float:
+        return self.entries[-1][0] if self.entries else 0.0
+
+    def channels(self) -> list:
+        return sorted({ch for _, targets in self.entries for ch in targets})
+
+
+def format_entry(t: float, targets: dict) -> str:
+    """One journal line; format_frame() without its "f " prefix."""
+    return f"{t:.3f}" + (" " + format_frame(targets)[2:] if targets else "")
+
+
+class JournalWriter:
+    """Appends entries as they happen (times relative to the first entry)."""
+
+    def __init__(self, path: str):
+        self._f = open(path, "w", buffering=1)
+        self._f.write("# PRISM motion journal: <t seconds> <ch:angle[:speed],...>\n")
+        self._t0 = None
+        self.entries = 0
+
+    def write(self, now: float, targets: dict):
+        if self._t0 is None:
+            self._t0 = now
+        self._f.write(format_entry(now - self._t0, targets) + "\n")
+        self.entries += 1
+
+    def close(self):
+        self._f.close()
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+class Player:
+    """Plays a Journal on ``link``, see the module docstring.
+
+    ``loops`` is the number of passes (0 = until stop()). run() blocks;
+    start() runs it on a thread.
+    """
+
+    def __init__(self, link, journal: Journal, speed: float = 1.0, loops: int = 1,
+                 rate: float = RATE, on_send=None):
+        if speed <= 0:
+            raise ValueError("speed must be > 0")
+        self.link = link
+        self.journal = journal
+        self.speed = speed
+        self.loops = loops
+        self.period = 1.0 / rate if rate else 0.0
+        self.limit = getattr(link, "num_channels", MAX_CHANNELS)
+        self.on_send = on_send          # called as on_send(slot time, targets) after each send
+        self._stop = threading.Event()
+        self._thread = None
+        self.loop = 0
+        self.sent = 0
+        self.merged = 0                 # entries folded into an earlier entry's slot
+        self.failed = 0
+        self.skipped = 0                # targets dropped for channels beyond the link
+        self.late_ms = []               # lateness per send, against its slot
+
+    def _slots(self, t0: float):
+        """(slot time, merged targets, entry count) for one pass starting at t0."""
+        slot, pending, count = None, {}, 0
+        for t, targets in self.journal.entries:
+            due = t0 + t / self.speed
+            if pending and due < slot + self.period:
+                # lands on the same ramp tick: one write, newest target per channel
+                pending.update(self._scaled(targets))
+                count += 1
+                continue
+            if pending:
+                yield slot, pending, count
+            slot, pending, count = due, self._scaled(targets), 1
+        if pending:
+            yield slot, pending, count
+
+    def _scaled(self, targets: dict) -> dict:
+        out = {ch: (angle, None if speed is None or self.speed == 1.0 else speed * self.speed)
+               for ch, (angle, speed) in targets.items() if 0 <= ch < self.limit}
+        self.skipped += len(targets) - len(out)
+        return out
+
+    def _wait_until(self, due: float) -> bool:
+        """Sleep, then spin, until ``due``; False if stopped first."""
+        while True:
+            left = due - time.monotonic()
+            if left <= 0:
+                return True
+            if left > SPIN:
+                if self._stop.wait(left - SPIN):
+                    return False
+            elif self._stop.is_set():
+                return False
+
+    def run(self) -> dict:
+        length = self.journal.duration / self.speed
+        t0 = time.monotonic()
+        while not self._stop.is_set() and (self.loops == 0 or self.loop < self.loops):
+            for slot, targets, count in self._slots(t0):
+                if not self._wait_until(slot):
+                    break
+                late = time.monotonic() - slot
+                if targets:
+                    if self.link.set_frame(targets):
+                        self.sent += 1
+                    else:
+                        self.failed += 1
+                    self.late_ms.append(late * 1000.0)
+                    self.merged += count - 1
+                    if self.on_send is not None:
+                        self.on_send(slot, targets)
+            else:
+                self.loop += 1
+                # the next pass starts one journal length later, whatever the sends cost
+                t0 += max(length, self.period)
+                continue
+            break
+        return self.report()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="journal-play", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+    def wait(self, timeout: float = None) -> bool:
+        if self._thread is not None:
+            self._thread.join(timeout)
+            return not self._thread.is_alive()
+        return True
+
+    def report(self) -> dict:
+        late = sorted(self.late_ms)
+        n = len(late)
+        mean = sum(late) / n if n else 0.0
+        jitter = math.sqrt(sum((v - mean) ** 2 for v in late) / n) if n else 0.0
+        return {
+            "loops": self.loop, "sent": self.sent, "merged": self.merged, "failed": self.failed,
+            "skipped": self.skipped,
+            "late_p50_ms": round(_percentile(late, 0.5), 3), "late_p95_ms": round(_percentile(late, 0.95), 3),
+            "late_max_ms": round(late[-1], 3) if n else 0.0, "jitter_ms": round(jitter, 3),
+            "drift_ms": round(self.late_ms[-1] - self.late_ms[0], 3) if n else 0.0,
+        }
+
+    def summary(self) -> str:
+        r = self.report()
+        return (f"PLAY loops={r['loops']} sent={r['sent']} merged={r['merged']} failed={r['failed']} "
+                f"skipped={r['skipped']} "
+                f"late p50={r['late_p50_ms']}ms p95={r['late_p95_ms']}ms max={r['late_max_ms']}ms "
+                f"jitter={r['jitter_ms']}ms drift={r['drift_ms']}ms")
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Play or inspect motion journals")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    info = sub.add_parser("info", help="Entries, length and channels of a journal")
+    info.add_argument("journal")
+    play = sub.add_parser("play", help="Stream a journal to the hand")
+    play.add_argument("journal")
+    play.add_argument("--port", default=None,
+                      help="Serial port, several ports (a,b) or auto (see handDevices.py)")
+    play.add_argument("--baud", type=int, default=115200)
+    play.add_argument("--protocol", choices=["text", "binary", "auto"], default="auto")
+    play.add_argument("--net", default=None, help="Stream to handSerial.py --serve --net on host:port instead")
+    play.add_argument("--speed", type=float, default=1.0, help="Playback speed (2 = twice as fast)")
+    play.add_argument("--loop", type=int, default=1, help="Passes to play (0 = until Ctrl-C)")
+    play.add_argument("--rate", type=float, default=RATE, help="Most sends per second")
+    play.add_argument("--report-interval", type=float, default=5.0, help="Seconds between PLAY lines (0 = off)")
+    args = p.parse_args(argv)
+
+    try:
+        journal = Journal.load(args.journal)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    if args.cmd == "info":
+        print(f"{args.journal}: {len(journal.entries)} entries, {journal.duration:.3f} s, "
+              f"channels {','.join(map(str, journal.channels())) or '-'}")
+        return 0
+
+    try:
+        if args.net:
+            import handNet
+            link = handNet.NetPublisher(args.net)
+        else:
+            import handDevices
+            link = handDevices.open_link(args.port, args.baud, protocol=args.protocol)
+            if not link.connect():
+                return 2
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    limit = getattr(link, "num_channels", MAX_CHANNELS)
+    if any(ch >= limit for ch in journal.channels()):
+        print(f"WARNING: channels beyond {limit - 1} are not on this link and are skipped",
+              file=sys.stderr)
+
+    try:
+        player = Player(link, journal, args.speed, args.loop, args.rate)
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        link.close()
+        return 2
+    print(f"Playing {args.journal} ({journal.duration:.3f} s, x{args.speed:g}) on "
+          f"{getattr(link, 'port', args.net)}", flush=True)
+    player.start()
+    try:
+        while not player.wait(args.report_interval or None):
+            print(player.summary(), flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        player.stop()
+        if hasattr(link, "flush"):
+            link.flush()
+        link.close()
+        print(player.summary(), flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,309 @@
+"""Angle/target streaming between machines (tracker on one, serial host on the other).
+
+  python handSerial.py --serve --net 0.0.0.0:47820          # on the box with the Arduino
+  python hand_tracker.py --net serialhost:47820             # on the inference machine
+
+Data goes over UDP as handIpc messages (fire-and-forget, latest value
+wins): every packet carries the sender's sequence number and send time.
+NetServer drops packets that are out of order or duplicated (sequence not
+newer than the last one from that sender) and, once the sender has synced
+its clock, packets older than ``max_age_ms``: the receiver only ever wants
+the newest targets. A sender is its UDP (ip, port), so two publishers on
+one host are told apart.
+
+The same port number on TCP is an optional line-based control channel:
+  PING <t1_ns>           -> PONG <t1_ns> <t2_ns>     (server monotonic time)
+  SYNC <udp_port>        -> OK                       (packets from that port are in our clock)
+  STATS                  -> STATS <json>             (server-side counters)
+  CMD <line>             -> OK                       (a handSerial --serve stdin line)
+  AUTH <token>           -> OK                       (allows CMD on this connection)
+NetPublisher pings once a second and keeps the offset of the lowest-RTT
+sample, stamps packets in the server's clock from then on and only then
+sends SYNC, so the server never age-checks packets stamped without the
+offset; the server's packet age is then the one-way latency. It also
+fetches the server's numbers, so both ends report it. Without the
+control channel (control=False) only same-host latency is measured, and
+stale packets are not detected.
+
+CMD runs anything --serve accepts, raw board commands included, so it is
+only taken from the server's own host, or from a connection that first
+sent the server's shared ``token`` (handSerial.py --net-token, or the
+PRISM_NET_TOKEN environment variable on both ends). Without a token,
+remote hosts can stream targets but not run commands.
+"""
+
+import hmac
+import json
+import os
+import socket
+import threading
+import time
+
+import handIpc
+
+DEFAULT_PORT = 47820
+MAX_AGE_MS = 100.0          # packets older than this are dropped as stale
+SYNC_INTERVAL = 1.0         # seconds between control-channel pings
+SYNC_SAMPLES = 8            # pings kept; the lowest RTT gives the offset
+RESTART_GAP = 1 << 16       # a sequence this far behind means the sender restarted
+TOKEN_ENV = "PRISM_NET_TOKEN"   # default shared token for CMD from other hosts
+
+
+def parse_host_port(addr: str, default_host: str = "127.0.0.1"):
+    """"host:port", ":port" or "port" -> (host, port)."""
+    host, _, port = addr.rpartition(":")
+    return host or default_host, int(port or DEFAULT_PORT)
+
+
+def seq_newer(seq: int, last: int) -> bool:
+    """True if 32-bit sequence ``seq`` comes after ``last`` (or the sender restarted)."""
+    diff = (seq - last) & 0xFFFFFFFF
+    if diff == 0:
+        return False
+    if diff < (1 << 31):
+        return True
+    return (1 << 32) - diff > RESTART_GAP
+
+
+class NetPublisher(handIpc.Publisher):
+    """handIpc.Publisher to a remote NetServer, with clock sync over TCP.
+
+    Drop-in for HandLink in the tracker (set_angle/set_frame), like its base.
+    """
+
+    def __init__(self, address: str, control: bool = True, token: str = None):
+        host, port = parse_host_port(address)
+        super().__init__([f"udp:{socket.gethostbyname(host)}:{port}"])
+        self.host, self.port = host, port
+        udp = self._socks[socket.AF_INET]
+        udp.bind(("0.0.0.0", 0))
+        self.udp_port = udp.getsockname()[1]    # our sender id on the server (with our IP)
+        self.offset_ns = 0          # server clock minus ours
+        self.rtt_ms = None
+        self.synced = False
+        self.remote = {}            # last STATS from the server
+        self.token = token if token is not None else os.environ.get(TOKEN_ENV)
+        self._samples = []
+        self._ctl = None
+        self._ctl_lock = threading.Lock()
+        self._done = threading.Event()
+        if control:
+            threading.Thread(target=self._sync_loop, name="net-sync", daemon=True).start()
+
+    def publish(self, kind: int, hand: int = -1, angle: float = float("nan"), targets: dict = None) -> bool:
+        data = handIpc.encode_message(kind, self.seq, hand, angle, targets,
+                                      t_ns=time.monotonic_ns() + self.offset_ns)
+        self.seq += 1
+        try:
+            self._socks[self.addresses[0][0]].sendto(data, self.addresses[0][1])
+            self.sent += 1
+            return True
+        except OSError:
+            self.dropped += 1
+            return False
+
+    # --- control channel ---
+    def _request(self, line: str) -> str:
+        """Send one control line and return the reply (reconnecting if needed)."""
+        with self._ctl_lock:
+            if self._ctl is None:
+                sock = socket.create_connection((self.host, self.port), timeout=2.0)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                self._ctl = (sock, sock.makefile("rb"))
+                if self.token:
+                    self._exchange(f"AUTH {self.token}")
+            return self._exchange(line)
+
+    def _exchange(self, line: str) -> str:
+        sock, f = self._ctl
+        try:
+            sock.sendall((line + "\n").encode())
+            reply = f.readline()
+            if not reply:
+                raise OSError("control channel closed")
+            return reply.decode().strip()
+        except OSError:
+            self._close_ctl()
+            raise
+
+    def _close_ctl(self):
+        if self._ctl is not None:
+            sock, f = self._ctl
+            f.close()
+            sock.close()
+            self._ctl = None
+
+    def command(self, line: str) -> bool:
+        """Run a handSerial --serve command line on the server (e.g. "a 120")."""
+        try:
+            return self._request("CMD " + line) == "OK"
+        except OSError:
+            return False
+
+    def sync(self):
+        """One ping: update offset_ns/rtt_ms and fetch the server's STATS."""
+        t1 = time.monotonic_ns()
+        reply = self._request(f"PING {t1}").split()
+        t3 = time.monotonic_ns()
+        if len(reply) != 3 or reply[0] != "PONG" or int(reply[1]) != t1:
+            raise OSError(f"bad PONG {reply!r}")
+        t2 = int(reply[2])
+        self._samples = (self._samples + [(t3 - t1, t2 - (t1 + t3) // 2)])[-SYNC_SAMPLES:]
+        rtt, offset = min(self._samples)
+        self.offset_ns, self.rtt_ms = offset, rtt / 1e6
+        # packets are stamped with the offset from here on: let the server age-check them
+        if self._request(f"SYNC {self.udp_port}") != "OK":
+            raise OSError("SYNC refused")
+        self.synced = True
+        reply = self._request("STATS")
+        if reply.startswith("STATS "):
+            self.remote = json.loads(reply[6:])
+
+    def _sync_loop(self):
+        while not self._done.is_set():
+            try:
+                self.sync()
+            except (OSError, ValueError):
+                pass
+            self._done.wait(SYNC_INTERVAL)
+
+    def summary(self) -> str:
+        rtt = "-" if self.rtt_ms is None else f"{self.rtt_ms:.1f}"
+        lat = self.remote.get("latency_ms")
+        return (f"net {self.host}:{self.port} rtt:{rtt}ms one-way:"
+                f"{'-' if lat is None else f'{lat:.1f}'}ms stale:{self.remote.get('stale', 0)} "
+                f"ooo:{self.remote.get('out_of_order', 0)}")
+
+    def close(self):
+        self._done.set()
+        with self._ctl_lock:
+            self._close_ctl()
+        super().close()
+
+
+class NetServer:
+    """UDP receiver plus TCP control listener on one port, see the module docstring.
+
+    recv() returns only fresh, in-order messages. ``on_command(line)`` runs
+    CMD lines from the control channel: from this host, or after AUTH with
+    ``token`` (default: $PRISM_NET_TOKEN; None = this host only).
+    """
+
+    def __init__(self, address: str = f"0.0.0.0:{DEFAULT_PORT}", max_age_ms: float = MAX_AGE_MS,
+                 on_command=None, token: str = None):
+        host, port = parse_host_port(address, "0.0.0.0")
+        self.udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.udp.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 64 * 1024)
+        self.udp.bind((host, port))
+        port = self.udp.getsockname()[1]        # port 0 picks a free one
+        self.tcp = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.tcp.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.tcp.bind((host, port))
+        self.tcp.listen(4)
+        self.address = f"{host}:{port}"
+        self.port = port
+        self.max_age_ms = max_age_ms
+        self.on_command = on_command
+        self.token = token if token is not None else os.environ.get(TOKEN_ENV)
+        self.refused = 0            # CMD lines refused for lack of AUTH
+        self._last_seq = {}         # sender (ip, port) -> last accepted seq
+        self._synced = set()        # senders (ip, udp port) whose clock offset is applied
+        self.received = 0
+        self.accepted = 0
+        self.stale = 0
+        self.out_of_order = 0
+        self.bad = 0
+        self.latency_ms = None      # EMA of one-way latency (synced or same-host senders)
+        self._closed = False
+        threading.Thread(target=self._accept_loop, name="net-control", daemon=True).start()
+
+    def fileno(self) -> int:
+        return self.udp.fileno()
+
+    def recv(self, timeout: float = None):
+        """Next fresh, in-order message, or None on timeout."""
+        self.udp.settimeout(timeout)
+        while True:
+            try:
+                data, sender = self.udp.recvfrom(handIpc.MESSAGE_SIZE + 1)
+            except (socket.timeout, BlockingIOError):
+                return None
+            self.received += 1
+            try:
+                msg = handIpc.decode_message(data)
+            except ValueError:
+                self.bad += 1
+                continue
+            last = self._last_seq.get(sender)
+            if last is not None and not seq_newer(msg.seq, last):
+                self.out_of_order += 1
+                continue
+            self._last_seq[sender] = msg.seq
+            synced = sender in self._synced
+            if synced or sender[0].startswith("127."):
+                # same host: one monotonic clock, so the age is meaningful even unsynced
+                age = msg.age_ms()
+                if synced and age > self.max_age_ms:
+                    self.stale += 1
+                    continue
+                self.latency_ms = age if self.latency_ms is None else self.latency_ms + 0.1 * (age - self.latency_ms)
+            self.accepted += 1
+            return msg
+
+    def stats(self) -> dict:
+        return {"received": self.received, "accepted": self.accepted, "stale": self.stale,
+                "out_of_order": self.out_of_order, "bad": self.bad, "refused": self.refused,
+                "latency_ms": None if self.latency_ms is None else round(self.latency_ms, 3)}
+
+    def _accept_loop(self):
+        while not self._closed:
+            try:
+                conn, peer = self.tcp.accept()
+            except OSError:
+                return
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._serve_control, args=(conn, peer[0]),
+                             name="net-control-client", daemon=True).start()
+
+    def _trusted(self, ip: str, token: str = None) -> bool:
+        """May a connection from ``ip`` (having sent AUTH ``token``) run CMD?"""
+        if ip.startswith("127.") or ip == "::1":
+            return True
+        return bool(self.token) and token is not None and hmac.compare_digest(token.encode(),
+                                                                              self.token.encode())
+
+    def _serve_control(self, conn, ip: str):
+        trusted = self._trusted(ip)
+        with conn, conn.makefile("rb") as f:
+            for raw in f:
+                line = raw.decode(errors="ignore").strip()
+                cmd, _, rest = line.partition(" ")
+                if cmd == "PING":
+                    reply = f"PONG {rest} {time.monotonic_ns()}"
+                elif cmd == "SYNC" and rest.isdigit():
+                    # the client stamps the packets from this UDP port in our clock from now on
+                    self._synced.add((ip, int(rest)))
+                    reply = "OK"
+                elif cmd == "STATS":
+                    reply = "STATS " + json.dumps(self.stats(), separators=(",", ":"))
+                elif cmd == "AUTH":
+                    trusted = trusted or self._trusted(ip, rest)
+                    reply = "OK" if trusted else "ERR auth"
+                elif cmd == "CMD" and self.on_command is not None:
+                    if trusted:
+                        self.on_command(rest)
+                        reply = "OK"
+                    else:
+                        self.refused += 1
+                        reply = "ERR auth"
+                else:
+                    reply = f"ERR {cmd}"
+                try:
+                    conn.sendall((reply + "\n").encode())
+                except OSError:
+                    return
+
+    def close(self):
+        self._closed = True
+        self.udp.close()
+        self.tcp.close()
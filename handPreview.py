@@ -0,0 +1,181 @@
+"""Shared-memory preview frames from the tracker to the launcher.
+
+  python hand_tracker.py --headless --preview prism-preview-$USER [--preview-raw]
+
+The tracker (PreviewWriter) owns a multiprocessing.shared_memory block with
+two frame slots. It writes each new frame into the slot the reader is not
+pointed at, then flips ``front`` and bumps the header sequence, so a frame
+is copied once and never locks. Each slot also has its own sequence, odd
+while it is being written (a seqlock): a reader that sees it change while
+copying simply skips that frame. The launcher (PreviewReader) polls at its
+own capped rate and only ever copies the newest frame.
+
+Frames are BGR, as OpenCV produces them. With --preview-raw the tracker
+skips all drawing and the slot carries the raw frame plus, per hand, the
+stable slot id, the smoothed palm angle and the 21 normalized landmarks;
+the UI draws the overlay. Otherwise the slot carries the annotated frame.
+
+  header: magic "PV" | version u8 | flags u8 | width u32 | height u32 |
+          stride u32 | seq u64 | front u32
+  slot:   seq u64 | t_ns i64 | hands u8 | pad | id i8[2] | pad | angle f32[2] |
+          landmarks f32[2*21*3] | frame u8[height*stride]
+
+PreviewReader only needs the standard library, so the launcher does not
+depend on NumPy.
+"""
+
+import os
+import struct
+import time
+from multiprocessing import shared_memory
+
+MAGIC = b"PV"
+VERSION = 1
+FLAG_RAW = 0x01             # slot frames are raw, the UI draws the landmarks
+MAX_HANDS = 2
+NUM_LANDMARKS = 21
+HEADER = struct.Struct("<2sBBIIIQI")
+SLOT = struct.Struct(f"<QqB3x{MAX_HANDS}b2x{MAX_HANDS}f{MAX_HANDS * NUM_LANDMARKS * 3}f")
+SLOTS = 2
+# hand skeleton as landmark chains (same as kinematics.SKELETON)
+SKELETON = ((0, 1, 2, 3, 4), (0, 5, 6, 7, 8), (9, 10, 11, 12), (13, 14, 15, 16),
+            (0, 17, 18, 19, 20), (5, 9, 13, 17))
+
+
+def default_name() -> str:
+    user = os.environ.get("USER") or os.environ.get("USERNAME") or str(os.getpid())
+    return f"prism-preview-{user}"
+
+
+def _slot_offset(k: int, frame_bytes: int) -> int:
+    return HEADER.size + k * (SLOT.size + frame_bytes)
+
+
+class PreviewFrame:
+    """One frame copied out of the shared block."""
+    __slots__ = ("seq", "t_ns", "width", "height", "stride", "raw", "data", "hands")
+
+    def age_ms(self) -> float:
+        return (time.monotonic_ns() - self.t_ns) / 1e6
+
+
+class PreviewWriter:
+    """Tracker side: creates the block and publishes frames, see the module docstring."""
+
+    def __init__(self, name: str, width: int, height: int, raw: bool = False):
+        import numpy as np
+        self.name = name
+        self.width, self.height = width, height
+        self.stride = width * 3
+        self.raw = raw
+        self.frame_bytes = self.stride * height
+        size = _slot_offset(SLOTS, self.frame_bytes)
+        try:
+            # a block left behind by a crashed tracker
+            old = shared_memory.SharedMemory(name)
+            old.close()
+            old.unlink()
+        except FileNotFoundError:
+            pass
+        self.shm = shared_memory.SharedMemory(name, create=True, size=size)
+        self._frames = [np.ndarray((height, width, 3), np.uint8, self.shm.buf,
+                                   _slot_offset(k, self.frame_bytes) + SLOT.size) for k in range(SLOTS)]
+        self.seq = 0
+        self.front = 0
+        self._slot_seq = [0] * SLOTS
+        HEADER.pack_into(self.shm.buf, 0, MAGIC, VERSION, FLAG_RAW if raw else 0,
+                         width, height, self.stride, 0, 0)
+
+    def publish(self, img, hands=()) -> bool:
+        """Copy one BGR frame in; hands is [(id, angle, (21, 3) landmarks), ...] for raw previews."""
+        if img.shape[:2] != (self.height, self.width):
+            return False
+        k = 1 - self.front
+        off = _slot_offset(k, self.frame_bytes)
+        ids = [-1] * MAX_HANDS
+        angles = [0.0] * MAX_HANDS
+        lms = [0.0] * (MAX_HANDS * NUM_LANDMARKS * 3)
+        hands = list(hands)[:MAX_HANDS]
+        for i, (hid, angle, lm) in enumerate(hands):
+            ids[i], angles[i] = int(hid), float(angle)
+            base = i * NUM_LANDMARKS * 3
+            lms[base:base + NUM_LANDMARKS * 3] = [float(v) for v in lm.reshape(-1)[:NUM_LANDMARKS * 3]]
+        self._slot_seq[k] += 1          # odd: being written
+        struct.pack_into("<Q", self.shm.buf, off, self._slot_seq[k])
+        self._frames[k][:] = img
+        self._slot_seq[k] += 1          # even: complete
+        SLOT.pack_into(self.shm.buf, off, self._slot_seq[k], time.monotonic_ns(), len(hands),
+                       *ids, *angles, *lms)
+        self.seq += 1
+        self.front = k
+        HEADER.pack_into(self.shm.buf, 0, MAGIC, VERSION, FLAG_RAW if self.raw else 0,
+                         self.width, self.height, self.stride, self.seq, self.front)
+        return True
+
+    def close(self):
+        self._frames = []
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class PreviewReader:
+    """Launcher side: attaches to a writer's block and copies out new frames."""
+
+    def __init__(self, name: str):
+        try:
+            self.shm = shared_memory.SharedMemory(name, track=False)
+        except TypeError:
+            # Python < 3.13 registers attached blocks for cleanup at exit; the
+            # tracker owns this one, so take it back off the tracker list
+            self.shm = shared_memory.SharedMemory(name)
+            from multiprocessing import resource_tracker
+            try:
+                resource_tracker.unregister(self.shm._name, "shared_memory")
+            except Exception:
+                pass
+        magic, version, *_ = HEADER.unpack_from(self.shm.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            self.shm.close()
+            raise ValueError(f"{name} is not a hand tracker preview")
+        self.name = name
+        self.last_seq = 0
+        self.torn = 0               # frames skipped because the writer lapped the copy
+
+    def read(self):
+        """The newest frame if there is one we have not returned yet, else None."""
+        _, _, flags, w, h, stride, seq, front = HEADER.unpack_from(self.shm.buf, 0)
+        if seq == self.last_seq or front >= SLOTS:
+            return None
+        frame_bytes = stride * h
+        off = _slot_offset(front, frame_bytes)
+        if off + SLOT.size + frame_bytes > self.shm.size:
+            return None
+        fields = SLOT.unpack_from(self.shm.buf, off)
+        if fields[0] & 1:
+            self.torn += 1
+            return None
+        data = bytes(self.shm.buf[off + SLOT.size:off + SLOT.size + frame_bytes])
+        if struct.unpack_from("<Q", self.shm.buf, off)[0] != fields[0]:
+            self.torn += 1
+            return None
+        self.last_seq = seq
+        f = PreviewFrame()
+        f.seq, f.t_ns, f.width, f.height, f.stride = seq, fields[1], w, h, stride
+        f.raw = bool(flags & FLAG_RAW)
+        f.data = data
+        n = fields[2]
+        ids = fields[3:3 + MAX_HANDS]
+        angles = fields[3 + MAX_HANDS:3 + 2 * MAX_HANDS]
+        lms = fields[3 + 2 * MAX_HANDS:]
+        f.hands = []
+        for i in range(min(n, MAX_HANDS)):
+            base = i * NUM_LANDMARKS * 3
+            pts = [(lms[base + 3 * j], lms[base + 3 * j + 1]) for j in range(NUM_LANDMARKS)]
+            f.hands.append((ids[i], angles[i], pts))
+        return f
+
+    def close(self):
+        self.shm.close()
@@ -1,21 +1,64 @@
 """Simple serial helper for the hand Arduino sketch.
 
 Usage:
-  - Interactive demo (no args): runs the example sequence.
+  - Interactive demo (no args): plays the example sequence (DEMO_JOURNAL).
+  - Play a motion journal (see handJournal.py):
+      python handJournal.py play wave.journal --port /dev/ttyACM0
   - Send a single command from the CLI, e.g.:
       python handSerial.py --channel 0 --angle 135 --port /dev/ttyACM0
   - Or specify --speed, --baud etc.
+  - Set several channels in one write (all start on the same ramp tick):
+      python handSerial.py --frame 0:135:45,1:90,2:180
+  - From Python, keep one port open with HandLink:
+      link = HandLink("/dev/ttyACM0"); link.set_angle(0, 135)
+  - Serve targets published by the tracker over local IPC (see handIpc.py):
+      python handSerial.py --serve --ipc unix:/tmp/prism-hand.sock
+  - Serve targets streamed from another machine (see handNet.py):
+      python handSerial.py --serve --net 0.0.0.0:47820
+  - Serve several boards as one (channels 16k..16k+15 on board k, see handDevices.py):
+      python handSerial.py --serve --port auto
 """
 
 import time
 import argparse
 import serial
 import sys
+import threading
+from collections import deque
+
+BOOT_WAIT = 2.0     # max seconds for the board to reset after the port opens
+
+def read_banner(ser, timeout: float = BOOT_WAIT) -> str:
+    """Read the sketch's banner or help text up to its "> " prompt.
+
+    Returns the text read, or "" if no complete banner arrived in time.
+    """
+    old_timeout = ser.timeout
+    ser.timeout = 0.05
+    try:
+        deadline = time.monotonic() + timeout
+        buf = b""
+        while time.monotonic() < deadline:
+            buf = (buf + ser.read(ser.in_waiting or 1))[-1024:]
+            if b"SERVO_MAX_DEG=" in buf and buf.rstrip(b" ").endswith(b">"):
+                return buf.decode(errors="ignore")
+        return ""
+    finally:
+        ser.timeout = old_timeout
+
+def wait_for_boot(ser, timeout: float = BOOT_WAIT) -> bool:
+    """Wait until the sketch has printed its banner (ending in the "> " prompt).
+
+    Opening the port resets most Arduinos; this returns as soon as setup() is
+    done instead of always sleeping. Boards that do not reset print nothing,
+    so they still take the full timeout. Returns True if the banner was seen.
+    """
+    return bool(read_banner(ser, timeout))
 
 def open_serial(port: str, baud: int):
     try:
         ser = serial.Serial(port, baud, timeout=1)
-        time.sleep(2)
+        wait_for_boot(ser)
         ser.reset_input_buffer()
         return ser
     except Exception as e:
@@ -33,82 +76,786 @@ def send_line(ser, line: str):
     for l in out:
         print(l)
 
+# --- Binary protocol --------------------------------------------------------
+# Optional compact framing understood by hand1.2.ino (PROTO_VERSION >= 1).
+# Text commands keep working: the sketch treats a line starting with
+# FRAME_SYNC as a binary frame and everything else as text.
+#
+#   SYNC(0xA5) | type | seq | len | payload[len] | crc16 (little endian)
+#
+# The CRC is CRC-16/CCITT-FALSE over type, seq, len and payload.
+# FRAME_SET payload:
+#   mask (u16 LE, bit n = channel n) | flags (u8) |
+#   per set channel, ascending: angle (u16 LE, 0.1 deg) [speed (u16 LE, 0.1 deg/s)]
+# The board answers FRAME_ACK / FRAME_NAK (6 bytes, echoing seq) unless the
+# frame has FLAG_NO_ACK. Send "v" as text to read the protocol version
+# ("V <n>"); sketches without binary support answer with an error line.
+# Version 2 adds the text frame command "f <ch>:<angle>[:<speed>],...".
+
+FRAME_SYNC = 0xA5
+FRAME_SET = 0x01
+FRAME_ACK = 0x81
+FRAME_NAK = 0x82
+FLAG_SPEEDS = 0x01
+FLAG_NO_ACK = 0x02
+MAX_CHANNELS = 16
+MAX_PAYLOAD = 3 + MAX_CHANNELS * 4
+PROTO_VERSION = 2
+
+def crc16(data: bytes, crc: int = 0xFFFF) -> int:
+    """CRC-16/CCITT-FALSE (poly 0x1021), same as crc16() in the sketch."""
+    for b in data:
+        crc ^= b << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+            crc &= 0xFFFF
+    return crc
+
+def _fixed(v: float) -> int:
+    return max(0, min(0xFFFF, int(round(v * 10))))
+
+def encode_frame(ftype: int, payload: bytes = b"", seq: int = 0) -> bytes:
+    if len(payload) > 255:
+        raise ValueError("payload too long")
+    body = bytes((ftype, seq & 0xFF, len(payload))) + payload
+    return bytes((FRAME_SYNC,)) + body + crc16(body).to_bytes(2, "little")
+
+def encode_set(targets: dict, seq: int = 0, ack: bool = True) -> bytes:
+    """Encode {channel: angle} or {channel: (angle, speed)} as one FRAME_SET.
+
+    Speeds are sent for every channel if any channel has one; channels
+    without a speed then get 0, which the sketch treats as "keep current".
+    """
+    if not targets:
+        raise ValueError("no targets")
+    mask = 0
+    rows = {}
+    with_speed = False
+    for ch, val in targets.items():
+        ch = int(ch)
+        if not 0 <= ch < MAX_CHANNELS:
+            raise ValueError(f"channel {ch} out of range")
+        angle, speed = (val if isinstance(val, (tuple, list)) else (val, None))
+        mask |= 1 << ch
+        rows[ch] = (angle, speed)
+        with_speed = with_speed or speed is not None
+    flags = (FLAG_SPEEDS if with_speed else 0) | (0 if ack else FLAG_NO_ACK)
+    payload = bytearray(mask.to_bytes(2, "little") + bytes((flags,)))
+    for ch in sorted(rows):
+        angle, speed = rows[ch]
+        payload += _fixed(angle).to_bytes(2, "little")
+        if with_speed:
+            payload += _fixed(speed or 0).to_bytes(2, "little")
+    return encode_frame(FRAME_SET, bytes(payload), seq)
+
+def decode_set(payload: bytes) -> dict:
+    """Inverse of encode_set: {channel: (angle, speed or None)}."""
+    if len(payload) < 3:
+        raise ValueError("short FRAME_SET payload")
+    mask = int.from_bytes(payload[0:2], "little")
+    flags = payload[2]
+    width = 4 if flags & FLAG_SPEEDS else 2
+    chans = [ch for ch in range(MAX_CHANNELS) if mask >> ch & 1]
+    if len(payload) != 3 + width * len(chans):
+        raise ValueError("FRAME_SET length does not match mask")
+    out = {}
+    pos = 3
+    for ch in chans:
+        angle = int.from_bytes(payload[pos:pos + 2], "little") / 10.0
+        speed = int.from_bytes(payload[pos + 2:pos + 4], "little") / 10.0 if width == 4 else None
+        out[ch] = (angle, speed)
+        pos += width
+    return out
+
+class FrameParser:
+    """Incremental splitter for a byte stream mixing text and binary frames.
+
+    feed() returns (frames, text): complete frames as (type, seq, payload)
+    tuples, and the bytes that were not part of any frame. Frames with a bad
+    CRC are counted in ``bad`` and skipped by resyncing on the next SYNC.
+    """
+
+    def __init__(self):
+        self._buf = bytearray()
+        self.bad = 0
+
+    def feed(self, data: bytes):
+        self._buf += data
+        frames, text = [], bytearray()
+        buf = self._buf
+        while buf:
+            i = buf.find(FRAME_SYNC)
+            if i < 0:
+                text += buf
+                buf.clear()
+                break
+            text += buf[:i]
+            del buf[:i]
+            if len(buf) < 4:
+                break
+            n = buf[3]
+            if n > MAX_PAYLOAD:
+                self.bad += 1
+                del buf[:1]
+                continue
+            if len(buf) < 6 + n:
+                break
+            body = bytes(buf[1:4 + n])
+            if crc16(body) != int.from_bytes(buf[4 + n:6 + n], "little"):
+                self.bad += 1
+                del buf[:1]
+                continue
+            frames.append((body[0], body[1], body[3:]))
+            del buf[:6 + n]
+        return frames, bytes(text)
+
+def parse_frame_spec(spec: str, num_channels: int = MAX_CHANNELS) -> dict:
+    """Parse "ch:angle[:speed],..." into {channel: (angle, speed or None)}."""
+    targets = {}
+    for item in spec.replace(" ", ",").split(","):
+        if not item:
+            continue
+        parts = item.split(":")
+        if len(parts) not in (2, 3):
+            raise ValueError(f"bad frame entry {item!r} (want ch:angle[:speed])")
+        ch = int(parts[0])
+        if not 0 <= ch < num_channels:
+            raise ValueError(f"channel {ch} out of range")
+        targets[ch] = (float(parts[1]), float(parts[2]) if len(parts) == 3 else None)
+    if not targets:
+        raise ValueError("empty frame")
+    return targets
+
+def format_frame(targets: dict) -> str:
+    """Text frame command for the sketch: "f ch:angle[:speed],..." (version >= 2)."""
+    items = []
+    for ch, val in sorted(targets.items()):
+        angle, speed = (val if isinstance(val, (tuple, list)) else (val, None))
+        item = f"{int(ch)}:{round(angle, 1):g}"
+        if speed is not None:
+            item += f":{round(speed, 1):g}"
+        items.append(item)
+    return "f " + ",".join(items)
+
+def text_target_lines(targets: dict, version: int = 0) -> list:
+    """Text command lines that apply ``targets`` on a sketch of ``version``.
+
+    Version 2 sketches take the whole set as one "f" line; older ones need a
+    line per channel (plus "c"/"s" when a speed is given).
+    """
+    if version >= 2:
+        return [format_frame(targets)]
+    lines = []
+    for ch, val in targets.items():
+        angle, speed = (val if isinstance(val, (tuple, list)) else (val, None))
+        if speed is not None:
+            lines += [f"c {int(ch)}", f"s {int(speed)}"]
+        lines.append(f"{int(ch)} {int(angle)}")
+    return lines
+
+def send_frame(ser, targets: dict):
+    """Blocking one-shot counterpart of HandLink.set_frame()."""
+    send_line(ser, format_frame(targets))
+
+def query_version(ser, timeout: float = 0.5) -> int:
+    """Ask the sketch for its protocol version ("v"); 0 if it does not know the command."""
+    old_timeout = ser.timeout
+    ser.timeout = 0.05
+    try:
+        ser.write(b"v\n")
+        deadline = time.monotonic() + timeout
+        buf = b""
+        while time.monotonic() < deadline:
+            buf += ser.read(ser.in_waiting or 1)
+            *lines, _ = buf.split(b"\n")
+            for line in lines:
+                text = line.decode(errors="ignore")
+                if "V " in text:
+                    try:
+                        return int(text.split("V ")[-1].split()[0])
+                    except (ValueError, IndexError):
+                        pass
+                if "[ERR]" in text:
+                    return 0
+        return 0
+    finally:
+        ser.timeout = old_timeout
+
+def default_port() -> str:
+    """Platform default serial port for the hand board."""
+    import platform
+    if platform.system() == "Windows":
+        return "COM5"
+    elif platform.system() == "Darwin":
+        return "/dev/cu.usbmodem2101"
+    return "/dev/ttyACM0"
+
+class HandLink:
+    """Persistent, non-blocking connection to the hand sketch.
+
+    The port is opened once (paying the 2 s Arduino reset a single time) and
+    reused for every command. Callers never touch the port: commands are
+    queued and a writer thread sends them, while a reader thread consumes the
+    board's replies.
+
+    Servo targets are kept in one slot per channel, so if a newer target for
+    a channel arrives before the older one is written the older one is
+    dropped (coalesced) and the servo always chases the freshest value. Other
+    command lines go through a FIFO bounded to ``max_queue`` entries that
+    drops its oldest line when full. A failed write or read closes the port
+    and the writer reopens it, at most once every ``retry_interval`` seconds;
+    a batch whose targets cannot be encoded is counted as dropped.
+
+    ``protocol`` selects how servo targets are written: "text" sends them as
+    text (one "f" line on sketches that support it, otherwise a line per
+    channel), "binary" packs all pending targets in one FRAME_SET, and
+    "auto" uses binary when the sketch reports support. Other commands are
+    always sent as text.
+
+    With ``metrics`` (a handTelemetry.Metrics) every write is timed
+    ("serial_write_ms", "written") and, in binary mode, each FRAME_ACK is
+    matched to its frame's seq for the firmware round trip ("ack_rtt_ms").
+    """
+
+    def __init__(self, port: str = None, baud: int = 115200, retry_interval: float = 2.0,
+                 echo: bool = False, max_queue: int = 64, on_line=None, protocol: str = "text",
+                 metrics=None):
+        if protocol not in ("text", "binary", "auto"):
+            raise ValueError(f"unknown protocol {protocol!r}")
+        self.port = port or default_port()
+        self.baud = baud
+        self.num_channels = MAX_CHANNELS
+        self.retry_interval = retry_interval
+        self.echo = echo            # print sent lines and board responses
+        self.on_line = on_line      # optional callback(str) for each board reply
+        self.protocol = protocol
+        self.metrics = metrics
+        self._ack_sent = {}         # seq -> time the frame was written, for ack round trips
+        self.version = None         # sketch protocol version, once queried
+        self.binary = False         # True while targets go out as FRAME_SET
+        self.ser = None
+        self._next_retry = 0.0
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._pending = {}          # channel -> latest (angle, speed) not yet written
+        self._lines = deque()       # other commands, oldest first
+        self._max_queue = max_queue
+        self._busy = False          # writer holds a batch it has not written yet
+        self._running = False
+        self._threads = []
+        # statistics (see stats())
+        self._coalesced = 0
+        self._dropped = 0
+        self._written = 0
+        self._errors = 0
+        self._acks = 0
+        self._naks = 0
+        self._rate_mark = (time.monotonic(), 0)
+
+    # --- connection ---
+    def connect(self) -> bool:
+        """Open the port now (blocking) and start the I/O threads.
+
+        Returns True when the port is open. Calling it is optional: the writer
+        opens the port on its own when the first command is queued.
+        """
+        self.start()
+        with self._lock:
+            if self.ser is not None:
+                return True
+        return self._open()
+
+    def _open(self) -> bool:
+        with self._open_lock:
+            if self.ser is not None:
+                return True
+            now = time.monotonic()
+            if now < self._next_retry:
+                return False
+            self._next_retry = now + self.retry_interval
+            ser = open_serial(self.port, self.baud)
+            if ser is not None:
+                self.version = query_version(ser)
+                self.binary = self.protocol != "text" and self.version >= 1
+                if self.protocol != "text" and not self.binary:
+                    print(f"WARNING: sketch on {self.port} has no binary mode, using text",
+                          file=sys.stderr)
+            with self._lock:
+                self.ser = ser
+            return ser is not None
+
+    def attach(self, ser, version: int = None) -> bool:
+        """Use a port that is already open (e.g. by device discovery, see handDevices.py).
+
+        Saves the board reset a second open would cost. The version is
+        queried if not given; returns False if the link already has a port.
+        """
+        with self._open_lock:
+            if self.ser is not None:
+                return False
+            self.version = query_version(ser) if version is None else version
+            self.binary = self.protocol != "text" and self.version >= 1
+            with self._lock:
+                self.ser = ser
+        self.start()
+        return True
+
+    def _drop(self, ser, what: str, err):
+        print(f"ERROR: {what} {self.port} failed: {err}", file=sys.stderr)
+        with self._lock:
+            self._errors += 1
+            if self.ser is not ser:
+                return
+            self.ser = None
+        try:
+            ser.close()
+        except Exception:
+            pass
+
+    @property
+    def connected(self) -> bool:
+        return self.ser is not None
+
+    def start(self):
+        """Start the writer and reader threads (idempotent)."""
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+        self._threads = [threading.Thread(target=self._write_loop, name="hand-writer", daemon=True),
+                         threading.Thread(target=self._read_loop, name="hand-reader", daemon=True)]
+        for t in self._threads:
+            t.start()
+
+    def close(self, flush_timeout: float = 0.5):
+        """Write what is still queued (up to ``flush_timeout`` s), then close."""
+        if self._running:
+            self.flush(flush_timeout)
+        with self._lock:
+            self._running = False
+            self._wake.notify_all()
+            ser, self.ser = self.ser, None
+        for t in self._threads:
+            t.join(timeout=1.5)
+        self._threads = []
+        if ser is not None:
+            ser.close()
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- queueing (called from any thread, never blocks on I/O) ---
+    def send(self, line: str) -> bool:
+        """Queue one command line. Returns True once it is queued."""
+        self.start()
+        with self._lock:
+            if len(self._lines) >= self._max_queue:
+                self._lines.popleft()
+                self._dropped += 1
+            self._lines.append(line)
+            self._wake.notify()
+        return True
+
+    def set_angle(self, channel: int, angle: float, speed: float = None) -> bool:
+        """Queue a servo target; replaces any unwritten target for the channel."""
+        return self.set_frame({channel: (angle, speed)})
+
+    def set_frame(self, targets: dict) -> bool:
+        """Queue targets for several channels, {channel: angle or (angle, speed)}.
+
+        The whole set is taken by the writer together and goes out in a single
+        write (one FRAME_SET or "f" line), so the sketch applies every channel
+        on the same ramp tick. A newer target replaces an unwritten one for
+        the same channel; an unwritten speed is kept unless a new one is given.
+        Raises ValueError, queuing nothing, if a channel is not on the board.
+        """
+        for ch in targets:
+            if not 0 <= int(ch) < self.num_channels:
+                raise ValueError(f"channel {ch} out of range (0..{self.num_channels - 1})")
+        self.start()
+        with self._lock:
+            for ch, val in targets.items():
+                angle, speed = (val if isinstance(val, (tuple, list)) else (val, None))
+                ch = int(ch)
+                old = self._pending.get(ch)
+                if old is not None:
+                    self._coalesced += 1
+                    if speed is None:
+                        speed = old[1]
+                self._pending[ch] = (float(angle), None if speed is None else float(speed))
+            self._wake.notify()
+        return True
+
+    def flush(self, timeout: float = 1.0) -> bool:
+        """Wait until everything queued so far has been written."""
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while self._lines or self._pending or self._busy:
+                left = deadline - time.monotonic()
+                if left <= 0 or not self._running:
+                    return False
+                self._wake.wait(min(left, 0.05))
+        return True
+
+    def stats(self, reset_rate: bool = True) -> dict:
+        """Queue depth, coalesced/dropped counts and write rate since the last call.
+
+        With reset_rate=False the rate window is left running (for a second reader).
+        """
+        now = time.monotonic()
+        with self._lock:
+            t0, n0 = self._rate_mark
+            if reset_rate:
+                self._rate_mark = (now, self._written)
+            return {
+                "connected": self.ser is not None,
+                "depth": len(self._lines) + len(self._pending),
+                "coalesced": self._coalesced,
+                "dropped": self._dropped,
+                "written": self._written,
+                "errors": self._errors,
+                "acks": self._acks,
+                "naks": self._naks,
+                "rate": (self._written - n0) / max(1e-6, now - t0),
+            }
+
+    # --- I/O threads ---
+    def _write_loop(self):
+        while True:
+            with self._lock:
+                while self._running and not (self._lines or self._pending):
+                    self._wake.wait()
+                if not self._running:
+                    return
+                ser = self.ser
+            if ser is None:
+                if not self._open():
+                    time.sleep(min(0.1, self.retry_interval))
+                continue
+
+            # take everything queued so far and write it as one batch
+            with self._lock:
+                lines = list(self._lines)
+                self._lines.clear()
+                targets = dict(self._pending)
+                self._pending.clear()
+                self._busy = True
+            count = len(lines) + len(targets)
+            frame = b""
+            try:
+                if targets and self.binary:
+                    self._seq = (self._seq + 1) & 0xFF
+                    frame = encode_set(targets, self._seq)
+                elif targets:
+                    lines += text_target_lines(targets, self.version or 0)
+            except (ValueError, OverflowError) as e:
+                # a target that cannot be encoded (e.g. NaN) costs its batch, not the writer
+                print(f"ERROR: cannot encode targets for {self.port}: {e}", file=sys.stderr)
+                with self._lock:
+                    self._dropped += len(targets)
+                    if not lines:
+                        self._busy = False
+                        self._wake.notify_all()
+                        continue
+                targets, count = {}, len(lines)
+            data = "".join(l + "\n" for l in lines).encode("utf-8") + frame
+            t0 = time.monotonic()
+            try:
+                ser.write(data)
+            except (serial.SerialException, OSError) as e:
+                self._drop(ser, "write to", e)
+                with self._lock:
+                    self._dropped += count
+                continue
+            finally:
+                with self._lock:
+                    self._busy = False
+                    self._wake.notify_all()
+            with self._lock:
+                self._written += count
+            if self.metrics is not None:
+                t1 = time.monotonic()
+                self.metrics.observe("serial_write_ms", (t1 - t0) * 1000.0)
+                self.metrics.inc("written", count)
+                if frame:
+                    self._ack_sent[self._seq] = t1
+            if self.echo:
+                for l in lines:
+                    print(">>", l, flush=True)
+                if frame:
+                    print(">> [binary]", format_frame(targets), flush=True)
+
+    def _read_loop(self):
+        buf = b""
+        parser = FrameParser()
+        while self._running:
+            ser = self.ser
+            if ser is None:
+                buf = b""
+                parser = FrameParser()
+                time.sleep(0.05)
+                continue
+            try:
+                chunk = ser.read(ser.in_waiting or 1)   # blocks up to the port timeout
+            except (serial.SerialException, OSError, TypeError) as e:
+                if self._running:
+                    self._drop(ser, "read from", e)
+                continue
+            if not chunk:
+                continue
+            if self.binary:
+                frames, chunk = parser.feed(chunk)
+                with self._lock:
+                    self._acks += sum(1 for f in frames if f[0] == FRAME_ACK)
+                    self._naks += sum(1 for f in frames if f[0] == FRAME_NAK)
+                if self.metrics is not None:
+                    now = time.monotonic()
+                    for ftype, seq, _ in frames:
+                        t_sent = self._ack_sent.pop(seq, None)
+                        if ftype == FRAME_ACK and t_sent is not None:
+                            self.metrics.observe("ack_rtt_ms", (now - t_sent) * 1000.0)
+            *lines, buf = (buf + chunk).split(b"\n")
+            for raw in lines:
+                text = raw.decode(errors="ignore").rstrip()
+                if self.on_line is not None:
+                    self.on_line(text)
+                if self.echo:
+                    print(text, flush=True)
+
+
+def format_stats(st: dict) -> str:
+    """One-line summary of HandLink.stats() for logs."""
+    return (f"STATS depth={st['depth']} coalesced={st['coalesced']} dropped={st['dropped']} "
+            f"written={st['written']} rate={st['rate']:.1f}/s errors={st['errors']} "
+            f"acks={st['acks']} naks={st['naks']}")
+
+# the example sequence as a motion journal (see handJournal.py)
+DEMO_JOURNAL = """
+0.0  0:135:45     # channel 0: ramp to 135° at 45 deg/s
+1.5  0:270        # then on to 270° (keeps its speed)
+"""
+
 def interactive_demo(port, baud):
-    ser = open_serial(port, baud)
-    if not ser:
+    from handJournal import Journal, Player
+    link = HandLink(port, baud, echo=True)
+    if not link.connect():
         return 2
     try:
-        send_line(ser, "c 0")      # select channel 0
-        send_line(ser, "s 45")     # set speed 45 deg/s
-        send_line(ser, "a 135")    # ramp to 135°
-        time.sleep(1.5)
-        send_line(ser, "0 270")    # channel 0 → 270°
+        player = Player(link, Journal.parse(DEMO_JOURNAL.splitlines(), "demo"))
+        player.run()
+        link.flush()
     finally:
-        ser.close()
+        link.close()
     return 0
 
 def main(argv=None):
     p = argparse.ArgumentParser()
-    p.add_argument("--port", default=None, help="Serial port (e.g. /dev/ttyACM0 or COM3)")
+    p.add_argument("--port", default=None,
+                   help="Serial port (e.g. /dev/ttyACM0 or COM3); serve mode also takes "
+                        "several ports (a,b) or auto (see handDevices.py)")
     p.add_argument("--baud", type=int, default=115200)
     p.add_argument("--channel", type=int, help="Channel 0..15 to target")
     p.add_argument("--angle", type=float, help="Angle to send (0..SERVO_MAX_DEG)")
     p.add_argument("--speed", type=float, help="Speed in deg/sec")
+    p.add_argument("--frame", help="Set several channels in one write: ch:angle[:speed],...")
     p.add_argument("--serve", action="store_true", help="Run as a persistent stdin->serial server")
+    p.add_argument("--stats-interval", type=float, default=5.0,
+                   help="Serve mode: seconds between STATS lines (0 = off)")
+    p.add_argument("--quiet", action="store_true", help="Serve mode: do not echo commands and replies")
+    p.add_argument("--protocol", choices=["text", "binary", "auto"], default="text",
+                   help="Serve mode: how servo targets are written (binary needs sketch support)")
+    p.add_argument("--ipc", default=None,
+                   help="Serve mode: also take targets from this IPC address (see handIpc.py)")
+    p.add_argument("--net", default=None,
+                   help="Serve mode: also take targets over UDP on [host:]port, with a TCP control "
+                        "channel on the same port (see handNet.py)")
+    p.add_argument("--net-token", default=None,
+                   help="Serve mode: shared token other hosts must send before CMD on the --net control "
+                        "channel (default: $PRISM_NET_TOKEN; none = commands from this host only)")
+    p.add_argument("--telemetry", default=None,
+                   help="Serve mode: publish metrics snapshots to these addresses (see handTelemetry.py)")
+    p.add_argument("--metrics-out", default=None, help="Serve mode: append metrics snapshots to this JSON-lines file")
     args = p.parse_args(argv)
 
     # Resolve default port if not provided
-    port = args.port
-    if port is None:
-        import platform
-        if platform.system() == "Windows":
-            port = "COM5"
-        elif platform.system() == "Darwin":
-            port = "/dev/cu.usbmodem2101"
-        else:
-            port = "/dev/ttyACM0"
+    port = args.port or default_port()
 
-    # Serve mode: open serial and read stdin lines forever
+    # Serve mode: keep one link open and read stdin lines forever
     if args.serve:
-        ser = open_serial(port, args.baud)
-        if not ser:
+        import handDevices
+        metrics = reporter = None
+        if args.telemetry or args.metrics_out:
+            import handTelemetry
+            metrics = handTelemetry.Metrics("hand")
+        t0 = time.monotonic()
+        try:
+            link = handDevices.open_link(port, args.baud, echo=not args.quiet, protocol=args.protocol,
+                                         metrics=metrics)
+        except ValueError as e:
+            print(f"ERROR: {e}", file=sys.stderr)
             return 2
-        print(f"Serving on {port} @{args.baud}")
+        if not link.connect():
+            return 2
+        port = link.port
+        print(f"PHASE connect {(time.monotonic() - t0) * 1000.0:.0f}ms", flush=True)
+        print(f"Serving on {port} @{args.baud} ({'binary' if link.binary else 'text'})", flush=True)
+
+        ipc = None
+        ipc_latency = [0.0]     # EMA of publish-to-receive time (ms)
+        if args.ipc:
+            import handIpc
+            try:
+                ipc = handIpc.Subscriber(args.ipc)
+            except (OSError, ValueError) as e:
+                print(f"ERROR: cannot listen on {args.ipc}: {e}", file=sys.stderr)
+                link.close()
+                return 2
+
+            def listen():
+                # targets go straight to the link; no text parsing on this path
+                while True:
+                    try:
+                        msg = ipc.recv(timeout=1.0)
+                    except OSError:
+                        return
+                    if msg is None or msg.kind != handIpc.KIND_TARGETS:
+                        continue
+                    try:
+                        link.set_frame(msg.targets())
+                    except ValueError as e:
+                        print(f"ERROR: IPC targets: {e}", file=sys.stderr)
+                        continue
+                    ipc_latency[0] += 0.1 * (msg.age_ms() - ipc_latency[0])
+                    if metrics is not None:
+                        metrics.observe("ipc_ms", msg.age_ms())
+            threading.Thread(target=listen, name="hand-ipc", daemon=True).start()
+            print(f"Listening for targets on {args.ipc}", flush=True)
+
+        def handle(line: str):
+            """One command line, from stdin or the network control channel."""
+            # If line is a single integer/float, interpret as angle for the configured channel
+            parts = line.split()
+            try:
+                if len(parts) == 1:
+                    # single value => angle
+                    ang = int(float(parts[0]))
+                    link.set_angle(args.channel if args.channel is not None else 0, ang)
+                elif len(parts) == 2 and parts[0].lstrip("-").isdigit():
+                    # '<ch> <angle>' => latest-value-wins target for that channel
+                    if parts[0].startswith("-"):
+                        raise ValueError(f"channel {parts[0]} out of range")
+                    link.set_angle(int(parts[0]), int(float(parts[1])))
+                elif parts[0] == "f":
+                    # 'f ch:angle[:speed],...' => all channels in one write
+                    link.set_frame(parse_frame_spec(line[1:], getattr(link, "num_channels", MAX_CHANNELS)))
+                elif parts[0].startswith("@") and isinstance(link, handDevices.HandRegistry):
+                    # '@<board> <command>' => raw command for one board
+                    link.send(line.split(None, 1)[1], int(parts[0][1:]))
+                else:
+                    # a command like 'a 120' or anything else: forward raw
+                    link.send(line)
+            except Exception as e:
+                print(f"ERROR handling line '{line}': {e}", file=sys.stderr)
+
+        net = None
+        if args.net:
+            import handIpc, handNet
+            try:
+                net = handNet.NetServer(args.net, on_command=handle, token=args.net_token)
+            except (OSError, ValueError) as e:
+                print(f"ERROR: cannot listen on {args.net}: {e}", file=sys.stderr)
+                link.close()
+                return 2
+
+            def listen_net():
+                # stale and out-of-order packets are already dropped by NetServer
+                while True:
+                    try:
+                        msg = net.recv(timeout=1.0)
+                    except OSError:
+                        return
+                    if msg is None or msg.kind != handIpc.KIND_TARGETS:
+                        continue
+                    try:
+                        link.set_frame(msg.targets())
+                    except ValueError as e:
+                        print(f"ERROR: net targets: {e}", file=sys.stderr)
+                        continue
+                    if metrics is not None and net.latency_ms is not None:
+                        metrics.observe("net_ms", msg.age_ms())
+            threading.Thread(target=listen_net, name="hand-net", daemon=True).start()
+            print(f"Listening for targets on udp/tcp {net.address}", flush=True)
+
+        def stats_line():
+            line = format_stats(link.stats())
+            if ipc is not None:
+                line += f" ipc={ipc.received} ipc_lat={ipc_latency[0]:.2f}ms"
+            if net is not None:
+                st = net.stats()
+                lat = "-" if st["latency_ms"] is None else f"{st['latency_ms']:.2f}ms"
+                line += f" net={st['accepted']} net_lat={lat} stale={st['stale']} ooo={st['out_of_order']}"
+            return line
+
+        if metrics is not None:
+            def collect(m):
+                st = link.stats(reset_rate=False)
+                for name in ("depth", "coalesced", "dropped", "errors", "naks"):
+                    m.gauge(name, st[name])
+                m.gauge("connected", int(st["connected"]))
+                if ipc is not None:
+                    m.gauge("ipc_received", ipc.received)
+                if net is not None:
+                    st = net.stats()
+                    for name in ("accepted", "stale", "out_of_order"):
+                        m.gauge("net_" + name, st[name])
+            reporter = handTelemetry.Reporter(metrics, args.telemetry, args.metrics_out, collect=collect)
+            reporter.start()
+
+        if args.stats_interval > 0:
+            def report():
+                while True:
+                    time.sleep(args.stats_interval)
+                    print(stats_line(), flush=True)
+            threading.Thread(target=report, name="hand-stats", daemon=True).start()
+
         try:
             for raw in sys.stdin:
                 line = raw.strip()
-                if not line:
-                    continue
-                # If line is a single integer/float, interpret as angle for the configured channel
-                parts = line.split()
-                try:
-                    if len(parts) == 1:
-                        # single value => angle
-                        ang = int(float(parts[0]))
-                        send_line(ser, f"{args.channel if args.channel is not None else 0} {ang}")
-                    elif len(parts) == 2:
-                        # two tokens: either 'ch angle' or a command like 'a 120'
-                        send_line(ser, line)
-                    else:
-                        # forward raw
-                        send_line(ser, line)
-                except Exception as e:
-                    print(f"ERROR handling line '{line}': {e}", file=sys.stderr)
+                if line:
+                    handle(line)
         except KeyboardInterrupt:
             pass
         finally:
-            ser.close()
+            if ipc is not None:
+                ipc.close()
+            if net is not None:
+                net.close()
+            link.close()
+            if reporter is not None:
+                reporter.close()
+            print(stats_line(), flush=True)
         return 0
 
     # If no actionable args, run the demo
-    if args.channel is None and args.angle is None and args.speed is None:
+    if args.channel is None and args.angle is None and args.speed is None and args.frame is None:
         return interactive_demo(port, args.baud)
 
+    targets = parse_frame_spec(args.frame) if args.frame else None
+
     ser = open_serial(port, args.baud)
     if not ser:
         return 2
     try:
-        if args.channel is not None and args.angle is not None:
+        if targets:
+            # all listed channels in one 'f' command
+            send_frame(ser, targets)
+        elif args.channel is not None and args.angle is not None:
             # send '<ch> <angle>' form
             send_line(ser, f"{args.channel} {int(args.angle)}")
         else:
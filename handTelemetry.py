@@ -0,0 +1,217 @@
+"""Live counters and latency histograms for the tracker and the hand server.
+
+Metrics is a small thread-safe store of counters (cumulative, reported with
+their rate since the last snapshot), gauges (last value) and histograms
+(fixed log-spaced buckets; each snapshot reports count, p50/p95/p99 and max
+of the values observed since the previous one, so a regression under load
+shows up within one report). Recording a value is a dict lookup and a
+bisect, cheap enough for the per-frame and per-write paths.
+
+Reporter takes a snapshot every ``interval`` seconds and
+  - sends it as one JSON datagram to each telemetry address (the launcher's
+    panel, see handIpc.default_address("telemetry")); like handIpc, sending
+    never blocks and a missing receiver only counts as dropped, and
+  - appends it as a JSON line to ``--metrics-out`` files.
+
+  python hand_tracker.py --telemetry unix:/tmp/prism-telemetry.sock --metrics-out tracker.jsonl
+  python handSerial.py --serve --metrics-out hand.jsonl
+
+Snapshot: {"t": unix time, "source": "tracker"|"hand", "interval": s,
+           "counters": {name: n}, "rates": {name: n/s}, "gauges": {name: v},
+           "hist": {name: {"n", "p50", "p95", "p99", "max"}}}   (times in ms)
+"""
+
+import bisect
+import json
+import socket
+import threading
+import time
+
+import handIpc
+
+MAX_DATAGRAM = 8192
+REPORT_INTERVAL = 0.25          # seconds between snapshots
+# histogram bucket upper edges (ms): 0.01 ms .. ~10 s, 8 buckets per decade
+BUCKETS = [round(0.01 * 10 ** (i / 8), 6) for i in range(49)]
+
+
+class Histogram:
+    """Bucketed distribution of values (one snapshot's worth, see Metrics)."""
+
+    __slots__ = ("counts", "n", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.n = 0
+        self.max = 0.0
+
+    def observe(self, v: float):
+        self.counts[bisect.bisect_left(BUCKETS, v)] += 1
+        self.n += 1
+        if v > self.max:
+            self.max = v
+
+    def percentile(self, q: float) -> float:
+        """Upper bucket edge below which a fraction q of the values fall."""
+        if not self.n:
+            return 0.0
+        rank = q * self.n
+        acc = 0
+        for i, c in enumerate(self.counts):
+            acc += c
+            if acc >= rank:
+                return min(BUCKETS[i], self.max) if i < len(BUCKETS) else self.max
+        return self.max
+
+    def summary(self) -> dict:
+        return {"n": self.n, "p50": round(self.percentile(0.5), 3), "p95": round(self.percentile(0.95), 3),
+                "p99": round(self.percentile(0.99), 3), "max": round(self.max, 3)}
+
+
+class Metrics:
+    """Counters, gauges and histograms, see the module docstring."""
+
+    def __init__(self, source: str):
+        self.source = source
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._hists = {}
+        self._mark = (time.monotonic(), {})     # (time, counters) at the last snapshot
+
+    def inc(self, name: str, n: int = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def gauge(self, name: str, value: float):
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, value: float):
+        """Record one value (ms for times) in histogram ``name``."""
+        with self._lock:
+            h = self._hists.get(name)
+            if h is None:
+                h = self._hists[name] = Histogram()
+            h.observe(value)
+
+    def snapshot(self) -> dict:
+        """Current counters/gauges, plus rates and histograms since the last snapshot."""
+        now = time.monotonic()
+        with self._lock:
+            t0, old = self._mark
+            counters = dict(self._counters)
+            hists, self._hists = self._hists, {}
+            gauges = dict(self._gauges)
+            self._mark = (now, counters)
+        dt = max(1e-6, now - t0)
+        return {
+            "t": time.time(),
+            "source": self.source,
+            "interval": round(dt, 3),
+            "counters": counters,
+            "rates": {k: round((v - old.get(k, 0)) / dt, 2) for k, v in counters.items()},
+            "gauges": gauges,
+            "hist": {k: h.summary() for k, h in hists.items()},
+        }
+
+
+class Reporter(threading.Thread):
+    """Publishes Metrics snapshots, see the module docstring.
+
+    ``collect`` is called before each snapshot so the owner can copy
+    counters kept elsewhere (HandLink.stats(), ring drop counts) into gauges.
+    """
+
+    def __init__(self, metrics: Metrics, addresses=None, out: str = None,
+                 interval: float = REPORT_INTERVAL, collect=None):
+        super().__init__(name=f"{metrics.source}-telemetry", daemon=True)
+        if isinstance(addresses, str):
+            addresses = [a for a in addresses.split(",") if a]
+        self.metrics = metrics
+        self.addresses = [handIpc.parse_address(a) for a in addresses or []]
+        self.interval = interval
+        self.collect = collect
+        self._socks = {}
+        for family, _ in self.addresses:
+            if family not in self._socks:
+                s = socket.socket(family, socket.SOCK_DGRAM)
+                s.setblocking(False)
+                self._socks[family] = s
+        self._out = open(out, "a", buffering=1) if out else None
+        self._done = threading.Event()
+        self.sent = 0
+        self.dropped = 0
+
+    def report(self) -> dict:
+        if self.collect is not None:
+            self.collect(self.metrics)
+        snap = self.metrics.snapshot()
+        line = json.dumps(snap, separators=(",", ":"))
+        if self._out is not None:
+            self._out.write(line + "\n")
+        data = line.encode()
+        if len(data) <= MAX_DATAGRAM:
+            for family, addr in self.addresses:
+                try:
+                    self._socks[family].sendto(data, addr)
+                    self.sent += 1
+                except OSError:
+                    self.dropped += 1
+        return snap
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            self.report()
+
+    def close(self):
+        """Stop, write a final snapshot and close the export file."""
+        self._done.set()
+        if self.is_alive():
+            self.join(timeout=1.0)
+        self.report()
+        for s in self._socks.values():
+            s.close()
+        self._socks.clear()
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+
+
+class Subscriber(handIpc.Subscriber):
+    """Receiving end for snapshots; drain() returns the decoded dicts."""
+
+    def recv(self, timeout: float = None):
+        self.sock.settimeout(timeout)
+        while True:
+            try:
+                data = self.sock.recv(MAX_DATAGRAM)
+            except (socket.timeout, BlockingIOError):
+                return None
+            try:
+                snap = json.loads(data)
+            except ValueError:
+                self.bad += 1
+                continue
+            self.received += 1
+            return snap
+
+
+def format_snapshot(snap: dict, hists=("latency_ms", "age_ms", "inference_ms", "serial_write_ms", "ack_rtt_ms")) -> str:
+    """One-line summary for the launcher panel and logs."""
+    parts = [snap.get("source", "?")]
+    rates = snap.get("rates", {})
+    gauges = snap.get("gauges", {})
+    for name, label in (("frames", "fps"), ("sends", "sends/s"), ("written", "writes/s")):
+        if name in rates:
+            parts.append(f"{label} {rates[name]:.1f}")
+    if "capture_fps" in gauges:
+        parts.append(f"camera {gauges['capture_fps']:.1f} fps")
+    for name in ("coalesced", "dropped", "dropped_capture", "dropped_inference"):
+        if name in gauges:
+            parts.append(f"{name} {gauges[name]:g}")
+    for name in hists:
+        h = snap.get("hist", {}).get(name)
+        if h and h["n"]:
+            parts.append(f"{name[:-3]} p50 {h['p50']:.1f} p95 {h['p95']:.1f} ms")
+    return "  ".join(parts)
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# the shared modules live at the repo root (handSerial.py, handJournal.py, ...),
+# the tracker's next to hand_tracker.py
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.join(REPO_ROOT, "Applications", "HandTracker"))
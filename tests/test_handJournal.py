@@ -0,0 +1,80 @@
+"""Journal parsing and Player scheduling, against in-process links."""
+
+import socket
+
+import pytest
+
+import handIpc
+from handJournal import Journal, Player, format_entry
+from handSerial import HandLink
+
+
+class RecordingLink:
+    """set_frame() sink with HandLink's channel check."""
+
+    def __init__(self, num_channels: int = 16):
+        self.num_channels = num_channels
+        self.frames = []
+
+    def set_frame(self, targets: dict) -> bool:
+        for ch in targets:
+            if not 0 <= ch < self.num_channels:
+                raise ValueError(f"channel {ch} out of range")
+        self.frames.append(dict(targets))
+        return True
+
+
+def test_parse_and_format():
+    j = Journal.parse(["# comment", "1.5 0:270,17:45", "0 0:135:45", "", "3.0"])
+    assert [t for t, _ in j.entries] == [0.0, 1.5, 3.0]
+    assert j.entries[0][1] == {0: (135.0, 45.0)}
+    assert j.duration == 3.0 and j.channels() == [0, 17]
+    assert format_entry(1.5, {0: (270.0, None), 17: (45.0, None)}) == "1.500 0:270,17:45"
+    with pytest.raises(ValueError):
+        Journal.parse(["0 64:90"])
+
+
+def test_player_merges_entries_within_a_period():
+    link = RecordingLink()
+    j = Journal.parse(["0 0:10", "0.001 1:20", "0.002 0:30", "0.05 2:40"])
+    report = Player(link, j, rate=100).run()
+    assert link.frames == [{0: (30.0, None), 1: (20.0, None)}, {2: (40.0, None)}]
+    assert report["sent"] == 2 and report["merged"] == 2
+
+
+def test_player_skips_channels_beyond_the_link():
+    link = RecordingLink(16)
+    j = Journal.parse(["0 0:90,20:45", "0.02 17:30", "0.04 1:60:120"])
+    player = Player(link, j, speed=2.0, rate=0)
+    report = player.run()
+    # channel 20 is dropped from the first send, the second entry has nothing left
+    assert link.frames == [{0: (90.0, None)}, {1: (60.0, 240.0)}]
+    assert report["skipped"] == 2 and report["failed"] == 0 and report["sent"] == 2
+
+
+def test_player_skips_channels_beyond_a_real_hand_link():
+    link = HandLink("/dev/null-prism-test")
+    player = Player(link, Journal.parse(["0 3:90,40:10"]), rate=0)
+    try:
+        report = player.run()
+        assert report["sent"] == 1 and report["skipped"] == 1
+        assert link._pending == {3: (90.0, None)}     # the port never opens: still queued
+    finally:
+        link.close(0)
+
+
+def test_player_on_ipc_publisher_stays_within_the_message():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    sub = handIpc.Subscriber(f"udp:127.0.0.1:{port}")
+    pub = handIpc.Publisher(f"udp:127.0.0.1:{port}")
+    try:
+        # the publisher has no num_channels: the 16 channels of a message are the limit
+        report = Player(pub, Journal.parse(["0 5:100,31:80"]), rate=0).run()
+        assert report["sent"] == 1 and report["skipped"] == 1
+        msg = sub.recv(timeout=1.0)
+        assert msg is not None and msg.targets() == {5: (100.0, None)}
+    finally:
+        pub.close()
+        sub.close()
@@ -0,0 +1,145 @@
+"""handNet over 127.0.0.1: UDP delivery and filtering, and the TCP control channel."""
+
+import json
+import socket
+import time
+
+import pytest
+
+import handIpc
+import handNet
+
+
+@pytest.fixture
+def server():
+    commands = []
+    srv = handNet.NetServer("127.0.0.1:0", max_age_ms=50.0, on_command=commands.append, token="")
+    srv.commands = commands
+    yield srv
+    srv.close()
+
+
+def _raw_sender():
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    s.bind(("127.0.0.1", 0))
+    return s
+
+
+def _send(sock, srv, seq, ch=0, angle=90.0, t_ns=None):
+    sock.sendto(handIpc.encode_message(handIpc.KIND_TARGETS, seq, targets={ch: angle}, t_ns=t_ns),
+                ("127.0.0.1", srv.port))
+
+
+def _sync(srv, sock):
+    with socket.create_connection(("127.0.0.1", srv.port), timeout=2.0) as c, c.makefile("rb") as f:
+        c.sendall(f"SYNC {sock.getsockname()[1]}\n".encode())
+        assert f.readline().strip() == b"OK"
+
+
+def test_in_order_delivery(server):
+    pub = handNet.NetPublisher(f"127.0.0.1:{server.port}", control=False)
+    try:
+        for i in range(5):
+            pub.set_frame({i: 10.0 * i})
+        got = [server.recv(timeout=1.0) for _ in range(5)]
+        assert [m.targets() for m in got] == [{i: (10.0 * i, None)} for i in range(5)]
+        assert [m.seq for m in got] == [0, 1, 2, 3, 4]
+        assert server.stats()["accepted"] == 5 and server.stats()["out_of_order"] == 0
+    finally:
+        pub.close()
+
+
+def test_duplicate_and_reordered_packets_are_dropped(server):
+    with _raw_sender() as s:
+        for seq in (1, 2, 2, 1, 3):
+            _send(s, server, seq, ch=seq)
+        got = []
+        while (m := server.recv(timeout=0.3)) is not None:
+            got.append(m.seq)
+    assert got == [1, 2, 3]
+    assert server.stats()["out_of_order"] == 2
+
+
+def test_senders_on_one_host_are_kept_apart(server):
+    a, b = _raw_sender(), _raw_sender()
+    try:
+        _send(a, server, 5)
+        _send(b, server, 1)         # lower than a's, but b's own first packet
+        assert [server.recv(timeout=1.0).seq for _ in range(2)] == [5, 1]
+    finally:
+        a.close()
+        b.close()
+
+
+def test_stale_packets_are_dropped_once_synced(server):
+    old = time.monotonic_ns() - 500_000_000     # stamped 500 ms ago
+    with _raw_sender() as s, _raw_sender() as other:
+        # not synced yet: an old stamp is not trusted, the packet is delivered
+        _send(s, server, 1, t_ns=old)
+        assert server.recv(timeout=1.0).seq == 1
+        _sync(server, s)
+        _send(s, server, 2, t_ns=old)
+        _send(s, server, 3)
+        assert server.recv(timeout=1.0).seq == 3
+        assert server.stats()["stale"] == 1
+        # syncing one sender does not make another on the same host age-checked
+        _send(other, server, 1, t_ns=old)
+        assert server.recv(timeout=1.0).seq == 1
+
+
+def test_publisher_syncs_before_its_packets_are_age_checked(server):
+    pub = handNet.NetPublisher(f"127.0.0.1:{server.port}", control=False)
+    try:
+        pub.offset_ns = -10 ** 9                # a clock far behind the server's
+        pub.set_frame({0: 45.0})
+        assert server.recv(timeout=1.0) is not None
+        pub.sync()                              # applies the real offset, then SYNC
+        assert pub.synced and ("127.0.0.1", pub.udp_port) in server._synced
+        pub.set_frame({0: 50.0})
+        assert server.recv(timeout=1.0).targets() == {0: (50.0, None)}
+        assert server.stats()["stale"] == 0
+    finally:
+        pub.close()
+
+
+def test_control_channel(server):
+    with socket.create_connection(("127.0.0.1", server.port), timeout=2.0) as c, c.makefile("rb") as f:
+        def ask(line):
+            c.sendall((line + "\n").encode())
+            return f.readline().decode().strip()
+
+        t1 = time.monotonic_ns()
+        pong = ask(f"PING {t1}").split()
+        assert pong[0] == "PONG" and int(pong[1]) == t1 and int(pong[2]) >= t1
+        reply = ask("STATS")
+        assert reply.startswith("STATS ")
+        assert set(json.loads(reply[6:])) >= {"received", "accepted", "stale", "out_of_order"}
+        assert ask("CMD a 120") == "OK"     # from this host
+        assert ask("BOGUS") == "ERR BOGUS"
+    assert server.commands == ["a 120"]
+    pub = handNet.NetPublisher(f"127.0.0.1:{server.port}", control=False)
+    try:
+        assert pub.command("0 90")
+        pub.sync()
+        assert pub.rtt_ms is not None and "accepted" in pub.remote
+    finally:
+        pub.close()
+    assert server.commands == ["a 120", "0 90"]
+
+
+def test_cmd_from_another_host_needs_the_token():
+    srv = handNet.NetServer("127.0.0.1:0", on_command=lambda line: None, token="s3cret")
+    open_srv = handNet.NetServer("127.0.0.1:0", on_command=lambda line: None, token="")
+    try:
+        assert srv._trusted("127.0.0.1") and srv._trusted("::1")
+        assert not srv._trusted("192.0.2.7")
+        assert not srv._trusted("192.0.2.7", "wrong")
+        assert srv._trusted("192.0.2.7", "s3cret")
+        # no token configured: other hosts can never run commands
+        assert not open_srv._trusted("192.0.2.7", "")
+        with socket.create_connection(("127.0.0.1", srv.port), timeout=2.0) as c, c.makefile("rb") as f:
+            c.sendall(b"AUTH wrong\n")
+            assert f.readline().strip() == b"OK"        # this host is trusted anyway
+    finally:
+        srv.close()
+        open_srv.close()
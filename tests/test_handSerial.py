@@ -0,0 +1,124 @@
+"""Binary protocol and HandLink handshake, over a pty (handEmulator.py or a silent one)."""
+
+import os
+import time
+
+import pytest
+import serial
+
+from handSerial import (FRAME_ACK, FRAME_SET, FRAME_SYNC, FrameParser, HandLink, decode_set,
+                        encode_frame, encode_set, query_version)
+
+needs_pty = pytest.mark.skipif(not hasattr(os, "openpty"), reason="needs a pseudo-terminal")
+
+
+def _payload(frame: bytes) -> bytes:
+    return frame[4:-2]
+
+
+def test_encode_decode_round_trip():
+    targets = {0: (135.0, 45.0), 3: (90.5, None), 15: (270.0, 12.5)}
+    frame = encode_set(targets, seq=7)
+    assert frame[0] == FRAME_SYNC and frame[1] == FRAME_SET and frame[2] == 7
+    # channels without a speed go out as 0 ("keep current") once any channel has one
+    assert decode_set(_payload(frame)) == {0: (135.0, 45.0), 3: (90.5, 0.0), 15: (270.0, 12.5)}
+    assert decode_set(_payload(encode_set({1: 10.0, 2: 20.0}))) == {1: (10.0, None), 2: (20.0, None)}
+
+
+def test_encode_rejects_bad_channel():
+    with pytest.raises(ValueError):
+        encode_set({16: 90})
+    with pytest.raises(ValueError):
+        encode_set({})
+
+
+def test_parser_splits_text_and_frames():
+    a, b = encode_set({0: 90}, seq=1), encode_frame(FRAME_ACK, b"", 2)
+    parser = FrameParser()
+    frames, text = parser.feed(b"CH 0 target\r\n" + a + b"> " + b)
+    assert [(t, s) for t, s, _ in frames] == [(FRAME_SET, 1), (FRAME_ACK, 2)]
+    assert text == b"CH 0 target\r\n> "
+    # a frame split across reads is held back until complete
+    frames, text = parser.feed(a[:5])
+    assert frames == [] and text == b""
+    frames, _ = parser.feed(a[5:])
+    assert [(t, s) for t, s, _ in frames] == [(FRAME_SET, 1)]
+
+
+def test_parser_resyncs_after_bad_crc():
+    good = encode_set({2: 45}, seq=9)
+    bad = bytearray(encode_set({1: 30}, seq=8))
+    bad[-1] ^= 0xFF
+    parser = FrameParser()
+    frames, _ = parser.feed(bytes(bad) + good)
+    assert [(t, s) for t, s, _ in frames] == [(FRAME_SET, 9)]
+    assert decode_set(frames[0][2]) == {2: (45.0, None)}
+    assert parser.bad == 1
+
+
+def test_parser_resyncs_after_lost_sync():
+    good = encode_set({4: 180}, seq=3)
+    parser = FrameParser()
+    # the first frame lost its SYNC byte: its bytes are text, the next frame still parses
+    frames, _ = parser.feed(encode_set({0: 10}, seq=2)[1:] + good)
+    assert [(t, s) for t, s, _ in frames] == [(FRAME_SET, 3)]
+    assert decode_set(frames[0][2]) == {4: (180.0, None)}
+
+
+@needs_pty
+def test_handshake_uses_binary_with_emulator():
+    from handEmulator import Emulator
+    with Emulator() as emu:
+        link = HandLink(emu.port, protocol="auto")
+        try:
+            assert link.connect()
+            assert link.version == 2 and link.binary
+            link.set_frame({0: (135, 500), 1: 90})
+            assert link.flush()
+            deadline = time.monotonic() + 2.0
+            while link.stats()["acks"] < 1 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert link.stats()["acks"] == 1
+            assert emu.board.target[0] == 135 and emu.board.target[1] == 90
+        finally:
+            link.close()
+
+
+@needs_pty
+def test_handshake_falls_back_to_text_without_reply():
+    master, slave = os.openpty()
+    import tty
+    tty.setraw(master)
+    tty.setraw(slave)
+    os.set_blocking(master, False)
+    ser = serial.Serial(os.ttyname(slave), 115200, timeout=1)
+    link = HandLink(ser.port, protocol="auto")
+    try:
+        t0 = time.monotonic()
+        assert query_version(ser, timeout=0.2) == 0
+        assert time.monotonic() - t0 < 1.0
+        assert link.attach(ser)             # asks "v" again; nobody answers
+        assert link.version == 0 and not link.binary
+        link.set_frame({0: 90})
+        assert link.flush()
+        out = b""
+        deadline = time.monotonic() + 1.0
+        while b"0 90\n" not in out and time.monotonic() < deadline:
+            try:
+                out += os.read(master, 1024)
+            except BlockingIOError:
+                time.sleep(0.01)
+        assert out.startswith(b"v\nv\n") and b"0 90\n" in out and bytes((FRAME_SYNC,)) not in out
+    finally:
+        link.close()
+        os.close(master)
+        os.close(slave)
+
+
+def test_set_frame_rejects_channels_off_the_board():
+    link = HandLink("/dev/null-prism-test")
+    for bad in ({16: 90}, {-1: 90}, {0: 90, 20: 45}):
+        with pytest.raises(ValueError):
+            link.set_frame(bad)
+    # nothing was queued and no thread was started for the rejected frames
+    assert link.stats()["depth"] == 0 and not link._threads
@@ -0,0 +1,88 @@
+"""hand_tracker.main() end to end with a fake camera and a fake MediaPipe model."""
+
+import os
+import sys
+import threading
+import time
+import types
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+
+class FakeVideoCapture:
+    """cv2.VideoCapture stand-in: blank 320x240 frames at 60 fps."""
+
+    def __init__(self, index=0, backend=0):
+        self.props = {cv2.CAP_PROP_FPS: 60.0, cv2.CAP_PROP_FRAME_WIDTH: 320.0,
+                      cv2.CAP_PROP_FRAME_HEIGHT: 240.0, cv2.CAP_PROP_FOURCC: 0.0,
+                      cv2.CAP_PROP_BUFFERSIZE: 1.0}
+        self.opened = True
+
+    def isOpened(self):
+        return self.opened
+
+    def get(self, prop):
+        return self.props.get(prop, 0.0)
+
+    def set(self, prop, value):
+        self.props[prop] = value
+        return True
+
+    def grab(self):
+        time.sleep(1.0 / 60.0)
+        return self.opened
+
+    def retrieve(self):
+        return True, np.zeros((240, 320, 3), np.uint8)
+
+    def release(self):
+        self.opened = False
+
+    def getBackendName(self):
+        return "FAKE"
+
+
+def fake_mediapipe():
+    class Hands:
+        def __init__(self, **kwargs):
+            pass
+
+        def process(self, img):
+            return types.SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+
+    mp = types.ModuleType("mediapipe")
+    mp.solutions = types.SimpleNamespace(hands=types.SimpleNamespace(Hands=Hands))
+    return mp
+
+
+def test_session_draws_frames_from_a_camera(monkeypatch):
+    import capture
+    import hand_tracker as ht
+    monkeypatch.setattr(capture.cv2, "VideoCapture", FakeVideoCapture)
+    monkeypatch.setitem(sys.modules, "mediapipe", fake_mediapipe())
+
+    def frames():
+        return ht.metrics.snapshot()["counters"].get("frames", 0)
+
+    def commands():
+        # standby: start a session, let it draw a few frames, then quit
+        yield "start\n"
+        deadline = time.monotonic() + 10.0
+        while frames() < 3 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        yield "quit\n"
+
+    monkeypatch.setattr(sys, "stdin", commands())
+    # --headless with a (drawn) preview: every overlay line is drawn, no window is opened
+    name = f"prism-test-{os.getpid()}"
+    result = {}
+    t = threading.Thread(target=lambda: result.update(rc=ht.main(
+        ["--no-send", "--standby", "--headless", "--preview", name])), daemon=True)
+    t.start()
+    t.join(20.0)
+    assert not t.is_alive()
+    assert result.get("rc") == 0
+    assert frames() >= 3
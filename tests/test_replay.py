@@ -0,0 +1,23 @@
+"""replay.py loads without OpenCV or the camera modules."""
+
+import os
+import subprocess
+import sys
+
+from conftest import REPO_ROOT
+
+SCRIPT = """
+import sys
+sys.modules["cv2"] = None      # any 'import cv2' now raises ImportError
+import replay
+heavy = sorted(m for m in ("capture", "multicam", "roi", "keyframe", "mediapipe") if m in sys.modules)
+print(",".join(heavy) or "none")
+"""
+
+
+def test_replay_imports_without_cv2():
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+        [REPO_ROOT, os.path.join(REPO_ROOT, "Applications", "HandTracker")]))
+    out = subprocess.run([sys.executable, "-c", SCRIPT], env=env, capture_output=True, text=True, timeout=60)
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip() == "none"
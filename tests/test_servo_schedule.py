@@ -0,0 +1,54 @@
+"""Send scheduling: command efficiency under both schedules."""
+
+import numpy as np
+
+from servo_schedule import RAMP_TICK, SendScheduler
+
+
+def test_fixed_schedule_scores_the_last_command():
+    s = SendScheduler()
+    # fixed throttle: commands recorded, nothing decided in between
+    for i, t in enumerate((0.0, 0.2, 0.4)):
+        s.record(0, 90.0 + 10 * i, None, t)
+    st = s.stats(0.6)
+    assert st["sent"] == 3 and st["useful"] == 3 and st["efficiency"] == 1.0
+    # without a time, scoring ends at the last command: it has had no ramp tick yet
+    assert SendScheduler().stats()["efficiency"] is None
+    s2 = SendScheduler()
+    s2.record(0, 90.0, None, 1.0)
+    assert s2.stats()["useful"] == 0
+    assert s2.stats(1.0 + RAMP_TICK)["useful"] == 1
+
+
+def test_repeated_command_is_not_useful():
+    s = SendScheduler()
+    s.record(0, 90.0, None, 0.0)
+    s.record(0, 90.0, None, 0.2)
+    st = s.stats(0.4)
+    assert st["sent"] == 2 and st["useful"] == 1
+
+
+def _static_hand():
+    # wrist at the bottom, fingers up and slightly to the right
+    lm = np.zeros((1, 21, 3), np.float32)
+    for k in range(21):
+        lm[0, k] = (0.5 + 0.004 * k, 0.8 - 0.02 * k, 0.0)
+    return lm
+
+
+def test_replay_fixed_schedule_efficiency(tmp_path):
+    import recording
+    import replay
+    path = str(tmp_path / "static.prec")
+    rec = recording.Recorder(path, 640, 480)
+    lm = _static_hand()
+    for i in range(30):
+        rec.write(i / 30.0, i, lm, ["Right"], np.zeros(1), np.zeros(1))
+    rec.close()
+    schedule, replay.ht.SEND_SCHEDULE = replay.ht.SEND_SCHEDULE, "fixed"
+    try:
+        st = replay.replay(path)
+    finally:
+        replay.ht.SEND_SCHEDULE = schedule
+    assert st["commands"] >= 1
+    assert st["useful"] == st["commands"] and st["efficiency"] == 1.0